@@ -0,0 +1,89 @@
+## Images and sounds loaded on worker threads
+## Decoding PNGs and sounds and scaling them to the screen is most of the client's start up time,
+## and did all of it before the first menu frame. The asset manager does that work on a few worker
+## threads instead and hands out futures, so a scene can be shown as soon as the assets it needs
+## first are done while the rest carry on loading. pygame lets go of the GIL while it decodes and
+## scales, so the game loop keeps running meanwhile. Everything is loaded once and kept.
+
+import os, threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import *
+import pygame
+
+class AssetManager():
+    """
+    Futures for assets being loaded in the background, keyed so that asking twice for the same
+    asset gives back the same future. The display mode must be set before images are asked for.
+    """
+
+    def __init__(self, workers: int = 2):
+        """
+        Args:
+            workers (int): Threads decoding assets at the same time.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="assets")
+        self.futures: Dict[tuple, Future] = {}
+        self.lock = threading.Lock()
+
+    def _submit(self, key: tuple, load: Callable, *args) -> Future:
+        with self.lock:
+            future = self.futures.get(key)
+            if future is None:
+                future = self.executor.submit(load, *args)
+                self.futures[key] = future
+            return future
+
+    def image(self, path: Union[str, Path], size: Optional[Tuple[int, int]] = None) -> Future:
+        """
+        Loads an image converted for the display, scaled to size if given.
+
+        Returns:
+            Future: Resolves to the pygame.Surface.
+        """
+        return self._submit(("image", str(path), size), self._load_image, str(path), size)
+
+    def _load_image(self, path: str, size: Optional[Tuple[int, int]]) -> pygame.Surface:
+        image = pygame.image.load(path).convert_alpha()
+        if size is not None:
+            image = pygame.transform.scale(image, size)
+        return image
+
+    def frames(self, folder: Union[str, Path], size: Optional[Tuple[int, int]] = None) -> List[Future]:
+        """
+        Loads every PNG in a folder in name order, like the frames of an animation, each scaled to size if given.
+
+        Returns:
+            List[Future]: One future per frame, in order. They are queued in order, so earlier frames are done first.
+        """
+        return [self.image(os.path.join(folder, filename), size) for filename in sorted(os.listdir(folder)) if filename.endswith(".png")]
+
+    def sound(self, path: Union[str, Path]) -> Future:
+        """
+        Loads a sound effect.
+
+        Returns:
+            Future: Resolves to the pygame.mixer.Sound.
+        """
+        return self._submit(("sound", str(path)), pygame.mixer.Sound, str(path))
+
+    def call(self, name: str, load: Callable, *args) -> Future:
+        """
+        Runs any other loading work in the background, once for each name.
+
+        Returns:
+            Future: Resolves to whatever load returns.
+        """
+        return self._submit(("call", name), load, *args)
+
+def ready(futures: Sequence[Future]) -> list:
+    """Returns the results of the futures at the front of the list that are done, in order."""
+    results = []
+    for future in futures:
+        if not future.done():
+            break
+        results.append(future.result())
+    return results
+
+# Shared by every scene
+assets = AssetManager()
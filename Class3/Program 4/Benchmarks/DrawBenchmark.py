@@ -0,0 +1,95 @@
+## Compares drawing players and enemies with and without the TransformCache
+## Draws a crowd of remote players, each on its own animation frame and facing either way, and a
+## few enemies onto a 1920x1080 screen the way GameClient.drawOtherClients and Enemy.render do. The
+## old way flips and scales every frame before blitting it, the cache makes each variant once.
+## Reports the time of one drawn frame and the frame rate it allows for more and more players,
+## and how much memory the cache took. Runs on SDL's dummy video driver, so no window is opened.
+##
+## Usage: python Benchmarks/DrawBenchmark.py
+
+import os, sys, random, time
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from GameConstants import *
+
+RESOLUTION = (1920, 1080)
+PLAYER_COUNTS = [1, 10, 50, 100, 200]
+ENEMY_COUNT = 20
+FRAMES = 60  # Drawn frames timed for each count
+PLAYER_ANIMATIONS = ["Idle", "Run", "Jump", "Fall", "SwordAttack_1"]
+ENEMY_ANIMATIONS = ["Idle", "Walk", "Run", "Attack"]
+
+def make_crowd(count: int, rng: random.Random) -> List[dict]:
+    """Remote players spread over the screen, like the gameData drawOtherClients gets."""
+    return [{
+        "frames": sprite_atlas.frames(sprites_folder / "Player" / f"{rng.choice(PLAYER_ANIMATIONS)}.png", PLAYER_FRAME_SIZE),
+        "frame_index": rng.randrange(8),
+        "facing_right": rng.random() < 0.5,
+        "player_scale": PLAYER_SCALE,
+        "position": (rng.uniform(0, RESOLUTION[0]), rng.uniform(0, RESOLUTION[1])),
+    } for _ in range(count)]
+
+def make_enemies(count: int, rng: random.Random) -> List[Enemy]:
+    enemies = []
+    for _ in range(count):
+        enemy = Enemy(pygame.Vector2(rng.uniform(0, RESOLUTION[0]), rng.uniform(0, RESOLUTION[1])))
+        enemy.load_animation(rng.choice(ENEMY_ANIMATIONS))
+        enemies.append(enemy)
+    return enemies
+
+def draw_uncached(screen: pygame.Surface, crowd: List[dict], enemies: List[Enemy], step: int):
+    """What drawOtherClients and Enemy.render did before the cache."""
+    for player in crowd:
+        frame = player["frames"][(player["frame_index"] + step) % len(player["frames"])]
+        if not player["facing_right"]:
+            frame = pygame.transform.flip(frame, True, False)
+        if player["player_scale"] != 1:
+            frame = pygame.transform.scale(frame, (int(frame.get_width() * player["player_scale"]), int(frame.get_height() * player["player_scale"])))
+        screen.blit(frame, player["position"])
+
+    for enemy in enemies:
+        frame = enemy.animation_frames[(enemy.current_frame_index + step) % len(enemy.animation_frames)]
+        size = int(enemy.size * enemy.scale)
+        screen.blit(pygame.transform.scale(frame, (size, size)), (enemy.position.x, enemy.position.y))
+
+def draw_cached(screen: pygame.Surface, crowd: List[dict], enemies: List[Enemy], step: int):
+    for player in crowd:
+        frame = player["frames"][(player["frame_index"] + step) % len(player["frames"])]
+        screen.blit(frame_cache.get(frame, player["player_scale"], flip=not player["facing_right"]), player["position"])
+
+    for enemy in enemies:
+        frame = enemy.animation_frames[(enemy.current_frame_index + step) % len(enemy.animation_frames)]
+        screen.blit(frame_cache.get(frame, enemy.scale), (enemy.position.x, enemy.position.y))
+
+def time_frames(draw, screen: pygame.Surface, crowd: List[dict], enemies: List[Enemy]) -> float:
+    """Seconds per drawn frame, averaged over FRAMES frames that step every animation along."""
+    start = time.perf_counter()
+    for step in range(FRAMES):
+        screen.fill((0, 0, 0))
+        draw(screen, crowd, enemies, step)
+    return (time.perf_counter() - start) / FRAMES
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode(RESOLUTION)
+    rng = random.Random(0)
+    enemies = make_enemies(ENEMY_COUNT, rng)
+
+    print(f"{'players':>8} {'uncached ms':>12} {'fps':>6} {'cached ms':>10} {'fps':>6} {'speedup':>8}")
+    for count in PLAYER_COUNTS:
+        crowd = make_crowd(count, rng)
+        uncached = time_frames(draw_uncached, screen, crowd, enemies)
+        frame_cache.clear()
+        time_frames(draw_cached, screen, crowd, enemies)  # Making each variant the first time is the same work as before
+        cached = time_frames(draw_cached, screen, crowd, enemies)
+        print(f"{count:>8} {uncached * 1000:>12.2f} {1 / uncached:>6.0f} {cached * 1000:>10.2f} {1 / cached:>6.0f} {uncached / cached:>7.1f}x")
+
+    print(f"\nCache after {PLAYER_COUNTS[-1]} players: {len(frame_cache)} surfaces, {frame_cache.bytes / 2**20:.1f} MB "
+          f"of {frame_cache.max_bytes / 2**20:.0f} MB, {frame_cache.hits} hits, {frame_cache.misses} misses")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+## Compares updating EnemyModel objects one at a time with the NumPy EnemyEngine
+## First checks that both give exactly the same enemies after a few seconds of play, then reports
+## the time of one server tick (update plus the enemy_data sent to clients) for more and more
+## enemies, and the most enemies each one can update within a 16 ms tick, with 16 and then 128
+## players. For the engine, the time of the update alone is shown too, since building enemy_data
+## is then most of the tick.
+##
+## Usage: python Benchmarks/EnemyBenchmark.py
+
+import sys, copy, random, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Server import GameServer
+from SpatialIndex import PositionGrid, TerrainIndex
+from EnemyEngine import EnemyEngine
+from GameModel import *
+
+WORLD_WIDTH = 8000
+TICK_BUDGET = 1 / 60  # Seconds the server has for a whole tick
+DT = 1 / 60
+ENEMY_COUNTS = [10, 100, 1000, 10000]
+PLAYER_COUNTS = [16, 128]  # 128 is the most players PositionGrid was sized for
+CHECKED_ENEMIES = 1000  # Enough that with 128 players the engine walks the sorted players rather than checking every pair
+
+def make_enemies(count: int, rng: random.Random) -> Dict[str, EnemyModel]:
+    """Enemies dropped in at random places over the cityscape, like GameServer.spawn_enemy."""
+    template = EnemyModel(Vector2(0, 0))
+    enemies = {}
+    for index in range(count):
+        enemy = copy.copy(template)
+        enemy.position = Vector2(rng.uniform(-WORLD_WIDTH / 2, WORLD_WIDTH / 2), rng.uniform(-1500, 0))
+        enemies[f"{index:016x}"] = enemy
+    return enemies
+
+def make_players(tick: int, player_count: int, rng_seed: int = 1) -> List[Vector2]:
+    """Players spread over the cityscape, walking back and forth."""
+    rng = random.Random(rng_seed)
+    players = []
+    for _ in range(player_count):
+        x, speed = rng.uniform(-WORLD_WIDTH / 2, WORLD_WIDTH / 2), rng.uniform(-300, 300)
+        players.append(Vector2(x + speed * DT * tick, rng.uniform(-800, -400)))
+    return players
+
+def update_objects(enemies: Dict[str, EnemyModel], players, terrain: TerrainIndex, grid: PositionGrid) -> Dict[str, dict]:
+    """What GameServer.update_enemies does without the engine."""
+    grid.rebuild(players)
+    enemy_data = {}
+    for id, enemy in enemies.items():
+        if enemy.is_alive:
+            enemy.update(clients_positions=players, terrain=terrain, dt=DT, client_grid=grid)
+        enemy_data[id] = {
+            "position": {"x": enemy.position.x, "y": enemy.position.y},
+            "health": enemy.health,
+            "animation_frame": enemy.current_frame_index,
+            "current_animation": enemy.current_animation,
+            "is_alive": enemy.is_alive
+        }
+    return enemy_data
+
+def update_engine(engine: EnemyEngine, players, terrain: TerrainIndex) -> Dict[str, dict]:
+    engine.update(players, terrain, DT)
+    return engine.enemy_data()
+
+def make_engine(enemies: Dict[str, EnemyModel]) -> EnemyEngine:
+    engine = EnemyEngine()
+    for id, enemy in enemies.items():
+        engine.add(id, enemy)
+    return engine
+
+def check_identical(terrain: TerrainIndex, player_count: int, ticks: int = 600):
+    """Runs both for the same ticks, killing a few enemies on the way, and compares every enemy after each tick."""
+    enemies = make_enemies(CHECKED_ENEMIES, random.Random(0))
+    engine = make_engine(enemies)
+    grid = PositionGrid()
+    for tick in range(ticks):
+        players = make_players(tick, player_count) if tick < ticks // 2 else []  # Everyone leaves halfway through
+        if tick % 50 == 0:
+            id = list(enemies)[tick // 50]
+            for _ in range(4):
+                enemies[id].health -= 25
+                if enemies[id].health <= 0:
+                    enemies[id].die()
+                engine.damage(id, 25)
+
+        object_data = update_objects(enemies, players, terrain, grid)
+        engine_data = update_engine(engine, players, terrain)
+        assert object_data == engine_data, f"Enemies differ after tick {tick}"
+    print(f"Objects and engine match for {CHECKED_ENEMIES} enemies and {player_count} players over {ticks} ticks")
+
+def tick_time(update, player_count: int, ticks: int = 20) -> float:
+    """Returns the median time of one tick in seconds."""
+    times = []
+    for tick in range(ticks):
+        players = make_players(tick, player_count)
+        start = time.perf_counter()
+        update(players)
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2]
+
+def time_objects(count: int, terrain: TerrainIndex, player_count: int) -> float:
+    enemies, grid = make_enemies(count, random.Random(0)), PositionGrid()
+    return tick_time(lambda players: update_objects(enemies, players, terrain, grid), player_count)
+
+def time_engine(count: int, terrain: TerrainIndex, player_count: int) -> float:
+    engine = make_engine(make_enemies(count, random.Random(0)))
+    return tick_time(lambda players: update_engine(engine, players, terrain), player_count)
+
+def time_engine_update(count: int, terrain: TerrainIndex, player_count: int) -> float:
+    engine = make_engine(make_enemies(count, random.Random(0)))
+    return tick_time(lambda players: engine.update(players, terrain, DT), player_count)
+
+def most_in_budget(time_for, terrain: TerrainIndex, player_count: int) -> int:
+    """Doubles the enemy count until a tick no longer fits in TICK_BUDGET, then narrows it down."""
+    low, high = 0, 64
+    while time_for(high, terrain, player_count) < TICK_BUDGET:
+        low, high = high, high * 2
+    while high - low > max(16, low // 20):  # Within 5%
+        middle = (low + high) // 2
+        if time_for(middle, terrain, player_count) < TICK_BUDGET:
+            low = middle
+        else:
+            high = middle
+    return low
+
+if __name__ == "__main__":
+    random.seed(0)
+    terrain = TerrainIndex(GameServer().generateCityscape(WORLD_WIDTH))
+    for player_count in PLAYER_COUNTS:
+        check_identical(terrain, player_count)
+
+    for player_count in PLAYER_COUNTS:
+        print(f"\nOne tick with {player_count} players")
+        print(f"{'enemies':>8} {'objects ms':>11} {'engine ms':>10} {'speedup':>8} {'update only ms':>15}")
+        for count in ENEMY_COUNTS:
+            objects, engine = time_objects(count, terrain, player_count), time_engine(count, terrain, player_count)
+            update_only = time_engine_update(count, terrain, player_count)
+            print(f"{count:>8} {objects * 1000:>11.2f} {engine * 1000:>10.2f} {objects / engine:>7.1f}x {update_only * 1000:>15.2f}")
+
+        print(f"\nMost enemies updated within a {TICK_BUDGET * 1000:.1f} ms tick with {player_count} players")
+        print(f"{'objects':>18}: {most_in_budget(time_objects, terrain, player_count)}")
+        print(f"{'engine':>18}: {most_in_budget(time_engine, terrain, player_count)}")
+        print(f"{'engine update only':>18}: {most_in_budget(time_engine_update, terrain, player_count)}")
@@ -0,0 +1,45 @@
+## Measures how long the server takes to import, with python -X importtime
+## Each module is imported in a fresh interpreter a few times and the fastest run is kept. Server is
+## what a dedicated server imports, GameConstants is what the client imports and what the server
+## used to import before it was split off into GameModel. Lists the slowest imports under each, by
+## their own time, and which display libraries got imported. Runs on SDL's dummy video driver, so
+## no window is opened.
+##
+## Usage: python Benchmarks/ImportTime.py [module ...]
+
+import os, re, subprocess, sys
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent.parent
+MODULES = ["Server", "GameConstants"]
+RUNS = 5
+SLOWEST = 8
+DISPLAY_LIBRARIES = ["pygame", "PIL", "tkinter"]
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def import_times(module: str) -> dict:
+    """Returns module name -> (self, cumulative) microseconds of the fastest of RUNS imports."""
+    env = dict(os.environ, SDL_VIDEODRIVER=os.environ.get("SDL_VIDEODRIVER", "dummy"), PYGAME_HIDE_SUPPORT_PROMPT="1")
+    best = None
+    for _ in range(RUNS):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=HERE, env=env,
+                                capture_output=True, text=True, check=True)
+        times = {}
+        for match in LINE.finditer(result.stderr):
+            times[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+        if best is None or times[module][1] < best[module][1]:
+            best = times
+    return best
+
+def main():
+    for module in sys.argv[1:] or MODULES:
+        times = import_times(module)
+        loaded = [library for library in DISPLAY_LIBRARIES if library in times]
+        print(f"import {module}: {times[module][1] / 1000:.1f} ms, {len(times)} modules, "
+              f"display libraries: {', '.join(loaded) or 'none'}")
+        print(f"  {'self ms':>8}  {'total ms':>8}  slowest imports")
+        for name, (own, cumulative) in sorted(times.items(), key=lambda item: -item[1][0])[:SLOWEST]:
+            print(f"  {own / 1000:8.1f}  {cumulative / 1000:8.1f}  {name}")
+
+if __name__ == "__main__":
+    main()
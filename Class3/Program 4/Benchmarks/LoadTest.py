@@ -0,0 +1,158 @@
+## Load test for the game server
+## Starts a server in a separate process and connects more and more simulated clients to it,
+## each sending a ClientPacket 60 times a second, to find how many clients one server can hold.
+## A client "holds" when it receives (almost) every world snapshot the server pushes, SNAPSHOT_RATE
+## a second, which is less than the rate clients send at.
+##
+## Usage: python Benchmarks/LoadTest.py --mode both --clients 8 16 32 64 128
+
+import argparse, asyncio, json, multiprocessing, socket, struct, subprocess, sys, time
+from pathlib import Path
+
+PROGRAM_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROGRAM_DIR))
+
+from Server import SNAPSHOT_RATE
+
+SEND_RATE = 60  # Packets per second each simulated client tries to send
+HOLD_RATIO = 0.95  # A client "holds" the snapshot rate if it gets at least this share of the snapshots
+
+def make_client_packet(index: int) -> bytes:
+    """Builds the same JSON ClientPacket that Client.py sends."""
+    return json.dumps({
+        "username": f"LoadTest{index}",
+        "position": {"x": (index * 37) % 5000 - 2500, "y": -400},
+        "gameData": {
+            "HP": 100,
+            "facing_right": True,
+            "current_animation": "Idle",
+            "current_frame_index": 0,
+            "last_frame_time": 0,
+            "player_scale": 3,
+            "velocity": 5,
+            "velocity_y": 0,
+            "grounded": True,
+            "movement_disabled": False,
+            "animation_in_progress": False,
+            "current_weapon": None
+        }
+    }).encode('utf-8')
+
+async def read_packet(reader: asyncio.StreamReader) -> bytes:
+    """Reads one length-prefixed packet from the server."""
+    raw_length = await reader.readexactly(4)
+    return await reader.readexactly(struct.unpack('!I', raw_length)[0])
+
+async def send_packets(writer: asyncio.StreamWriter, framed_packet: bytes, duration: float):
+    """Sends the same packet at SEND_RATE, never bursting to catch up on missed sends."""
+    interval = 1 / SEND_RATE
+    start = time.perf_counter()
+    next_send = start
+    while time.perf_counter() - start < duration:
+        writer.write(framed_packet)
+        await writer.drain()
+        next_send = max(next_send + interval, time.perf_counter())
+        await asyncio.sleep(next_send - time.perf_counter())
+
+async def simulated_client(index: int, host: str, port: int, duration: float, stats: list):
+    """Connects one fake player, sends packets at SEND_RATE and counts the snapshots it gets back."""
+    # Every client connects from its own loopback address since the server rejects duplicate IPs
+    source_ip = f"127.0.{index // 250}.{index % 250 + 2}"
+    sock = socket.create_connection((host, port), source_address=(source_ip, 0))
+    reader, writer = await asyncio.open_connection(sock=sock, limit=2 ** 24)
+    await read_packet(reader)  # Entry message
+
+    packet = make_client_packet(index)
+    sender = asyncio.create_task(send_packets(writer, struct.pack('!I', len(packet)) + packet, duration))
+    snapshots, gaps = 0, []
+
+    start = time.perf_counter()
+    last_arrival = None
+    try:
+        while time.perf_counter() - start < duration:
+            await read_packet(reader)
+            arrival = time.perf_counter()
+            if last_arrival is not None:
+                gaps.append(arrival - last_arrival)
+            last_arrival = arrival
+            snapshots += 1
+    except (ConnectionError, OSError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        sender.cancel()
+        writer.close()
+    stats.append((snapshots / duration, gaps))
+
+def run_worker(first_index: int, count: int, host: str, port: int, duration: float, results):
+    """Runs a batch of simulated clients on one event loop inside a worker process."""
+    async def main():
+        stats = []
+        await asyncio.gather(*(simulated_client(first_index + i, host, port, duration, stats) for i in range(count)))
+        return stats
+    results.extend(asyncio.run(main()))
+
+def run_step(client_count: int, host: str, port: int, duration: float, workers: int):
+    """Runs one load step and returns (clients holding the snapshot rate, mean Hz, p99 snapshot gap in ms)."""
+    with multiprocessing.Manager() as manager:
+        results = manager.list()
+        per_worker = -(-client_count // workers)
+        processes = []
+        for first in range(0, client_count, per_worker):
+            count = min(per_worker, client_count - first)
+            process = multiprocessing.Process(target=run_worker, args=(first, count, host, port, duration, results))
+            process.start()
+            processes.append(process)
+        for process in processes:
+            process.join()
+        results = list(results)
+
+    rates = [rate for rate, _ in results]
+    gaps = sorted(gap for _, client_gaps in results for gap in client_gaps)
+    holding = sum(1 for rate in rates if rate >= SNAPSHOT_RATE * HOLD_RATIO)
+    mean_rate = sum(rates) / len(rates) if rates else 0
+    p99 = gaps[int(len(gaps) * 0.99)] * 1000 if gaps else float('nan')
+    return holding, mean_rate, p99
+
+def wait_for_server(host: str, port: int, timeout: float = 20):
+    """Waits until the server is accepting connections."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f"Server on {host}:{port} did not start")
+
+def run_mode(mode: str, client_counts, host: str, port: int, duration: float, workers: int):
+    print(f"\n=== {mode} server ===")
+    print(f"{'clients':>8} {f'holding {SNAPSHOT_RATE}Hz':>13} {'mean Hz':>8} {'p99 gap ms':>11}")
+    server = subprocess.Popen([sys.executable, "Server.py", "--ip", host, "--port", str(port), "--mode", mode], cwd=PROGRAM_DIR)
+    try:
+        wait_for_server(host, port)
+        time.sleep(1)  # Let the connection from wait_for_server be cleaned up
+        best = 0
+        for client_count in client_counts:
+            holding, mean_rate, p99 = run_step(client_count, host, port, duration, workers)
+            print(f"{client_count:>8} {holding:>13} {mean_rate:>8.1f} {p99:>11.1f}")
+            if holding == client_count:
+                best = client_count
+            time.sleep(1)  # Let disconnected clients be cleaned up before the next step
+        print(f"Largest step where every client held {SNAPSHOT_RATE} Hz: {best}")
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Finds how many simulated clients one server process can hold at its snapshot rate.")
+    parser.add_argument("--mode", choices=["threaded", "asyncio", "both"], default="both")
+    parser.add_argument("--clients", type=int, nargs="+", default=[8, 16, 32, 64, 128, 256])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=44300)
+    parser.add_argument("--duration", type=float, default=5, help="Seconds per load step")
+    parser.add_argument("--workers", type=int, default=4, help="Processes used to simulate clients")
+    args = parser.parse_args()
+
+    modes = ["threaded", "asyncio"] if args.mode == "both" else [args.mode]
+    for offset, mode in enumerate(modes):
+        run_mode(mode, args.clients, args.host, args.port + offset, args.duration, args.workers)
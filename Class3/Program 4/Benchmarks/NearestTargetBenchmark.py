@@ -0,0 +1,68 @@
+## Compares the ways enemies can pick the nearest player to chase
+## The old way runs min() over every player for every enemy. PositionGrid is rebuilt once per
+## tick and each enemy only looks at the buckets near it, which is what GameServer does without
+## NumPy. With NumPy, EnemyEngine sorts the players by x once and walks all the enemies outwards
+## from their place among them at once, or checks every pair when there are only a few. Reports the
+## time of one tick's target selection for every enemy, with enemies and players spread over the
+## 8000 px cityscape.
+##
+## Usage: python Benchmarks/NearestTargetBenchmark.py
+
+import sys, random, timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pygame
+from SpatialIndex import PositionGrid
+from EnemyEngine import EnemyEngine
+
+WORLD_WIDTH = 8000
+ENEMY_COUNTS = [10, 100, 1000]
+PLAYER_COUNTS = [1, 16, 128]
+
+def random_positions(count: int, rng: random.Random):
+    return [pygame.Vector2(rng.uniform(-WORLD_WIDTH / 2, WORLD_WIDTH / 2), rng.uniform(-800, -300)) for _ in range(count)]
+
+def targets_with_min(enemies, players):
+    """What Enemy.chase_nearest_client used to do for every enemy."""
+    return [min(players, key=lambda pos: enemy.distance_to(pos)) for enemy in enemies]
+
+def targets_with_grid(enemies, players, grid: PositionGrid):
+    grid.rebuild(players)
+    return [grid.nearest(enemy.x, enemy.y) for enemy in enemies]
+
+def targets_with_engine(engine: EnemyEngine, enemy_x, enemy_y, players):
+    client_x = np.array([position.x for position in players], dtype=np.float64)
+    client_y = np.array([position.y for position in players], dtype=np.float64)
+    return engine._nearest_clients(enemy_x, enemy_y, client_x, client_y)
+
+def measure(function, *args) -> float:
+    """Returns the average time of one call in microseconds."""
+    timer = timeit.Timer(lambda: function(*args))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e6
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    grid = PositionGrid()
+    engine = EnemyEngine()
+
+    print(f"{'enemies':>8} {'players':>8} {'min() us':>10} {'grid us':>10} {'speedup':>8} {'engine us':>10}")
+    for enemy_count in ENEMY_COUNTS:
+        for player_count in PLAYER_COUNTS:
+            enemies = random_positions(enemy_count, rng)
+            players = random_positions(player_count, rng)
+            enemy_x = np.array([enemy.x for enemy in enemies], dtype=np.float64)
+            enemy_y = np.array([enemy.y for enemy in enemies], dtype=np.float64)
+
+            # Both must pick a player at the same distance (ties may pick different players)
+            for enemy, brute, indexed in zip(enemies, targets_with_min(enemies, players), targets_with_grid(enemies, players, grid)):
+                assert enemy.distance_to(brute) == enemy.distance_to(indexed)
+            assert [players[index] for index in targets_with_engine(engine, enemy_x, enemy_y, players)] == targets_with_min(enemies, players)
+
+            brute_time = measure(targets_with_min, enemies, players)
+            grid_time = measure(targets_with_grid, enemies, players, grid)
+            engine_time = measure(targets_with_engine, engine, enemy_x, enemy_y, players)
+            print(f"{enemy_count:>8} {player_count:>8} {brute_time:>10.1f} {grid_time:>10.1f} {brute_time / grid_time:>7.2f}x {engine_time:>10.1f}")
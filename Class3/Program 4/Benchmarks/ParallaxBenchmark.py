@@ -0,0 +1,74 @@
+## Compares drawing the parallax background the old way with the ParallaxRenderer
+## The old way blits every layer, scaled to twice the screen and with its alpha, twice a frame.
+## The renderer draws strips cut down to what shows on screen, without alpha where nothing is
+## transparent. First checks that both draw the same pixels as the player walks along, then reports
+## the time of one background on a 1920x1080 screen. Runs on SDL's dummy video driver.
+##
+## Usage: python Benchmarks/ParallaxBenchmark.py
+
+import os, sys, time
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pygame
+from Parallax import PARALLAX_LAYERS, load_background
+
+RESOLUTION = (1920, 1080)
+SCALE_FACTOR = 2
+BACKGROUNDS = Path(__file__).resolve().parent.parent / "Sprites" / "Game" / "backgrounds"
+FRAMES = 300
+PLAYER_XS = [x * 37 - 3000 for x in range(200)]  # Walking across the world, both sides of 0
+
+def load_layers_uncached(screen_size):
+    """What Gameplay._load_background_layers did: (image, width) by layer number."""
+    layers = {}
+    for i in range(1, PARALLAX_LAYERS + 1):
+        path = BACKGROUNDS / f"{i}.png"
+        if path.exists():
+            image = pygame.transform.scale(pygame.image.load(path).convert_alpha(), (screen_size[0] * SCALE_FACTOR, screen_size[1] * SCALE_FACTOR))
+            layers[i] = (image, image.get_width())
+    return layers
+
+def render_uncached(screen: pygame.Surface, layers, player_x: float):
+    """What Gameplay.parallax_render and _render_layer did."""
+    for i, (layer, layer_width) in layers.items():
+        offset = player_x * (i * 0.1) % layer_width
+        vertical_offset = int(RESOLUTION[1] // 2 * (i * 0.1))
+        screen.blit(layer, (-offset, -vertical_offset))
+        screen.blit(layer, (layer_width - offset, -vertical_offset))
+
+def time_frames(render, screen: pygame.Surface) -> float:
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        screen.fill((0, 0, 0))
+        render(screen, PLAYER_XS[frame % len(PLAYER_XS)])
+    return (time.perf_counter() - start) / FRAMES
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode(RESOLUTION)
+    layers = load_layers_uncached(RESOLUTION)
+    background = load_background(BACKGROUNDS, RESOLUTION, SCALE_FACTOR)
+
+    mismatched = 0
+    for player_x in PLAYER_XS:
+        screen.fill((0, 0, 0))
+        render_uncached(screen, layers, player_x)
+        expected = pygame.image.tobytes(screen, "RGB")
+        screen.fill((0, 0, 0))
+        background.render(screen, player_x)
+        mismatched += pygame.image.tobytes(screen, "RGB") != expected
+    print(f"{len(layers)} layers drawn as {len(background)} strips, {mismatched} of {len(PLAYER_XS)} positions drew different pixels")
+    for strip, speed, y in background.strips:
+        print(f"  speed {speed:.1f}: {strip.get_width()}x{strip.get_height()} at y {y}, {'alpha' if strip.get_flags() & pygame.SRCALPHA else 'opaque'}")
+
+    uncached = time_frames(lambda screen, player_x: render_uncached(screen, layers, player_x), screen)
+    cached = time_frames(background.render, screen)
+    print(f"old:      {uncached * 1000:.2f} ms a frame, {1 / uncached:.0f} fps")
+    print(f"renderer: {cached * 1000:.2f} ms a frame, {1 / cached:.0f} fps ({uncached / cached:.1f}x)")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+## Compares the JSON and binary protocols from Protocol.py
+## Reports bytes per packet and encode/decode time in microseconds for a ClientPacket and for
+## full snapshots with different numbers of players and enemies, then the bytes sent per tick
+## with the old full JSON snapshot (terrain included) against deltas on the 8000 px cityscape.
+##
+## Usage: python Benchmarks/ProtocolBenchmark.py
+
+import sys, timeit, json
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Protocol import *
+from Server import GameServer
+
+def make_client_packet(index: int) -> ClientPacket:
+    """A client packet like the ones Client.py sends while running with a weapon equipped."""
+    return ClientPacket(
+        username=f"Player{index}",
+        position=Position(123.456 + index * 40, -412.5),
+        gameData=GameData(
+            HP=100,
+            facing_right=index % 2 == 0,
+            current_animation="Run",
+            current_frame_index=index % 8,
+            last_frame_time=123456,
+            player_scale=3,
+            velocity=5,
+            velocity_y=-12.5,
+            grounded=True,
+            movement_disabled=False,
+            current_weapon=WeaponData(name="Iron Sword", range=150, damage=25),
+            animation_in_progress=False
+        )
+    )
+
+def make_enemy_data(index: int, tick: int = 0) -> dict:
+    """One of GameServer.enemy_data's records for a running enemy."""
+    return {
+        "position": {"x": index * 150.25 + tick * 2.5, "y": -350.5},
+        "health": 100,
+        "animation_frame": (index + tick // 6) % 11,
+        "current_animation": "Run",
+        "is_alive": True
+    }
+
+def make_world(client_count: int, enemy_count: int, tick: int = 0) -> Tuple[Dict[str, ClientPacket], Dict[str, dict]]:
+    """The players and enemies the server would have on a given tick, with only some of them moving."""
+    clients = {}
+    for index in range(client_count):
+        packet = make_client_packet(index)
+        if index % 4 == 0:  # A quarter of the players are running, the rest stand still
+            packet.position.x += tick * 5
+            packet.gameData.current_frame_index = (index + tick // 6) % 8
+            packet.gameData.last_frame_time += tick // 6 * 100
+        clients[f"192.168.1.{index + 2}"] = packet
+    enemies = {f"{index:016x}": make_enemy_data(index, tick) for index in range(enemy_count)}
+    return clients, enemies
+
+def make_state(clients: Dict[str, ClientPacket], enemies: Dict[str, dict]) -> WorldState:
+    return WorldState(
+        clients={addr: client_fields(packet) for addr, packet in clients.items()},
+        enemies={id: enemy_fields(enemy) for id, enemy in enemies.items()}
+    )
+
+def encode_legacy_snapshot(terrain, clients: Dict[str, ClientPacket], enemies: Dict[str, dict]) -> bytes:
+    """The full JSON ServerPacket the server used to send every tick, terrain and all."""
+    return json.dumps({
+        "terrain": terrain,
+        "clients_data": json.dumps({addr: json.dumps(client_packet_to_dict(packet)) for addr, packet in clients.items()}),
+        "enemy_data": enemies
+    }).encode('utf-8')
+
+def measure(function, *args) -> float:
+    """Returns the average time of one call in microseconds."""
+    timer = timeit.Timer(lambda: function(*args))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e6
+
+def report(name: str, codecs, packet, encode: str, decode: str):
+    print(f"\n{name}")
+    print(f"{'protocol':>10} {'bytes':>8} {'encode us':>10} {'decode us':>10}")
+    for codec in codecs:
+        data = getattr(codec, encode)(packet)
+        encode_time = measure(getattr(codec, encode), packet)
+        decode_time = measure(getattr(codec, decode), data)
+        print(f"{codec.name:>10} {len(data):>8} {encode_time:>10.1f} {decode_time:>10.1f}")
+
+def report_bandwidth(codecs, terrain, client_count: int, enemy_count: int, ticks: int = 60):
+    """Prints the average bytes per tick sent to one client that acknowledges every snapshot."""
+    legacy = sum(len(encode_legacy_snapshot(terrain, *make_world(client_count, enemy_count, tick))) for tick in range(1, ticks + 1))
+    print(f"\nBytes per tick, {client_count} players, {enemy_count} enemies")
+    print(f"{'protocol':>10} {'full':>8} {'delta':>8}")
+    print(f"{'legacy':>10} {legacy // ticks:>8} {'':>8}")
+
+    states = {tick: make_state(*make_world(client_count, enemy_count, tick)) for tick in range(ticks + 1)}
+    for codec in codecs:
+        full = len(codec.encode_snapshot(diff_states(None, states[ticks], ticks, 0)))
+        delta = sum(len(codec.encode_snapshot(diff_states(states[tick - 1], states[tick], tick, tick - 1))) for tick in range(1, ticks + 1))
+        print(f"{codec.name:>10} {full:>8} {delta // ticks:>8}")
+
+if __name__ == "__main__":
+    codecs = [JsonCodec(), BinaryCodec(build_animation_table())]
+    terrain = GameServer().generateCityscape(8000)
+
+    report("ClientPacket", codecs, make_client_packet(0), "encode_client_packet", "decode_client_packet")
+    for client_count, enemy_count in [(1, 2), (8, 2), (32, 50), (128, 200)]:
+        delta = diff_states(None, make_state(*make_world(client_count, enemy_count)), 1, 0)
+        report(f"Full snapshot, {client_count} players, {enemy_count} enemies", codecs, delta, "encode_snapshot", "decode_snapshot")
+
+    for client_count, enemy_count in [(1, 2), (8, 2), (32, 50), (128, 200)]:
+        report_bandwidth(codecs, terrain, client_count, enemy_count)
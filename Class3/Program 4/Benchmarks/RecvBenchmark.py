@@ -0,0 +1,64 @@
+## Compares the two ways of receiving length-prefixed frames
+## The old recv_exact built every frame with `data += packet`, one recv per chunk. FrameReader
+## receives into one reusable buffer with recv_into and hands back memoryview slices of it.
+## Frames are streamed through a local socket pair and the receive time per frame is reported.
+##
+## Usage: python Benchmarks/RecvBenchmark.py
+
+import sys, socket, struct, threading, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Protocol import FrameReader
+
+FRAME_SIZES = [1024, 16 * 1024, 256 * 1024]
+TOTAL_BYTES = 64 * 1024 * 1024  # Roughly how much is streamed for each frame size
+
+def recv_exact(sock: socket.socket, length: int) -> bytes:
+    """The receive loop NetworkServer used before FrameReader."""
+    data = b''
+    while len(data) < length:
+        packet = sock.recv(length - len(data))
+        if not packet:
+            return None
+        data += packet
+    return data
+
+def read_with_recv_exact(sock: socket.socket, count: int):
+    for _ in range(count):
+        message_length = struct.unpack('!I', recv_exact(sock, 4))[0]
+        recv_exact(sock, message_length)
+
+def read_with_frame_reader(sock: socket.socket, count: int):
+    reader = FrameReader(sock)
+    for _ in range(count):
+        reader.read_frame()
+
+def measure(read_frames, frame_size: int) -> float:
+    """Returns the average time to receive one frame in microseconds."""
+    count = max(TOTAL_BYTES // frame_size, 100)
+    frame = struct.pack('!I', frame_size) + bytes(frame_size)
+    sender_sock, receiver_sock = socket.socketpair()
+
+    def send():
+        for _ in range(count):
+            sender_sock.sendall(frame)
+
+    sender = threading.Thread(target=send, daemon=True)
+    start = time.perf_counter()
+    sender.start()
+    read_frames(receiver_sock, count)
+    elapsed = time.perf_counter() - start
+    sender.join()
+
+    sender_sock.close()
+    receiver_sock.close()
+    return elapsed / count * 1e6
+
+if __name__ == "__main__":
+    print(f"{'frame':>8} {'recv_exact us':>14} {'FrameReader us':>15} {'speedup':>8}")
+    for frame_size in FRAME_SIZES:
+        legacy = measure(read_with_recv_exact, frame_size)
+        pooled = measure(read_with_frame_reader, frame_size)
+        print(f"{frame_size // 1024:>6}KB {legacy:>14.1f} {pooled:>15.1f} {legacy / pooled:>7.2f}x")
@@ -0,0 +1,71 @@
+## Compares drawing the game's text with and without the TextCache
+## Draws what Gameplay puts on screen as text with 32 players connected: a username above every
+## remote player (drawOtherClients) and the debug overlay, which lists every other client, the
+## way Client.py did before the cache (SysFont and render every frame) and through text_cache.
+## Reports the time of one drawn frame and the frame rate it allows. The FPS line changes every
+## frame, like the real one. Runs on SDL's dummy video driver, so no window is opened.
+##
+## Usage: python Benchmarks/TextBenchmark.py
+
+import os, sys, time
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pygame
+from TextCache import text_cache
+
+RESOLUTION = (1920, 1080)
+PLAYER_COUNT = 32
+FRAMES = 300
+BLACK = (0, 0, 0)
+DEBUG_COLOR = (128, 128, 128)
+DEBUG_FONT_SIZE = 24
+
+def overlay_lines(usernames, frame: int):
+    """The debug overlay's lines, as Debugger.display_debug_info builds them."""
+    lines = [f"FPS: {60 + frame % 7 / 10:.1f}", "Ping: 3ms", "Server: 127.0.0.1:5555", "Connected Clients:"]
+    for index, username in enumerate(usernames[1:]):
+        lines += [f"User: {username}", f"IP: 127.0.0.1:{50000 + index}", "---"]
+    return lines
+
+def draw_uncached(screen: pygame.Surface, usernames, frame: int):
+    for index, username in enumerate(usernames[1:]):
+        font = pygame.font.SysFont(None, 40)
+        screen.blit(font.render(username, True, BLACK), (index * 55, 500))
+
+    debug_font = pygame.font.Font(None, DEBUG_FONT_SIZE)  # Made once in Debugger.__init__
+    for index, line in enumerate(overlay_lines(usernames, frame)):
+        screen.blit(debug_font.render(line, True, DEBUG_COLOR), (10, index * DEBUG_FONT_SIZE))
+
+def draw_cached(screen: pygame.Surface, usernames, frame: int):
+    for index, username in enumerate(usernames[1:]):
+        screen.blit(text_cache.render(text_cache.font(None, 40), username, BLACK), (index * 55, 500))
+
+    debug_font = text_cache.font(None, DEBUG_FONT_SIZE)
+    for index, line in enumerate(overlay_lines(usernames, frame)):
+        screen.blit(text_cache.render(debug_font, line, DEBUG_COLOR), (10, index * DEBUG_FONT_SIZE))
+
+def time_frames(draw, screen: pygame.Surface, usernames) -> float:
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        screen.fill((255, 255, 255))
+        draw(screen, usernames, frame)
+    return (time.perf_counter() - start) / FRAMES
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode(RESOLUTION)
+    usernames = [f"Player{index}" for index in range(PLAYER_COUNT)]
+
+    uncached = time_frames(draw_uncached, screen, usernames)
+    cached = time_frames(draw_cached, screen, usernames)
+    print(f"{PLAYER_COUNT} players, {len(overlay_lines(usernames, 0)) + PLAYER_COUNT - 1} strings a frame")
+    print(f"uncached: {uncached * 1000:.2f} ms a frame, {1 / uncached:.0f} fps")
+    print(f"cached:   {cached * 1000:.2f} ms a frame, {1 / cached:.0f} fps ({uncached / cached:.1f}x)")
+    print(f"{len(text_cache)} strings and {len(text_cache.fonts)} fonts kept, {text_cache.hits} hits, {text_cache.misses} misses")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+## Profiles the server tick thread with different ways of keeping client state
+##   raw json:     the original server, storing each client's raw JSON and parsing it every tick
+##   packets:      storing decoded ClientPackets and flattening them for the snapshot every tick
+##   client state: ClientState records, decoded and flattened once when a packet arrives
+## Every variant runs the rest of the tick the same way (enemies, snapshot, one delta per client).
+## Reports the CPU time of one tick and the share of a core the tick thread needs at 60 Hz, then
+## a cProfile of the raw json and client state ticks.
+##
+## Usage: python Benchmarks/TickProfile.py
+
+import sys, cProfile, io, json, pstats, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Server import GameServer, TickSnapshot, TICK_RATE
+from WorldStore import ClientState
+from SpatialIndex import TerrainIndex
+from GameModel import *
+from Protocol import *
+
+CLIENT_COUNTS = [8, 32, 128]
+TICKS = 300
+
+def make_client_packet(index: int) -> ClientPacket:
+    return ClientPacket(
+        username=f"Player{index}",
+        position=Position(index * 60.0 - 4000, -500.0),
+        gameData=GameData(
+            HP=100, facing_right=True, current_animation="Run", current_frame_index=index % 8,
+            last_frame_time=123456, player_scale=3, velocity=5, velocity_y=0, grounded=True,
+            movement_disabled=False, current_weapon=WeaponData(name="Iron Sword", range=150, damage=25),
+            animation_in_progress=False
+        )
+    )
+
+class TickHarness():
+    """The work NetworkServer.simulate_tick does, with the client state kept in one of three ways."""
+
+    def __init__(self, variant: str, client_count: int):
+        self.variant = variant
+        self.gameServer = GameServer()
+        self.gameServer.terrain = self.gameServer.generateCityscape(8000)
+        self.gameServer.terrain_index = TerrainIndex(self.gameServer.terrain)
+        for x in range(-3500, 3500, 700):
+            self.gameServer.spawn_enemy(Vector2(x, 0))
+
+        self.codecs = {PROTOCOL_BINARY: BinaryCodec(build_animation_table()), PROTOCOL_JSON: JsonCodec()}
+        self.history = SnapshotHistory()
+        self.tick = 0
+
+        # What the receiving threads would have stored for each client
+        packets = {f"10.0.0.{index + 2}": make_client_packet(index) for index in range(client_count)}
+        if variant == "raw json":
+            self.clients = {addr: json.dumps(client_packet_to_dict(packet)) for addr, packet in packets.items()}
+        elif variant == "packets":
+            self.clients = packets
+        else:
+            self.clients = {addr: ClientState.from_packet(packet, PROTOCOL_JSON) for addr, packet in packets.items()}
+
+    def client_positions(self) -> List[Vector2]:
+        if self.variant == "raw json":
+            positions = []
+            for raw in list(self.clients.values()):
+                data = json.loads(raw)
+                positions.append(Vector2(data["position"]["x"], data["position"]["y"]))
+            return positions
+        if self.variant == "packets":
+            return [Vector2(packet.position.x, packet.position.y) for packet in list(self.clients.values())]
+        return [clientState.position for clientState in list(self.clients.values())]
+
+    def client_fields(self) -> Dict[str, tuple]:
+        if self.variant == "raw json":
+            return {addr: client_fields(client_packet_from_dict(json.loads(raw))) for addr, raw in list(self.clients.items())}
+        if self.variant == "packets":
+            return {addr: client_fields(packet) for addr, packet in list(self.clients.items())}
+        return {addr: clientState.fields for addr, clientState in list(self.clients.items())}
+
+    def run_tick(self):
+        self.tick += 1
+        self.gameServer.update_enemies(self.client_positions(), 1 / TICK_RATE)
+        state = WorldState(
+            clients=self.client_fields(),
+            enemies={id: enemy_fields(enemy) for id, enemy in self.gameServer.enemy_data.items()}
+        )
+        self.history.record(self.tick, state)
+        snapshot = TickSnapshot(self.tick, state, {}, self.history, self.codecs)
+        for _ in self.clients:  # Every client acknowledged the previous tick
+            snapshot.payload_for(PROTOCOL_JSON, self.tick - 1)
+
+def cpu_per_tick(harness: TickHarness) -> float:
+    """Returns the tick thread's CPU time for one tick in seconds."""
+    for _ in range(10):
+        harness.run_tick()  # Warm up
+    start = time.thread_time()
+    for _ in range(TICKS):
+        harness.run_tick()
+    return (time.thread_time() - start) / TICKS
+
+def profile(harness: TickHarness, limit: int = 12):
+    profiler = cProfile.Profile()
+    profiler.enable()
+    for _ in range(TICKS):
+        harness.run_tick()
+    profiler.disable()
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(limit)
+    print(output.getvalue())
+
+if __name__ == "__main__":
+    variants = ["raw json", "packets", "client state"]
+    print(f"{'clients':>8} " + " ".join(f"{variant + ' ms':>16} {'share':>6}" for variant in variants))
+    for client_count in CLIENT_COUNTS:
+        row = f"{client_count:>8} "
+        for variant in variants:
+            cpu = cpu_per_tick(TickHarness(variant, client_count))
+            row += f"{cpu * 1000:>16.3f} {cpu * TICK_RATE:>6.1%} "
+        print(row)
+
+    for variant in ["raw json", "client state"]:
+        print(f"\n=== cProfile, {variant}, {CLIENT_COUNTS[-1]} clients, {TICKS} ticks ===")
+        profile(TickHarness(variant, CLIENT_COUNTS[-1]))
@@ -3,16 +3,28 @@ import threading, json, time, re, os
 import pygame
 from pathlib import Path
 from abc import ABC, abstractmethod
-from typing import Optional, Tuple
+from typing import Callable, List, Optional, Tuple
+from concurrent.futures import Future
 from collections import deque
 
 from GameConstants import *
 from Weapons import *
+from Protocol import *
+from SpatialIndex import TerrainIndex
+from Interpolation import InterpolationBuffer
+from Movement import MovementPredictor, PlayerInput, PlayerState
+from EnemyPool import EnemyPool
+from TextCache import text_cache
+from Parallax import load_background
+from DirtyRects import DirtyRegions, MENU_FPS
+from Assets import assets, ready
+from SoundBank import SoundBank, MASTER
 
 ## Pygame setup
 pygame.init()
 pygame.mixer.init()
 screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), flags=pygame.FULLSCREEN)
+
 current_scene = None
 clock = pygame.time.Clock()
 running = True
@@ -22,10 +34,22 @@ dt = 0
 sound_folder = Path(__file__).parent / 'Sound'
 music_folder = sound_folder / 'Music'
 sfx_folder = sound_folder / 'SFX'
+sound_bank = SoundBank()
 
 # Menu GFX
 sprites_folder = Path(__file__).parent / 'Sprites'
 
+# Start loading every asset in the background, each scene only waits for the ones it needs.
+# Player and enemy animations are loaded now rather than the first time they play.
+menu_background_frames = assets.frames(sprites_folder / "Game" / "menu_background", screen.get_size())
+gameplay_background = assets.call("gameplay background", load_background, sprites_folder / "Game" / "backgrounds", (SCREEN_WIDTH, SCREEN_HEIGHT), 2, screen.get_size())
+gameplay_assets = [
+    assets.call("player sprites", sprite_atlas.preload, sprites_folder / "Player", PLAYER_FRAME_SIZE),
+    assets.call("enemy sprites", sprite_atlas.preload, sprites_folder / "Enemies", ENEMY_FRAME_SIZE),
+    gameplay_background,
+    assets.call("sound effects", sound_bank.load, sfx_folder, "weapons")
+]
+
 current_music = None
 
 def SwitchMusic(newMusic, looped: bool):
@@ -56,42 +80,94 @@ class NetworkClient:
         self.gameClient = gameClient
         self.connection = None
         self.connected = False
+        self.closing = False  # Set when we disconnect on purpose so we don't try to reconnect
         self.reconnect_attempts = 0
         self.max_reconnect_attempts = 3
+        self.snapshot_history = SnapshotHistory()  # World states the server may send deltas against
+        self.last_snapshot_tick = 0  # Acknowledged with every packet we send, 0 asks for a full snapshot
+        self.pending_attacks = deque()  # Attack packets waiting for the send thread
+        self.pending_inputs = deque()  # Inputs the player has run that the send thread hasn't sent yet
+        self.inputs_started = False
+        self.input_start: Optional[PlayerState] = None  # Where the player was before the first input sent on this connection
+        self.client_id = host  # Our key in snapshots, the server tells us when we join
+        self.own_state: Optional[Tuple[int, PlayerState, int]] = None  # (tick, state, last input run) the server last sent for us
+        self.interpolation = InterpolationBuffer()  # Where to draw remote players and enemies
         self.connect_to_server()
         self.network_thread = threading.Thread(target=self.run_network, daemon=True)
         self.network_thread.start()
+        self.send_thread = threading.Thread(target=self.run_send_loop, daemon=True)
+        self.send_thread.start()
 
     def run_network(self):
         """
-        The main network loop runs in a separate thread, continuously sending
-        and receiving data from the server.
+        The main network loop runs in a separate thread, continuously receiving
+        the world snapshots the server pushes every tick.
         """
         while self.connected:
             try:
-                # Send data to the server
+                # Receive data from the server
+                rawdata = self.recv_packet()
+
+                # Deserialize and update server data (including enemy data)
+                serverPacket = self.deserialize_server_data(rawdata)
+                if serverPacket is not None:
+                    self.gameClient.server_data = serverPacket
+
+            except (socket.error, OSError, ConnectionError) as e:
+                if self.closing:
+                    break
+                print(f"Network error: {e}")
+                self.connected = False
+                self.reconnect_to_server()
+
+    def run_send_loop(self):
+        """
+        Sends the player's state to the server every 10 ms, independently of
+        when snapshots arrive. Reconnecting is left to the receiving thread.
+        """
+        while self.network_thread.is_alive():
+            if self.connected:
                 newPacket = self.serialize_client_data(
                     ClientPacket(
                         username=self.gameClient.username,
                         position=self.gameClient.position,
-                        gameData=self.gameClient.gameData
+                        gameData=self.gameClient.gameData,
+                        ack=self.last_snapshot_tick
                     )
                 )
                 self.send_with_length_prefix(newPacket)
 
-                # Receive data from the server
-                rawdata = self.connection.recv(10240)
-                if not rawdata:
-                    raise ConnectionError("Server closed")
+                # Inputs and attacks go after our state, inputs first so attacks are checked from where they moved us
+                inputs = []
+                while self.pending_inputs:
+                    inputs.append(self.pending_inputs.popleft())
+                if inputs:
+                    self.send_with_length_prefix(encode_input_packet(inputs, self.input_start))
+                    self.input_start = None
+                while self.pending_attacks:
+                    self.send_with_length_prefix(self.pending_attacks.popleft())
+            time.sleep(0.01)  # Send data every 10 ms
+
+    def send_input(self, previous_state: PlayerState, player_input: PlayerInput):
+        """
+        Queues a frame of input the player has already moved by, for the server to run too.
 
-                # Deserialize and update server data (including enemy data)
-                self.gameClient.server_data = self.deserialize_server_data(rawdata)
-                time.sleep(0.01)  # Send data every 10 ms
+        Args:
+            previous_state (PlayerState): Where the player was before the input, sent with the first input on a connection.
+            player_input (PlayerInput): The input.
+        """
+        if not self.inputs_started:
+            self.input_start = previous_state
+            self.inputs_started = True
+        self.pending_inputs.append(player_input)
 
-            except (socket.error, OSError, ConnectionError) as e:
-                print(f"Network error: {e}")
-                self.connected = False
-                self.reconnect_to_server()
+    def send_attack(self, weapon_name: str, facing_right: bool):
+        """
+        Tells the server we swung a weapon while looking at the tick being drawn. The server decides
+        what was hit. Sent by the send thread so it is never interleaved with a state packet.
+        """
+        view_tick = int(self.interpolation.render_tick()) or self.last_snapshot_tick
+        self.pending_attacks.append(encode_attack_packet(view_tick, weapon_name, facing_right))
 
     def connect_to_server(self):
         """
@@ -99,17 +175,29 @@ class NetworkClient:
         """
         try:
             self.connection = socket.create_connection((self.host, self.port))
+            self.reader = FrameReader(self.connection)
             self.connected = True
             self.reconnect_attempts = 0
+            self.snapshot_history.clear()  # A new connection starts over from a full snapshot
+            self.last_snapshot_tick = 0
+            self.inputs_started = False  # A new connection tells the server where we start from
+            self.own_state = None
 
             # Receive the server info packet (initial handshake or entry message)
-            serverData = self.connection.recv(1024)
+            serverData = bytes(self.recv_packet())
             if "[CLOSECONNECTION]" in serverData.decode('utf-8'):
                 self.connected = False
                 return False
             self.serverInfo = self.deserialize_server_join_data(serverData)
+            self.terrain_index = TerrainIndex(self.serverInfo.terrain)  # Terrain never changes, so it is indexed once
+            self.interpolation = InterpolationBuffer(self.serverInfo.tick_rate)
+            self.client_id = self.serverInfo.client_id or self.host  # Older servers don't say, which only works locally
 
-        except (socket.error, OSError) as e:
+            # Talk to the server in the best protocol we both support
+            self.protocol = choose_protocol(self.serverInfo.protocols)
+            self.codec = make_codec(self.protocol, self.serverInfo.animation_table)
+
+        except (socket.error, OSError, ConnectionError) as e:
             print(f"Failed to connect to server: {e}")
             self.connected = False
             self.reconnect_to_server()
@@ -138,11 +226,18 @@ class NetworkClient:
         """
         Gracefully closes the connection.
         """
+        self.closing = True
         self.connected = False
         if self.connection:
             self.connection.close()
             print("Client disconnected.")
 
+    def recv_packet(self) -> memoryview:
+        """
+        Receives one length-prefixed packet from the server. The packet is only valid until the next call.
+        """
+        return self.reader.read_frame()
+
     def send_with_length_prefix(self, data: bytes):
         """
         Sends data with a length prefix.
@@ -152,41 +247,12 @@ class NetworkClient:
             self.connection.sendall(length_prefix + data)
         except (socket.error, OSError) as e:
             print(f"Error sending data: {e}")
-            self.reconnect_to_server()
 
     def serialize_client_data(self, packet: 'ClientPacket') -> bytes:
         """
-        Converts the dataclass to a dictionary for JSON serialization.
+        Serializes the client packet with the negotiated protocol.
         """
-        # Serialize current_weapon separately if it exists
-        weapon_data = None
-        if packet.gameData.current_weapon:
-            weapon_data = {
-                "name": packet.gameData.current_weapon.name,
-                "range": packet.gameData.current_weapon.range,
-                "damage": packet.gameData.current_weapon.damage
-            }
-
-        data_dict = {
-            "username": packet.username,
-            "position": {"x": packet.position.x, "y": packet.position.y},
-            "gameData": {
-                "HP": packet.gameData.HP,
-                "facing_right": packet.gameData.facing_right,
-                "current_animation": packet.gameData.current_animation,
-                "current_frame_index": packet.gameData.current_frame_index,
-                "last_frame_time": packet.gameData.last_frame_time,
-                "player_scale": packet.gameData.player_scale,
-                "velocity": packet.gameData.velocity,
-                "velocity_y": packet.gameData.velocity_y,
-                "grounded": packet.gameData.grounded,
-                "movement_disabled": packet.gameData.movement_disabled,
-                "animation_in_progress": packet.gameData.animation_in_progress,
-                "current_weapon": weapon_data
-            }
-        }
-
-        return json.dumps(data_dict).encode('utf-8')
+        return self.codec.encode_client_packet(packet)
 
     def deserialize_server_join_data(self, data: bytes):
         """
@@ -196,76 +262,41 @@ class NetworkClient:
         return ServerJoinPacket(
             servername=data_dict["servername"],
             serverip=data_dict["serverip"],
-            serverport=data_dict["serverport"]
+            serverport=data_dict["serverport"],
+            protocols=data_dict.get("protocols", [PROTOCOL_JSON]),  # Older servers only speak JSON
+            animation_table=data_dict.get("animation_table", []),
+            terrain=data_dict.get("terrain", []),
+            tick_rate=data_dict.get("tick_rate", 60),
+            client_id=data_dict.get("client_id", "")
         )
 
-    def deserialize_server_data(self, data: bytes) -> ServerPacket:
+    def deserialize_server_data(self, data: bytes) -> Optional[ServerPacket]:
         """
-        Deserializes the server packet from the server, including enemy data.
+        Deserializes a snapshot delta from the server and applies it to the world state it was made against.
+        Returns None if we no longer have that state, in which case the next packet asks for a full snapshot.
         """
-        data_dict = json.loads(data.decode('utf-8'))
-
-        clients_data = {}
-        enemies = []
-
-        # Ensure 'clients_data' is correctly deserialized into a dictionary
-        if isinstance(data_dict['clients_data'], str):
-            data_dict['clients_data'] = json.loads(data_dict['clients_data'])
-
-        # Deserialize client data
-        for client, client_data in data_dict['clients_data'].items():
-            if client_data is None:
-                continue
-
-            client_data_dict = json.loads(client_data)
-            weapon_data = client_data_dict['gameData'].get('current_weapon')
-            current_weapon = None
-            if weapon_data:
-                current_weapon = Weapon(
-                    name=weapon_data["name"],
-                    range=weapon_data["range"],
-                    damage=weapon_data["damage"]
-                )
-
-            position = Position(**client_data_dict['position'])
-            gameData = GameData(
-                HP=client_data_dict['gameData']['HP'],
-                facing_right=client_data_dict['gameData']['facing_right'],
-                current_animation=client_data_dict['gameData']['current_animation'],
-                current_frame_index=client_data_dict['gameData']['current_frame_index'],
-                last_frame_time=client_data_dict['gameData']['last_frame_time'],
-                player_scale=client_data_dict['gameData']['player_scale'],
-                velocity=client_data_dict['gameData']['velocity'],
-                velocity_y=client_data_dict['gameData']['velocity_y'],
-                grounded=client_data_dict['gameData']['grounded'],
-                movement_disabled=client_data_dict['gameData']['movement_disabled'],
-                animation_in_progress=client_data_dict['gameData']['animation_in_progress'],
-                current_weapon=current_weapon
-            )
+        delta = self.codec.decode_snapshot(data)
+        base = self.snapshot_history.get(delta.base) if delta.base else None
+        if delta.base and base is None:
+            self.last_snapshot_tick = 0
+            return None
 
-            clients_data[client] = {
-                "username": client_data_dict["username"],
-                "position": position,
-                "gameData": gameData
-            }
-
-        # Deserialize enemy data
-        enemies = {}
-        for id, enemy_info in data_dict['enemy_data'].items():
-            enemies[id] = {
-                "position": pygame.Vector2(enemy_info["position"]["x"], enemy_info["position"]["y"]),
-                "health": enemy_info["health"],
-                "animation_frame": enemy_info["animation_frame"],
-                "current_animation": enemy_info["current_animation"],
-                "is_alive": enemy_info["is_alive"]
-            }
-
-        # Return the deserialized server packet
-        return ServerPacket(
-            terrain=data_dict["terrain"],
-            clients_data=clients_data,
-            enemy_data=enemies  # Include enemy data
-        )
+        state = apply_delta(base, delta)
+        self.snapshot_history.record(delta.tick, state)
+        self.interpolation.push(delta.tick, state)
+        self.last_snapshot_tick = delta.tick
+
+        # Where the server has put us, if it runs our inputs
+        own = state.clients.get(self.client_id)
+        if own is not None and own[CLIENT_FIELD_INDEXES["input_sequence"]]:
+            self.own_state = (delta.tick, PlayerState(
+                own[CLIENT_FIELD_INDEXES["x"]],
+                own[CLIENT_FIELD_INDEXES["y"]],
+                own[CLIENT_FIELD_INDEXES["velocity_y"]],
+                own[CLIENT_FIELD_INDEXES["grounded"]],
+                own[CLIENT_FIELD_INDEXES["facing_right"]]
+            ), own[CLIENT_FIELD_INDEXES["input_sequence"]])
+        return state_to_server_packet(state, self.serverInfo.terrain)
 
 def discover_servers_async(servers, lock, port=44200, timeout=3):
     """Function to discover servers asynchronously and update the servers list."""
@@ -319,18 +350,22 @@ class GameClient():
         self.position = position
         self.worldObjects = []
         self.server_data: ServerPacket = {}
-        self.velocity = 5
+        self.remote_clients: Dict[str, Tuple[float, float]] = {}  # Where to draw other players this frame
+        self.remote_enemies: Dict[str, Tuple[float, float]] = {}  # Where to draw enemies this frame
+        self.draw_counts: Dict[str, Tuple[int, int]] = {}  # What was drawn and culled last frame, (drawn, culled) by kind
+        self.velocity = PLAYER_SPEED
         self.velocity_y = 0 
         self.grounded = False 
         self.movement_disabled = False
+        self.predictor = MovementPredictor(PlayerState(position[0], position[1]))  # Moves us before the server confirms it
+        self.reconciled_tick = 0  # Tick of the last server state we started again from
+        self.empty_terrain = TerrainIndex([])  # Collided with before we know the server's terrain
         self.networkClient = None
         self.facing_right = True
         self.current_animation = "Idle" 
         self.animation_in_progress = False  # To block other animations when sword swing is playing
-        self.player_scale = 3
+        self.player_scale = PLAYER_SCALE
         self.just_equipped = False
-        self.hit_objects = {}
-        self.already_hit = []
 
         self.current_weapon: Weapon = None
 
@@ -354,15 +389,7 @@ class GameClient():
 
     def animate(self, sprite_sheet_path: str):
         """Load and set up animations."""
-        sprite_sheet = pygame.image.load(f"{sprites_folder}/Player/{sprite_sheet_path}.png").convert_alpha()
-        sheet_width, sheet_height = sprite_sheet.get_size()
-        self.animation_frames = []
-
-        # Split the sprite sheet into frames
-        for y in range(0, sheet_height, 150):
-            for x in range(0, sheet_width, 150):
-                frame = sprite_sheet.subsurface((x, y, 150, 150))
-                self.animation_frames.append(frame)
+        self.animation_frames = sprite_atlas.frames(f"{sprites_folder}/Player/{sprite_sheet_path}.png", PLAYER_FRAME_SIZE)
 
     def play_animation(self, screen, position):
         """
@@ -382,15 +409,8 @@ class GameClient():
             # Get the current animation frame
             frame = self.animation_frames[self.current_frame_index]
 
-            # Flip the frame horizontally if the player is facing left
-            if not self.facing_right:
-                frame = pygame.transform.flip(frame, True, False)
-
-            # Scale the frame if needed
-            if self.player_scale != 1:
-                frame_width = int(frame.get_width() * self.player_scale)
-                frame_height = int(frame.get_height() * self.player_scale)
-                frame = pygame.transform.scale(frame, (frame_width, frame_height))
+            # Flipped if the player is facing left and scaled, made once and reused
+            frame = frame_cache.get(frame, self.player_scale, flip=not self.facing_right)
 
             screen.blit(frame, (position.x + (PLAYER_WIDTH * self.player_scale) // 2 - frame.get_width() // 2, position.y + (PLAYER_HEIGHT * self.player_scale) // 2 - frame.get_height() // 2))
         
@@ -427,10 +447,11 @@ class GameClient():
         """Resets the game state and disconnects from the server."""
         # Reset player position and movement
         self.position = pygame.Vector2(0, 0)
-        self.velocity = 5
+        self.velocity = PLAYER_SPEED
         self.velocity_y = 0
         self.grounded = False 
         self.movement_disabled = False 
+        self.predictor.reset(self.movement_state())
         
         # Reset inventory, weapon, and animation states
         self.current_weapon = None 
@@ -464,120 +485,56 @@ class GameClient():
         self.networkClient.disconnect()
         self.networkClient.network_thread.join()
 
-    def detect_collision(self):
-        if not self.server_data or self.server_data == {}:
-            return
-        try:
-            terrain = self.server_data.terrain
-            player_x = self.position.x
-            player_bottom_y = self.position.y + (PLAYER_HEIGHT * self.player_scale) // 2
-            player_top_y = self.position.y - (PLAYER_HEIGHT * self.player_scale) // 2
-            player_width = PLAYER_WIDTH * self.player_scale
-
-            closest_building_top = None
-            horizontal_collision = False
-            player_new_x = self.position.x 
-
-            # Loop through each building to check for collision
-            for building in terrain:
-                # Building is a list of four points: [top-left, top-right, bottom-right, bottom-left]
-                top_left = pygame.Vector2(building[0])
-                top_right = pygame.Vector2(building[1])
-                bottom_left = pygame.Vector2(building[3])
-                
-                # Horizontal Collision Detection (blocking sides)
-                if player_top_y <= top_left.y and player_bottom_y >= bottom_left.y:
-
-                    if player_x + player_width > top_left.x and player_x < top_left.x:
-                        player_new_x = top_left.x - player_width
-                        horizontal_collision = True
-                    elif player_x < top_right.x and player_x + player_width > top_right.x:
-                        player_new_x = top_right.x 
-                        horizontal_collision = True
-
-                if top_left.x <= player_x <= top_right.x:
+    def movement_state(self) -> PlayerState:
+        return PlayerState(self.position.x, self.position.y, self.velocity_y, self.grounded, self.facing_right)
 
-                    building_top_y = top_left.y
+    def apply_movement_state(self, state: PlayerState):
+        self.position.x, self.position.y = state.x, state.y
+        self.velocity_y, self.grounded, self.facing_right = state.velocity_y, state.grounded, state.facing_right
 
-                    if closest_building_top is None or building_top_y > closest_building_top:
-                        closest_building_top = building_top_y
+    def terrain_index(self) -> TerrainIndex:
+        if self.networkClient and self.server_data:
+            return self.networkClient.terrain_index
+        return self.empty_terrain
 
-            if horizontal_collision:
-                self.position.x = player_new_x
-
-            # Now that we have the closest building top, check if the player is grounded on it
-            if closest_building_top is not None and not horizontal_collision:
-                buffer = 1  # Small buffer to avoid "floating", was more of an issue when terrain was rockier
-                if player_bottom_y >= closest_building_top - buffer:
-                    self.grounded = True
-                    self.position.y = closest_building_top - (PLAYER_HEIGHT * self.player_scale) // 2
-                else:
-                    self.grounded = False
-            else:
-                self.grounded = False
-
-            return self.grounded
-
-        except Exception as e:
-            print(f"Error detecting collision: {e}")
-            return False
-
-    def apply_gravity(self, dt):
-        if not self.grounded:
-            # Calculate the next position if gravity were applied
-            next_velocity_y = self.velocity_y + GRAVITY * dt
-            next_position_y = self.position.y + next_velocity_y * dt
-            self.position.y = next_position_y
-            if self.detect_collision():
-                # If collision detected, adjust position to the ground level and reset velocity
-                self.velocity_y = 0
-                self.grounded = True
-            else:
-                # If no collision, update the velocity for the next frame
-                self.velocity_y = next_velocity_y
-        else:
-            # If grounded, reset vertical velocity to 0 (with a small threshold to avoid jitter)
-            if abs(self.velocity_y) < 0.5:
-                self.velocity_y = 0
-            self.grounded = True
-
-    def handleMovement(self, keys):
-        if self.movement_disabled or self.animation_in_progress:
+    def reconcile(self):
+        """
+        Starts again from the latest position the server sent us, running the inputs it hadn't run yet.
+        When the server agreed with our prediction this puts us exactly where we already were.
+        """
+        own_state = self.networkClient.own_state if self.networkClient else None
+        if own_state is None or own_state[0] == self.reconciled_tick:
             return
+        tick, server_state, last_sequence = own_state
+        self.reconciled_tick = tick
+        self.predictor.reconcile(server_state, last_sequence, self.terrain_index())
+        self.apply_movement_state(self.predictor.state)
 
-        moveVector = pygame.Vector2(0, 0)
-        moving = False
-        jumping = False
-        falling = False
-
-        # Horizontal movement
-        if keys[pygame.K_a]:
-            moveVector.x -= self.velocity
-            self.facing_right = False  # Facing left
-            moving = True
-        if keys[pygame.K_d]:
-            moveVector.x += self.velocity
-            self.facing_right = True  # Facing right
-            moving = True
-
-        # Update the player's position with movement boundaries
-        self.position.x = max(-2800, min(2800, self.position.x + moveVector.x))
-
-        # Jumping logic
-        if keys[pygame.K_SPACE] and self.grounded:
-            jumping = True
-            self.velocity_y = -65 * self.velocity 
-            self.grounded = False 
-
-        if self.velocity_y > 0 and not self.grounded:
-            falling = True
+    def handleMovement(self, keys, dt):
+        """
+        Moves the player one frame with the keys held, straight away, and sends the input
+        to the server to run the same frame. See Movement.move_player.
+        """
+        blocked = self.movement_disabled or self.animation_in_progress
+        left = keys[pygame.K_a] and not blocked
+        right = keys[pygame.K_d] and not blocked
+        jump = keys[pygame.K_SPACE] and not blocked
+
+        previous_state = self.predictor.state
+        player_input = self.predictor.predict(left, right, jump, dt, self.terrain_index())
+        self.apply_movement_state(self.predictor.state)
+        if self.networkClient and self.networkClient.connected:
+            self.networkClient.send_input(previous_state, player_input)
+
+        if blocked:
+            return
 
         # Animation handling
-        if jumping:
-            self.animate("Jump")
-        elif falling:
+        if self.velocity_y == JUMP_VELOCITY and not self.grounded:
+            self.animate("Jump")  # Jumped this frame
+        elif self.velocity_y > 0 and not self.grounded:
             self.animate("Fall")
-        elif moving and self.grounded:
+        elif (left or right) and self.grounded:
             self.animate("Run")
         elif self.grounded:
             self.animate("Idle")    
@@ -622,7 +579,15 @@ class GameClient():
         self.play_animation(screen, pygame.Vector2(animation_x, animation_y))
 
     def drawWorldObjects(self, screen):
+        view = VisibleWorldRect(self.position)
+        drawn = 0
         for obj in self.worldObjects:
+            # Skip objects that can't reach the screen, before any conversion or drawing
+            size = max(obj.sprite.image.get_size()) if obj.objectType.isSprite and obj.sprite else max(obj.width, obj.height)
+            if not view.inflate(size * 2, size * 2).collidepoint(obj.worldPosition.x, obj.worldPosition.y):
+                continue
+            drawn += 1
+
             screenPosition = CalculateScreenPosition(obj.worldPosition, self.position)
             if obj.objectType.isSprite and obj.sprite:
                 screen.blit(obj.sprite.image, (screenPosition.x, screenPosition.y))
@@ -630,20 +595,30 @@ class GameClient():
                 pygame.draw.circle(screen, obj.color, (screenPosition.x, screenPosition.y), obj.width)
             elif obj.objectType.isRect:
                 pygame.draw.rect(screen, obj.color, (screenPosition.x - obj.width // 2, screenPosition.y - obj.height // 2, obj.width, obj.height))
+        self.draw_counts["World objects"] = (drawn, len(self.worldObjects) - drawn)
 
     def drawTerrain(self, screen):
         if not self.server_data or self.server_data == {}:
             return
         try:
-            # Get the terrain (list of buildings, each building is a list of four points)
-            buildings = self.server_data.terrain
+            # Only the buildings under the screen, found with the terrain's x index
+            terrain = self.terrain_index()
+            view = VisibleWorldRect(self.position, 1)  # A pixel of slack, so edges rounded onto the screen are still drawn
+            drawn = 0
 
-            for building in buildings:
-                # Adjust each point in the building to the player's screen position
-                adjusted_points = [CalculateScreenPosition(pygame.Vector2(x, y), self.position) for x, y in building]
+            for left, right, top, bottom in terrain.overlapping(view.left, view.right):
+                if top > view.bottom or bottom < view.top:
+                    continue  # Above or below the screen
+
+                # Adjust each corner of the building to the player's screen position
+                corners = [(left, top), (right, top), (right, bottom), (left, bottom)]
+                adjusted_points = [CalculateScreenPosition(pygame.Vector2(x, y), self.position) for x, y in corners]
 
                 # Draw each building as a separate polygon
                 pygame.draw.polygon(screen, DARK_GREY, adjusted_points)
+                drawn += 1
+
+            self.draw_counts["Terrain"] = (drawn, len(terrain.buildings) - drawn)
 
         except Exception as e:
             print(f"Error drawing terrain: {e}")
@@ -653,9 +628,10 @@ class GameClient():
             return
         
         clients_data = self.server_data.clients_data  # clients_data is already a dict
+        drawn, culled = 0, 0
 
         for client_key, client in clients_data.items():
-            if client_key == self.networkClient.host: # ignore yourself
+            if client_key == self.networkClient.client_id: # ignore yourself
                 continue
             client_data = clients_data[client_key]
             if client_data is None:
@@ -664,29 +640,27 @@ class GameClient():
             # Assuming client_data['gameData'] is a GameData object
             game_data = client['gameData']
 
-            # Extract client-specific data
-            client_position: Position = client['position']
+            # Extract client-specific data, drawn where the interpolation buffer puts them
+            client_position = Position(*self.remote_clients.get(client_key, (client['position'].x, client['position'].y)))
+            client_player_scale = game_data.player_scale
+
+            # Skip clients whose sprite can't reach the screen, before any animation work
+            if not VisibleWorldRect(self.position, PLAYER_FRAME_SIZE * client_player_scale).collidepoint(client_position.x, client_position.y):
+                culled += 1
+                continue
+            drawn += 1
+
             client_facing_right = game_data.facing_right
             client_username = client['username']
             client_current_animation = game_data.current_animation
             client_current_frame_index = game_data.current_frame_index
             client_last_frame_time = game_data.last_frame_time
-            client_player_scale = game_data.player_scale
 
             # Convert client world position to screen position
             screen_position = CalculateScreenPosition(pygame.Vector2(client_position.x, client_position.y), self.position)
 
-            # Load the client's animation frames based on their current animation state
-            sprite_sheet_path = f"{sprites_folder}/Player/{client_current_animation}.png"
-            sprite_sheet = pygame.image.load(sprite_sheet_path).convert_alpha()
-            sheet_width, sheet_height = sprite_sheet.get_size()
-            client_animation_frames = []
-
-            # Split the sprite sheet into frames
-            for y in range(0, sheet_height, 150):
-                for x in range(0, sheet_width, 150):
-                    frame = sprite_sheet.subsurface((x, y, 150, 150))
-                    client_animation_frames.append(frame)
+            # The client's animation frames based on their current animation state
+            client_animation_frames = sprite_atlas.frames(f"{sprites_folder}/Player/{client_current_animation}.png", PLAYER_FRAME_SIZE)
 
             # Calculate the frame delay (using the default frame delay for the player, you can adjust this if needed)
             frame_delay = self.frame_delay
@@ -701,15 +675,8 @@ class GameClient():
             try:
                 frame = client_animation_frames[client_current_frame_index]
 
-                # Flip the frame horizontally if the client is facing left
-                if not client_facing_right:
-                    frame = pygame.transform.flip(frame, True, False)
-
-                # Scale the frame to the client's scale factor
-                if client_player_scale != 1:
-                    frame_width = int(frame.get_width() * client_player_scale)
-                    frame_height = int(frame.get_height() * client_player_scale)
-                    frame = pygame.transform.scale(frame, (frame_width, frame_height))
+                # Flipped if the client is facing left and scaled to the client's scale factor
+                frame = frame_cache.get(frame, client_player_scale, flip=not client_facing_right)
 
                 # Blit the current frame to the screen at the adjusted position
                 screen.blit(frame, (screen_position.x + (PLAYER_WIDTH * client_player_scale) // 2 - frame.get_width() // 2, 
@@ -718,11 +685,13 @@ class GameClient():
                 print(f"Error rendering client animation: {e}")
 
             # Render the username above the client
-            font = pygame.font.SysFont(None, 40)
-            text = font.render(client_username, True, BLACK)
+            font = text_cache.font(None, 40)
+            text = text_cache.render(font, client_username, BLACK)
             text_rect = text.get_rect(center=(screen_position.x + PLAYER_WIDTH // 2, screen_position.y - 20))
             screen.blit(text, text_rect)
 
+        self.draw_counts["Players"] = (drawn, culled)
+
     def spawn(self, spawn_x: int = 0, spawn_height: int = 100):
         """
         Spawns the player at a given location, where 0,0 is the center of the world.
@@ -730,21 +699,22 @@ class GameClient():
         self.position = pygame.Vector2(spawn_x, -spawn_height) 
         self.velocity_y = 0
         self.grounded = False
+        self.predictor.reset(self.movement_state())
 
     def activate_weapon(self):
         """Activates the currently equipped weapon, if any."""
         if self.current_weapon and not self.animation_in_progress:
-            global volume
             anim = self.current_weapon.activated(self)
             self.override_animation(anim, animspeed=self.current_weapon.anim_speed)
-            pygame.mixer.Sound(f"{sound_folder}\\SFX\\{self.current_weapon.sfx}.mp3").play().set_volume(volume)
+            sound_bank.play(self.current_weapon.sfx)
             
             # Create the weapon hitbox and store it for rendering during animation
             self.weapon_hitbox = self._create_weapon_hitbox()
             self.animation_in_progress = True  # The animation has started
-            
-            # Reset hit objects for the new attack
-            self.hit_objects = {}
+
+            # The server works out what the attack hits
+            if self.networkClient and self.networkClient.connected:
+                self.networkClient.send_attack(self.current_weapon.name, self.facing_right)
 
     def _create_weapon_hitbox(self):
         """Creates a hitbox based on the player's current weapon and position, adjusting for screen offset."""
@@ -771,54 +741,23 @@ class GameClient():
 
         return hitbox
 
-    def _check_hitbox_intersections(self, hitbox):
-        """Checks for intersections between the weapon hitbox, world objects, and enemies."""
-        hit_objects = {}
-
-        # Check intersections with enemies
-        for id, enemy in self.server_data.enemy_data.items():
-            if id in self.already_hit:
-                continue
-            else:
-                self.already_hit.append(id)
-            # Retrieve the enemy's position and size directly from the server data
-            enemy_screen_pos = CalculateScreenPosition(pygame.Vector2(enemy['position'].x, enemy['position'].y), self.position)
-            enemy_size = enemy.get('size', 128)  # Default to 128 if no size is provided by server data
-            
-            # Adjust the enemy hitbox creation based on actual enemy size
-            enemy_hitbox = pygame.Rect(
-                enemy_screen_pos.x - (enemy_size // 2),
-                enemy_screen_pos.y - (enemy_size // 2),
-                enemy_size,
-                enemy_size
-            )
-            
-            # Draw the enemy hitbox for debugging
-            debugger.draw_weapon_hitbox(screen, enemy_hitbox)
-            
-            # Check if the enemy's hitbox collides with the weapon's hitbox
-            if hitbox.colliderect(enemy_hitbox):
-                hit_objects[id] = enemy
-
-        return hit_objects
+    def sample_remote_positions(self):
+        """Works out where other players and enemies are drawn this frame, between the snapshots either side."""
+        if self.networkClient:
+            self.remote_clients, self.remote_enemies = self.networkClient.interpolation.sample()
 
     def update(self, screen, dt):
-        self.apply_gravity(dt)
-        self.detect_collision()
-        self.handleMovement(pygame.key.get_pressed())
-
-        if self.position.y > SCREEN_HEIGHT:  # If the player falls too far
-            self.spawn(100)
+        self.reconcile()
+        self.handleMovement(pygame.key.get_pressed(), dt)
 
         if self.animation_in_progress:
             self.weapon_hitbox = self._create_weapon_hitbox()
-            self.hit_objects = self._check_hitbox_intersections(self.weapon_hitbox)
-            # deal_to = self.current_weapon.apply_damage(self.hit_objects)
             debugger.draw_weapon_hitbox(screen, self.weapon_hitbox)
         else:
             self.weapon_hitbox = None  # Clear hitbox when animation ends
 
         self.update_animation_state()  # Check if current animation has finished
+        self.sample_remote_positions()
         self.drawTerrain(screen)
         self.drawWorldObjects(screen)
         self.draw(screen, debugger)
@@ -843,8 +782,8 @@ class ServerMessage(Message):
         super().__init__(message_text)
 
     def display(self, screen):
-        font = pygame.font.SysFont(None, 60)
-        text = font.render(self.message_text, True, (255, 0, 0))
+        font = text_cache.font(None, 60)
+        text = text_cache.render(font, self.message_text, (255, 0, 0))
         text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
         screen.fill((0, 0, 0))  # Black background for the message
         screen.blit(text, text_rect)
@@ -853,7 +792,7 @@ class ServerMessage(Message):
         button_rect = pygame.Rect(SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 50, 200, 50)
         pygame.draw.rect(screen, (0, 0, 0), button_rect)
         pygame.draw.rect(screen, (255, 255, 255), button_rect, 2)
-        button_text = font.render("Confirm", True, (255, 255, 255))
+        button_text = text_cache.render(font, "Confirm", (255, 255, 255))
         button_text_rect = button_text.get_rect(center=button_rect.center)
         screen.blit(button_text, button_text_rect)
 
@@ -888,7 +827,7 @@ class Debugger:
         # Initialize debug state
         self.show_debug = True
         self.font_size = 24
-        self.font = pygame.font.Font(None, self.font_size)
+        self.font = text_cache.font(None, self.font_size)
         self.text_color = (128, 128, 128)
         
         # FPS tracking
@@ -911,8 +850,8 @@ class Debugger:
         pygame.draw.rect(screen, BLUE, player_rect, 2)
 
         # Render the player's name above the hitbox
-        font = pygame.font.SysFont(None, 40)
-        text = font.render(username, True, BLACK)
+        font = text_cache.font(None, 40)
+        text = text_cache.render(font, username, BLACK)
         text_rect = text.get_rect(center=(player_rect.centerx, player_rect.y - 20))
         screen.blit(text, text_rect)
 
@@ -960,10 +899,14 @@ class Debugger:
             f"Server: {server_info[0]}:{server_info[1]}",
         ]
         
+        # What was drawn and what was culled for being off screen
+        for kind, (drawn, culled) in newClient.draw_counts.items():
+            debug_lines.append(f"{kind}: {drawn} drawn, {culled} culled")
+
         # Draw left side debug information
         y_offset = 10
         for line in debug_lines:
-            text_surface = self.font.render(line, True, self.text_color)
+            text_surface = text_cache.render(self.font, line, self.text_color)
             screen.blit(text_surface, (10, y_offset))
             y_offset += self.font_size
         
@@ -972,7 +915,7 @@ class Debugger:
         y_offset = 10
         
         # Header
-        client_header = self.font.render("Connected Clients:", True, self.text_color)
+        client_header = text_cache.render(self.font, "Connected Clients:", self.text_color)
         screen.blit(client_header, (x_offset, y_offset))
         y_offset += self.font_size * 1.5
         
@@ -984,7 +927,7 @@ class Debugger:
         for client_key, client in server_data.clients_data.items():
             if client is None:
                 return
-            if client_key == newClient.networkClient.host: # ignore yourself
+            if client_key == newClient.networkClient.client_id: # ignore yourself
                 continue
             
             username = client["username"]
@@ -997,7 +940,7 @@ class Debugger:
             ]
             
             for line in client_lines:
-                text_surface = self.font.render(line, True, self.text_color)
+                text_surface = text_cache.render(self.font, line, self.text_color)
                 screen.blit(text_surface, (x_offset, y_offset))
                 y_offset += self.font_size
             
@@ -1055,16 +998,16 @@ class Menu(ABC):
                     self.on_select(idx)
 
     def render(self, screen):
-        font = pygame.font.SysFont(None, self.font_size)
+        font = text_cache.font(None, self.font_size)
 
-        title_surf = font.render(self.title, True, (255, 255, 255))
+        title_surf = text_cache.render(font, self.title, (255, 255, 255))
         title_rect = title_surf.get_rect(center=(screen.get_width() // 2, 100))
         screen.blit(title_surf, title_rect)
 
         self.option_rects = []
         for idx, option in enumerate(self.options):
             option_color = (255, 0, 0) if idx == self.active_option else (255, 255, 255)
-            option_surf = font.render(option, True, option_color)
+            option_surf = text_cache.render(font, option, option_color)
             option_rect = option_surf.get_rect(center=(screen.get_width() // 2, 200 + idx * 50))
             self.option_rects.append(option_rect)
             screen.blit(option_surf, option_rect)
@@ -1072,10 +1015,10 @@ class Menu(ABC):
 class InventoryMenu(Menu):
     def __init__(self, client, cell_size: int = 64, padding: int = 10):
         inventory_items = [  # (Item, Amount) tuples
-            [(Sword("Iron Sword", "SwordAttack", "SwordSwing"), 1)],
+            [(WEAPONS["Iron Sword"](), 1)],
             [],
-            [(Spear("Spear", "SpearAttack", "SpearThrust"), 3)],
-            [(Sword("Great Sword", "GreatswordAttack", "SwordSwingBeefy", anim_speed=.75, damage=45, range=200), 3)],
+            [(WEAPONS["Spear"](), 3)],
+            [(WEAPONS["Great Sword"](), 3)],
             [],
         ]
 
@@ -1183,8 +1126,8 @@ class InventoryMenu(Menu):
         """Draws the arrow that toggles the inventory."""
         pygame.draw.rect(screen, (255, 255, 255), self.arrow_rect)
         arrow = ">" if not self.visible else "<"
-        arrow_font = pygame.font.SysFont(None, 50)
-        arrow_surf = arrow_font.render(arrow, True, (0, 0, 0))
+        arrow_font = text_cache.font(None, 50)
+        arrow_surf = text_cache.render(arrow_font, arrow, (0, 0, 0))
         screen.blit(arrow_surf, (self.arrow_rect.x + 15, self.arrow_rect.y + 5))
 
     def _draw_inventory_background(self, screen):
@@ -1234,16 +1177,16 @@ class InventoryMenu(Menu):
     def _draw_item_name(self, screen, cell_rect, option):
         """Draws the name of the item in the inventory."""
         if option and option.name:
-            option_font = pygame.font.SysFont(None, 30)
-            option_surf = option_font.render(option.name, True, (255, 255, 255))
+            option_font = text_cache.font(None, 30)
+            option_surf = text_cache.render(option_font, option.name, (255, 255, 255))
             option_rect = option_surf.get_rect(center=cell_rect.center)
             screen.blit(option_surf, option_rect)
 
     def _draw_item_amount(self, screen, cell_rect, amount):
         """Draws the amount of the item in the inventory."""
         if amount > 0:
-            amount_font = pygame.font.SysFont(None, 24)
-            amount_surf = amount_font.render(str(amount), True, (255, 255, 255))
+            amount_font = text_cache.font(None, 24)
+            amount_surf = text_cache.render(amount_font, str(amount), (255, 255, 255))
             amount_rect = amount_surf.get_rect(topright=(cell_rect.right - 5, cell_rect.top + 5))
             screen.blit(amount_surf, amount_rect)
 
@@ -1287,11 +1230,11 @@ class PauseMenu(Menu):
         overlay.fill((50, 50, 50))
         screen.blit(overlay, (0, 0))
 
-        title_font = pygame.font.SysFont(None, self.title_font_size)
-        option_font = pygame.font.SysFont(None, self.font_size)
+        title_font = text_cache.font(None, self.title_font_size)
+        option_font = text_cache.font(None, self.font_size)
 
         # Render the title
-        title_surf = title_font.render(self.title, True, (255, 255, 255))
+        title_surf = text_cache.render(title_font, self.title, (255, 255, 255))
         title_rect = title_surf.get_rect(center=(self.position[0], self.position[1] - 200))
         screen.blit(title_surf, title_rect)
 
@@ -1312,7 +1255,7 @@ class PauseMenu(Menu):
             else:
                 pygame.draw.rect(screen, (255, 255, 255), option_rect, 2, border_radius=5)
 
-            option_surf = option_font.render(option, True, (255, 255, 255) if not is_hovered else (0, 0, 0))
+            option_surf = text_cache.render(option_font, option, (255, 255, 255) if not is_hovered else (0, 0, 0))
             option_surf_rect = option_surf.get_rect(center=option_rect.center)
             screen.blit(option_surf, option_surf_rect)
 
@@ -1340,9 +1283,9 @@ class OptionMenu(Menu):
         overlay.fill((50, 50, 50))
         screen.blit(overlay, (0, 0))
 
-        font = pygame.font.SysFont(None, 40)
+        font = text_cache.font(None, 40)
 
-        volume_text = font.render(f"Volume: {volume}", True, (255, 255, 255))
+        volume_text = text_cache.render(font, f"Volume: {volume}", (255, 255, 255))
         screen.blit(volume_text, (self.position[0] - 100, self.position[1] - 150))
 
         slider_rect = pygame.Rect(self.position[0] - 100, self.position[1] - 100, 200, 10)
@@ -1352,7 +1295,7 @@ class OptionMenu(Menu):
         pygame.draw.circle(screen, (255, 0, 0), (volume_pos, slider_rect.y + 5), 8)
 
         toggle_text = "Fullscreen: On" if fullscreen else "Fullscreen: Off"
-        toggle_surf = font.render(toggle_text, True, (255, 255, 255))
+        toggle_surf = text_cache.render(font, toggle_text, (255, 255, 255))
         toggle_rect = toggle_surf.get_rect(center=(self.position[0], self.position[1]))
         pygame.draw.rect(screen, (255, 255, 255), toggle_rect.inflate(20, 10), 2)
         screen.blit(toggle_surf, toggle_rect)
@@ -1387,6 +1330,7 @@ class Scene(ABC):
     def __init__(self, screen):
         self.screen = screen
         self.screen_width, self.screen_height = screen.get_size()
+        self.dirty_regions: Optional[DirtyRegions] = None  # Set by scenes that only redraw what changed
 
     @abstractmethod
     def handle_click(self, position):
@@ -1404,7 +1348,61 @@ class Scene(ABC):
 
     def update(self):
         self.render()
-        pygame.display.flip()
+        if self.dirty_regions is None:
+            pygame.display.flip()
+            return
+
+        # Only the areas that changed are sent to the display, and the scene sleeps between loops
+        dirty = self.dirty_regions.take()
+        if dirty:
+            pygame.display.update(dirty)
+        clock.tick(MENU_FPS)
+
+class LoadingScene(Scene):
+    """
+    Shows how far the assets the next scene needs have loaded, and switches to it once they all have.
+    """
+    def __init__(self, screen, futures: List[Future], next_scene: Callable[[], Scene]):
+        """
+        Args:
+            futures (List[Future]): The assets to wait for, from the asset manager.
+            next_scene (Callable[[], Scene]): Makes the scene to show once they are loaded.
+        """
+        super().__init__(screen)
+        self.futures = futures
+        self.next_scene = next_scene
+        self.dirty_regions = DirtyRegions()
+
+    def handle_click(self, position):
+        pass
+
+    def render(self):
+        global running
+        global current_scene
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+                return
+
+        loaded = sum(future.done() for future in self.futures)
+        if loaded == len(self.futures):
+            current_scene = self.next_scene()
+            return
+
+        # Progress bar in the middle of the screen
+        bar_rect = pygame.Rect(0, 0, self.screen_width * 0.4, self.screen_height * 0.03)
+        bar_rect.center = (self.screen_width // 2, self.screen_height // 2)
+        self.dirty_regions.track("background", self.screen.get_rect())
+        self.dirty_regions.track("progress", bar_rect.inflate(8, 8), loaded)
+        if not self.dirty_regions:
+            return
+
+        self.screen.fill(BLACK)
+        pygame.draw.rect(self.screen, WHITE, bar_rect.inflate(8, 8), 2)
+        filled = bar_rect.copy()
+        filled.width = int(bar_rect.width * loaded / len(self.futures))
+        pygame.draw.rect(self.screen, WHITE, filled)
 
 class Gameplay(Scene):
     def __init__(self, screen):
@@ -1418,70 +1416,16 @@ class Gameplay(Scene):
         # Scale factor for reducing the size of images (e.g., 0.5 to make the images smaller)
         self.scale_factor = 2
 
-        # Dictionary to hold the loaded layers (farthest to closest)
-        self.background_layers = {}
-
-        # Load the background layers from 1.png to 10.png
-        self._load_background_layers()
-
-        # A list to hold the enemies on the client side
-        self.enemies = []
-
-    def _load_background_layers(self):
-        """Loads background layers from 1.png to 10.png and handles missing files."""
-        global sprites_folder
-        local_sprites_folder = f"{sprites_folder}\\Game\\backgrounds"
-
-        # Loop through 1 to 10 and load files if they exist
-        for i in range(1, 11):
-            try:
-                filepath = os.path.join(local_sprites_folder, f"{i}.png")
-                image = pygame.image.load(filepath).convert_alpha()  # Load with transparency
-                image = self._scale_image_to_screen(image)  # Scale image to screen size
-                self.background_layers[i] = {
-                    'image': image,
-                    'width': image.get_width()
-                }
-            except FileNotFoundError:
-                print(f"File {i}.png not found, skipping.")
-                continue
+        # The background layers from 1.png to 10.png (farthest to closest), cut down to what shows on screen.
+        # Loaded in the background since start up, the LoadingScene before this one waited for them.
+        self.background = gameplay_background.result()
 
-    def _scale_image_to_screen(self, image):
-        """Helper method to scale an image to fit the entire screen size."""
-        return pygame.transform.scale(image, (SCREEN_WIDTH * self.scale_factor, SCREEN_HEIGHT * self.scale_factor))
+        # The enemies on the client side, by server enemy id
+        self.enemies = EnemyPool()
 
     def parallax_render(self, screen, player_position):
         """Renders the parallax scrolling background based on player's position."""
-        # Define the parallax speed for each layer (closer layers move faster)
-        parallax_speeds = {
-            1: 0.1,  # Farthest layer (1.png)
-            2: 0.2,
-            3: 0.3,
-            4: 0.4,
-            5: 0.5,
-            6: 0.6,
-            7: 0.7,
-            8: 0.8,
-            9: 0.9,
-            10: 1.0  # Closest layer (10.png)
-        }
-
-        # Render each layer with appropriate parallax speed
-        for i in range(1, 11):
-            if i in self.background_layers:
-                layer = self.background_layers[i]['image']
-                layer_width = self.background_layers[i]['width']
-                parallax_speed = parallax_speeds.get(i, 1.0)
-                offset = player_position.x * parallax_speed % layer_width
-                self._render_layer(screen, layer, offset, layer_width, vertical_multiplier=(i * 0.1))
-
-    def _render_layer(self, screen, layer, offset, layer_width, vertical_multiplier):
-        """Helper method to render a background layer with a vertical offset based on depth."""
-        vertical_offset = int(SCREEN_HEIGHT // 2 * vertical_multiplier)
-
-        # Draw the layer twice to ensure continuous scrolling, with vertical adjustment
-        screen.blit(layer, (-offset, -vertical_offset))  # Draw the layer starting at -offset and shifted up
-        screen.blit(layer, (layer_width - offset, -vertical_offset))  # Draw the layer again to fill the gap
+        self.background.render(screen, player_position.x)
 
     def handle_click(self, position, mouse_side):
         mouse_click = pygame.mouse.get_pressed()
@@ -1515,35 +1459,23 @@ class Gameplay(Scene):
 
     def render_enemies(self):
         """Renders the enemies based on server data."""
-        # Get enemy data from the server
-        if newClient.server_data and newClient.server_data.enemy_data:
-            # Clear existing enemies and update with server data
-            self.enemies.clear()
-            for id, enemy_data in newClient.server_data.enemy_data.items():
-                if id in newClient.already_hit:
-                    continue
-                # Create an Enemy instance based on the server data
-                realpos = CalculateScreenPosition(enemy_data['position'], newClient.position)
-                enemy = Enemy(
-                    position=pygame.Vector2(realpos.x, realpos.y),
-                    health=enemy_data['health'],
-                    is_server=False
-                )
-                enemy.current_frame_index = enemy_data['animation_frame']  # Set the correct frame
-                enemy.current_animation = enemy_data['current_animation']
-                # Load the appropriate animation based on the current state
-                enemy.load_animation(enemy.current_animation)
-                enemy.last_frame_time = pygame.time.get_ticks()
-                enemy.frame_delay = 100
-                
-                self.enemies.append(enemy)
+        # Bring the client's enemies up to date with the server, where the interpolation buffer puts them
+        if newClient.server_data:
+            self.enemies.sync(newClient.server_data.enemy_data or {}, newClient.remote_enemies, newClient.position)
 
-        # Render each enemy on the screen
+        # Render each enemy on the screen, skipping those that can't reach it
+        screen_rect = self.screen.get_rect()
+        drawn = 0
         for enemy in self.enemies:
+            size = enemy.size * enemy.scale
+            if not screen_rect.inflate(size, size).collidepoint(enemy.position.x, enemy.position.y):
+                continue
+            drawn += 1
             try:
                 enemy.render(self.screen)
             except:
-                pygame.draw.rect(screen, RED, pygame.Rect(realpos.x, realpos.y, 128, 128))
+                pygame.draw.rect(screen, RED, pygame.Rect(enemy.position.x, enemy.position.y, 128, 128))
+        newClient.draw_counts["Enemies"] = (drawn, len(self.enemies) - drawn)
 
     def render(self):
         global running
@@ -1606,8 +1538,8 @@ class ServerSelect(Scene):
 
         # Start asynchronous server discovery
         threading.Thread(target=discover_servers_async, args=(self.servers, self.lock), daemon=True).start()
+        self.dirty_regions = DirtyRegions()
         self.frame_index = 0
-        self.frames = []
         self.frame_delay = 75  # Delay in milliseconds between frames
         self.last_frame_update = pygame.time.get_ticks()  # Time of the last frame update
 
@@ -1619,25 +1551,18 @@ class ServerSelect(Scene):
         self.input_box_color = (255, 255, 255)
         self.disabled_color = (128, 128, 128)
 
-        self.font = pygame.font.Font((f"{sprites_folder}\Fonts\\retro_font.ttf"), int(self.screen_height * 0.03))
-        self.title_font = pygame.font.Font((f"{sprites_folder}\Fonts\\retro_font.ttf"), int(self.screen_height * 0.03))
-
-        # Load all the frames from the GIF-like images
-        self.load_frames_from_folder(f"{sprites_folder}\Game\menu_background")
+        self.font = text_cache.font(str(sprites_folder / "Fonts" / "retro_font.ttf"), int(self.screen_height * 0.03))
+        self.title_font = text_cache.font(str(sprites_folder / "Fonts" / "retro_font.ttf"), int(self.screen_height * 0.03))
 
-    def load_frames_from_folder(self, folder_path):
-        for filename in sorted(os.listdir(folder_path)):
-            if filename.endswith(".png"):
-                frame = pygame.image.load(os.path.join(folder_path, filename)).convert_alpha()
-                scaled_frame = pygame.transform.scale(frame, (self.screen_width, self.screen_height))
-                self.frames.append(scaled_frame)
+        # The frames of the GIF-like background, loaded in the background and played as they arrive
+        self.frames = assets.frames(sprites_folder / "Game" / "menu_background", (self.screen_width, self.screen_height))
 
     def draw_text_with_shadow(self, screen, text, font: pygame.font.Font, text_color, shadow_color, position, shadow_offset=5):
-        shadow_text = font.render(text, True, shadow_color)
+        shadow_text = text_cache.render(font, text, shadow_color)
         shadow_rect = shadow_text.get_rect(center=(position[0] + shadow_offset, position[1] + shadow_offset))
         screen.blit(shadow_text, shadow_rect)
 
-        main_text = font.render(text, True, text_color)
+        main_text = text_cache.render(font, text, text_color)
         main_rect = main_text.get_rect(center=position)
         screen.blit(main_text, main_rect)
 
@@ -1659,7 +1584,7 @@ class ServerSelect(Scene):
         border_thickness = 3 if active else 1
         pygame.draw.rect(screen, self.input_box_color, rect, border_thickness, border_radius=10)
         text_position = (rect.x + 10, rect.y + rect.height // 2)
-        text_surface = self.font.render(text, True, self.text_color)
+        text_surface = text_cache.render(self.font, text, self.text_color)
         text_rect = text_surface.get_rect(midleft=(rect.x + 10, rect.y + rect.height // 2))
         screen.blit(text_surface, text_rect)
 
@@ -1687,7 +1612,7 @@ class ServerSelect(Scene):
             serverIp = self.selected_server.split("\n")[1]
             newClient.username = self.username
             newClient.connectToServer(ip=serverIp)
-            current_scene = Gameplay(self.screen)
+            current_scene = LoadingScene(self.screen, gameplay_assets, lambda: Gameplay(self.screen))
             return
 
         if add_server_button.collidepoint(position) and is_valid_ip(self.custom_server):
@@ -1704,8 +1629,9 @@ class ServerSelect(Scene):
         global running
         current_time = pygame.time.get_ticks()
 
+        frames = ready(self.frames)  # The LoadingScene before the menus waited for the first
         if current_time - self.last_frame_update > self.frame_delay:
-            self.frame_index = (self.frame_index + 1) % len(self.frames)
+            self.frame_index = (self.frame_index + 1) % len(frames)
             self.last_frame_update = current_time
 
         shadow_color = (0, 0, 0)
@@ -1719,8 +1645,6 @@ class ServerSelect(Scene):
         back_button = pygame.Rect(self.screen_width * 0.05, self.screen_height * 0.8, self.screen_width * 0.2, button_height)
         add_server_button = pygame.Rect(self.screen_width * 0.55, self.screen_height * 0.65, button_width, button_height)
 
-        screen.blit(self.frames[self.frame_index], (0, 0))
-
         # Handle events
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -1741,41 +1665,59 @@ class ServerSelect(Scene):
                         elif self.active_input == 'custom_server':
                             self.custom_server += event.unicode
 
+        # Work out what changed since the last loop, and draw nothing if nothing did
+        mouse_pos = pygame.mouse.get_pos()
+        username_box = pygame.Rect(self.screen_width * 0.55, self.screen_height * 0.4, button_width, button_height)
+        custom_server_box = pygame.Rect(self.screen_width * 0.55, self.screen_height * 0.55, button_width, button_height)
+        with self.lock:
+            servers = tuple(self.servers)
+        server_rects = [pygame.Rect(self.screen_width * 0.05, self.screen_height * (0.2 + i * 0.1), self.screen_width * 0.4, self.screen_height * 0.08) for i in range(len(servers))]
+
+        regions = self.dirty_regions
+        regions.track("background", self.screen.get_rect(), self.frame_index)
+        for name, button in (("join", join_button), ("back", back_button), ("add_server", add_server_button)):
+            regions.track(name, button.inflate(20, 20), button.collidepoint(mouse_pos))
+        for name, box, text in (("username", username_box, self.username), ("custom_server", custom_server_box, self.custom_server)):
+            # Typed text can run past the box, so the rest of the row is redrawn with it
+            row = pygame.Rect(box.left - 5, box.top - 5, self.screen_width - box.left + 5, box.height + 10)
+            regions.track(name, row, (text, self.active_input == name))
+        server_list = pygame.Rect(server_rects[0]).unionall(server_rects).inflate(10, 10) if server_rects else pygame.Rect(0, 0, 0, 0)
+        regions.track("servers", server_list, (servers, self.selected_server))
+        if not regions:
+            return
+
+        screen.blit(frames[self.frame_index], (0, 0))
+
         # Render title
         self.draw_text_with_shadow(screen, "Available Servers", self.title_font, title_color, shadow_color, (self.screen_width * 0.3, self.screen_height * 0.1))
 
         # Render buttons with hover effects and shadow text
-        mouse_pos = pygame.mouse.get_pos()
         self.draw_button(screen, join_button, "Join", join_button.collidepoint(mouse_pos))
         self.draw_button(screen, back_button, "Back", back_button.collidepoint(mouse_pos))
         self.draw_button(screen, add_server_button, "Add Custom Server", add_server_button.collidepoint(mouse_pos))
 
         # Render input boxes
-        username_box = pygame.Rect(self.screen_width * 0.55, self.screen_height * 0.4, button_width, button_height)
-        custom_server_box = pygame.Rect(self.screen_width * 0.55, self.screen_height * 0.55, button_width, button_height)
         self.draw_input_box(screen, "Enter Username:", username_box, self.username, self.active_input == 'username')
         self.draw_input_box(screen, "Custom Server IP:", custom_server_box, self.custom_server, self.active_input == 'custom_server')
 
         # Render server list
-        with self.lock:
-            for i, server in enumerate(self.servers):
-                server_rect = pygame.Rect(self.screen_width * 0.05, self.screen_height * (0.2 + i * 0.1), self.screen_width * 0.4, self.screen_height * 0.08)
-
-                # Check if this server is selected, and change color accordingly
-                if self.selected_server == server:
-                    server_color = (255, 255, 102)  # Highlighted color for selected server
-                else:
-                    server_color = self.button_color
+        for server, server_rect in zip(servers, server_rects):
+            # Check if this server is selected, and change color accordingly
+            if self.selected_server == server:
+                server_color = (255, 255, 102)  # Highlighted color for selected server
+            else:
+                server_color = self.button_color
 
-                pygame.draw.rect(screen, server_color, server_rect, border_radius=10)
-                server_name = server.split("\n")[0]
-                self.draw_text_with_shadow(screen, server_name, self.font, self.text_color, shadow_color, server_rect.center)
+            pygame.draw.rect(screen, server_color, server_rect, border_radius=10)
+            server_name = server.split("\n")[0]
+            self.draw_text_with_shadow(screen, server_name, self.font, self.text_color, shadow_color, server_rect.center)
 
 class OptionsScene(Scene):
     def __init__(self, screen):
         super().__init__(screen)
         self.fullscreen = fullscreen  # Assume fullscreen is a global variable
         self.back_button = None
+        self.dirty_regions = DirtyRegions()
 
     def render(self):
         global running
@@ -1787,43 +1729,54 @@ class OptionsScene(Scene):
         button_hover_color = (70, 170, 255)
         text_color = (255, 255, 255)
 
-        screen.fill(background_color)
-
         # Set up fonts
-        font = pygame.font.Font(None, int(self.screen_height * 0.05))
+        font = text_cache.font(None, int(self.screen_height * 0.05))
 
-        # Volume slider text
-        volume_text = font.render(f"Volume: {volume}", True, text_color)
+        volume_text = text_cache.render(font, f"Volume: {volume}", text_color)
         volume_rect = pygame.Rect((self.screen_width / 2 - 100, self.screen_height * 0.3, 200, 10))
-        pygame.draw.rect(screen, (255, 255, 255), volume_rect)
-
-        volume_slider_pos = int(volume_rect.x + (volume / 100) * volume_rect.width)
-        pygame.draw.circle(screen, (255, 0, 0), (volume_slider_pos, volume_rect.y + 5), 8)
-
-        screen.blit(volume_text, (self.screen_width / 2 - 100, self.screen_height * 0.2))
-
-        # Fullscreen toggle button
         toggle_text = "Fullscreen: On" if self.fullscreen else "Fullscreen: Off"
-        toggle_surf = font.render(toggle_text, True, text_color)
+        toggle_surf = text_cache.render(font, toggle_text, text_color)
         toggle_rect = toggle_surf.get_rect(center=(self.screen_width / 2, self.screen_height * 0.5))
-        pygame.draw.rect(screen, (255, 255, 255), toggle_rect.inflate(20, 10), 2)
-        screen.blit(toggle_surf, toggle_rect)
-
-        # Back button
-        back_text = font.render("Back", True, text_color)
+        back_text = text_cache.render(font, "Back", text_color)
         back_rect = pygame.Rect(self.screen_width / 2 - 100, self.screen_height * 0.7, 200, 50)
-        if back_rect.collidepoint(pygame.mouse.get_pos()):
-            pygame.draw.rect(screen, button_hover_color, back_rect)
-        else:
-            pygame.draw.rect(screen, button_color, back_rect)
-
-        screen.blit(back_text, (self.screen_width / 2 - back_rect.width / 4, self.screen_height * 0.7 + back_rect.height / 4))
+        back_hovered = back_rect.collidepoint(pygame.mouse.get_pos())
 
         # Store rects for later use
         self.volume_rect = volume_rect
         self.toggle_rect = toggle_rect
         self.back_button = back_rect
 
+        # Work out what changed since the last loop, and draw only if something did
+        regions = self.dirty_regions
+        regions.track("background", self.screen.get_rect())
+        volume_area = volume_text.get_rect(topleft=(self.screen_width / 2 - 100, self.screen_height * 0.2)).union(volume_rect.inflate(20, 20))
+        regions.track("volume", volume_area, volume)
+        regions.track("fullscreen", toggle_rect.inflate(24, 14), self.fullscreen)
+        regions.track("back", back_rect, back_hovered)
+
+        if regions:
+            screen.fill(background_color)
+
+            # Volume slider and its text
+            pygame.draw.rect(screen, (255, 255, 255), volume_rect)
+
+            volume_slider_pos = int(volume_rect.x + (volume / 100) * volume_rect.width)
+            pygame.draw.circle(screen, (255, 0, 0), (volume_slider_pos, volume_rect.y + 5), 8)
+
+            screen.blit(volume_text, (self.screen_width / 2 - 100, self.screen_height * 0.2))
+
+            # Fullscreen toggle button
+            pygame.draw.rect(screen, (255, 255, 255), toggle_rect.inflate(20, 10), 2)
+            screen.blit(toggle_surf, toggle_rect)
+
+            # Back button
+            if back_hovered:
+                pygame.draw.rect(screen, button_hover_color, back_rect)
+            else:
+                pygame.draw.rect(screen, button_color, back_rect)
+
+            screen.blit(back_text, (self.screen_width / 2 - back_rect.width / 4, self.screen_height * 0.7 + back_rect.height / 4))
+
         # Handle user input
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -1836,6 +1789,7 @@ class OptionsScene(Scene):
                 elif self.toggle_rect.collidepoint(event.pos):
                     self.fullscreen = not self.fullscreen
                     pygame.display.toggle_fullscreen()
+                    self.dirty_regions.invalidate()  # The display may have been recreated
                 elif self.back_button.collidepoint(event.pos):
                     current_scene = MainMenu(screen)
                     return
@@ -1846,8 +1800,8 @@ class OptionsScene(Scene):
 class MainMenu(Scene):
     def __init__(self, screen):
         super().__init__(screen)
+        self.dirty_regions = DirtyRegions()
         self.frame_index = 0
-        self.frames = []
         self.frame_delay = 75  # Delay in milliseconds between frames
         self.last_frame_update = pygame.time.get_ticks()  # Time of the last frame update
 
@@ -1856,18 +1810,11 @@ class MainMenu(Scene):
         self.button_color = (85, 255, 255)
         self.hover_color = (255, 51, 153) 
         self.text_color = (255, 153, 0)
-        self.font = pygame.font.Font((f"{sprites_folder}\Fonts\\retro_font.ttf"), int(self.screen_height * 0.025))
-        self.title_font = pygame.font.Font((f"{sprites_folder}\Fonts\\retro_font.ttf"), int(self.screen_height * 0.055))
+        self.font = text_cache.font(str(sprites_folder / "Fonts" / "retro_font.ttf"), int(self.screen_height * 0.025))
+        self.title_font = text_cache.font(str(sprites_folder / "Fonts" / "retro_font.ttf"), int(self.screen_height * 0.055))
         
-        # Load all the frames from the GIF-like images
-        self.load_frames_from_folder(f"{sprites_folder}\Game\menu_background")
-
-    def load_frames_from_folder(self, folder_path):
-        for filename in sorted(os.listdir(folder_path)):
-            if filename.endswith(".png"):
-                frame = pygame.image.load(os.path.join(folder_path, filename)).convert_alpha()
-                scaled_frame = pygame.transform.scale(frame, (self.screen_width, self.screen_height))
-                self.frames.append(scaled_frame)
+        # The frames of the GIF-like background, loaded in the background and played as they arrive
+        self.frames = assets.frames(sprites_folder / "Game" / "menu_background", (self.screen_width, self.screen_height))
 
     def draw_text_with_shadow(self, screen, text, font, text_color, shadow_color, position, shadow_offset=5):
         """
@@ -1883,12 +1830,12 @@ class MainMenu(Scene):
         - shadow_offset: The offset for the shadow (default is 5 pixels).
         """
         # Render shadow text (offset by shadow_offset pixels)
-        shadow_text = font.render(text, True, shadow_color)
+        shadow_text = text_cache.render(font, text, shadow_color)
         shadow_rect = shadow_text.get_rect(center=(position[0] + shadow_offset, position[1] + shadow_offset))
         screen.blit(shadow_text, shadow_rect)
 
         # Render the main text on top
-        main_text = font.render(text, True, text_color)
+        main_text = text_cache.render(font, text, text_color)
         main_rect = main_text.get_rect(center=position)
         screen.blit(main_text, main_rect)
 
@@ -1920,8 +1867,9 @@ class MainMenu(Scene):
 
         current_time = pygame.time.get_ticks()
 
+        frames = ready(self.frames)  # The LoadingScene before the menus waited for the first
         if current_time - self.last_frame_update > self.frame_delay:
-            self.frame_index = (self.frame_index + 1) % len(self.frames)  # Loop back to the first frame
+            self.frame_index = (self.frame_index + 1) % len(frames)  # Loop back to the first frame
             self.last_frame_update = current_time  # Update the time of the last frame change
 
         shadow_color = (0, 0, 0)
@@ -1962,8 +1910,16 @@ class MainMenu(Scene):
                     running = False
                     return
 
+        # Work out what changed since the last loop, and draw nothing if nothing did
+        regions = self.dirty_regions
+        regions.track("background", self.screen.get_rect(), self.frame_index)
+        for name, button in (("server_select", server_select_rect), ("options", options_rect), ("exit", exit_rect)):
+            regions.track(name, button.inflate(20, 20), button.collidepoint(mouse_pos))
+        if not regions:
+            return
+
         # Render background
-        screen.blit(self.frames[self.frame_index], (0, 0))
+        screen.blit(frames[self.frame_index], (0, 0))
 
         # Render title
         self.draw_text_with_shadow(screen, str.upper(GAME_NAME), self.title_font, title_color, shadow_color, (self.screen_width / 2, self.screen_height * 0.2))
@@ -1973,10 +1929,12 @@ class MainMenu(Scene):
         self.draw_button(screen, options_rect, "Options", options_rect.collidepoint(mouse_pos))
         self.draw_button(screen, exit_rect, "Exit", exit_rect.collidepoint(mouse_pos))
 
-current_scene = MainMenu(screen)
+# The main menu is shown once its first background frame is ready
+current_scene = LoadingScene(screen, menu_background_frames[:1], lambda: MainMenu(screen))
 
 while running:
     pygame.mixer.music.set_volume(volume / 100)
+    sound_bank.set_volume(MASTER, min(1.0, volume))  # Sound effects stay at full volume unless it is turned all the way down
     if current_scene:  
         current_scene.update()
     else:
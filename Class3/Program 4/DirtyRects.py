@@ -0,0 +1,55 @@
+## Dirty rectangle tracking for scenes that mostly sit still
+## A menu looks the same from one loop to the next until the mouse moves over a button, text is
+## typed or its background animation moves on a frame. Each region of the scene reports what it
+## shows every loop, and only the regions showing something new are drawn and sent to the display
+## with pygame.display.update(rects) instead of flipping the whole screen.
+
+from typing import *
+import pygame
+
+MENU_FPS = 30  # Most loops a second a menu scene runs, it sleeps for the rest
+
+class DirtyRegions():
+    """
+    What every region of a scene showed last loop, and the areas that changed since.
+    """
+
+    def __init__(self):
+        self.states: Dict[str, Tuple[Tuple[int, int, int, int], Hashable]] = {}  # Region name -> (rect, what it shows)
+        self.dirty: List[pygame.Rect] = []
+
+    def track(self, name: str, rect: pygame.Rect, state: Hashable = None) -> bool:
+        """
+        Records what a region shows this loop. The region is dirty if it moved or shows something else,
+        and where it was before is dirty too so nothing is left behind.
+
+        Args:
+            name (str): Names the region from one loop to the next.
+            rect (pygame.Rect): Every pixel the region draws on.
+            state (Hashable): Anything that changes when the region would look different.
+
+        Returns:
+            bool: Whether the region is dirty.
+        """
+        area = tuple(pygame.Rect(rect))
+        previous = self.states.get(name)
+        if previous == (area, state):
+            return False
+
+        if previous is not None and previous[0] != area:
+            self.dirty.append(pygame.Rect(previous[0]))
+        self.dirty.append(pygame.Rect(area))
+        self.states[name] = (area, state)
+        return True
+
+    def invalidate(self):
+        """Forgets every region, so the next loop draws all of them."""
+        self.states.clear()
+
+    def take(self) -> List[pygame.Rect]:
+        """Returns the areas that changed this loop and starts the next one."""
+        dirty, self.dirty = self.dirty, []
+        return dirty
+
+    def __bool__(self) -> bool:
+        return bool(self.dirty)
@@ -0,0 +1,242 @@
+## Structure-of-arrays enemy simulation for the server
+## Instead of one EnemyModel per enemy, every attribute the server simulates is a NumPy array
+## with one entry per enemy, and a tick updates all of them at once. The steps and the order of
+## the arithmetic are the same as EnemyModel.update, so both give the same results.
+
+from GameModel import *
+from SpatialIndex import TerrainIndex
+
+try:
+    import numpy as np
+except ImportError:  # GameServer falls back to updating EnemyModel objects one at a time
+    np = None
+
+HAS_NUMPY = np is not None
+
+# Animations the server can put an enemy in, stored as an index into this list
+ENEMY_ANIMATIONS = ["Idle", "Run", "Attack", "Hurt", "Dead"]
+RUN = ENEMY_ANIMATIONS.index("Run")
+ATTACK = ENEMY_ANIMATIONS.index("Attack")
+
+ATTACK_RANGE = 50  # Enemies closer than this to their target attack it
+MAX_BRUTE_FORCE_PAIRS = 1 << 16  # Up to this many enemy-client pairs, checking every pair is faster than walking
+
+class EnemyEngine():
+    """
+    Holds the state of every server-side enemy as NumPy arrays and updates them together.
+    Enemies are added from EnemyModel objects and referred to by the same ids as GameServer.enemies.
+    """
+
+    FLOAT_FIELDS = ["x", "y", "velocity_x", "velocity_y", "speed", "health", "max_fall_speed", "half_height", "target_x", "target_y"]
+    INT_FIELDS = ["frame", "max_frames", "animation"]
+    BOOL_FIELDS = ["alive", "grounded", "has_target"]
+
+    def __init__(self):
+        if not HAS_NUMPY:
+            raise ImportError("EnemyEngine needs numpy, install it with 'pip install numpy'")
+
+        self.ids: List[str] = []
+        self.indexes: Dict[str, int] = {}  # Enemy id -> its position in the arrays
+        self.terrain_arrays = None  # (terrain index, lefts, rights, tops) the collision arrays were made from
+
+        # Each field lives in a buffer with room to spare, which doubles when it is full,
+        # and the attribute of the same name is a view of the part holding enemies
+        self.buffers: Dict[str, np.ndarray] = {}
+        for names, dtype in ((self.FLOAT_FIELDS, np.float64), (self.INT_FIELDS, np.int64), (self.BOOL_FIELDS, bool)):
+            for name in names:
+                self.buffers[name] = np.zeros(0, dtype=dtype)
+                setattr(self, name, self.buffers[name])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, id: str, enemy: EnemyModel):
+        """Adds an enemy, copying its current state."""
+        values = {
+            "x": enemy.position.x,
+            "y": enemy.position.y,
+            "velocity_x": enemy.velocity_x,
+            "velocity_y": enemy.velocity_y,
+            "speed": enemy.speed,
+            "health": enemy.health,
+            "max_fall_speed": enemy.max_fall_speed,
+            "half_height": (enemy.size * enemy.scale) // 2,
+            "target_x": enemy.target_position.x if enemy.target_position is not None else 0,
+            "target_y": enemy.target_position.y if enemy.target_position is not None else 0,
+            "frame": enemy.current_frame_index,
+            "max_frames": enemy.max_frames,
+            "animation": ENEMY_ANIMATIONS.index(enemy.current_animation),
+            "alive": enemy.is_alive,
+            "grounded": enemy.grounded,
+            "has_target": enemy.target_position is not None
+        }
+        count = len(self.ids)
+        if count == len(self.buffers["x"]):
+            capacity = max(16, count * 2)
+            for name, buffer in self.buffers.items():
+                grown = np.zeros(capacity, dtype=buffer.dtype)
+                grown[:count] = buffer
+                self.buffers[name] = grown
+
+        for name, value in values.items():
+            self.buffers[name][count] = value
+        for name, buffer in self.buffers.items():
+            setattr(self, name, buffer[:count + 1])
+
+        self.indexes[id] = count
+        self.ids.append(id)
+
+    def damage(self, id: str, damage: float):
+        """Applies damage to an enemy, killing it if its health runs out (see EnemyModel.die)."""
+        index = self.indexes.get(id)
+        if index is None:
+            return
+        self.health[index] -= damage
+        if self.health[index] <= 0:
+            self.alive[index] = False
+
+    def update(self, client_positions: List[Vector2], terrain: TerrainIndex, dt: float):
+        """
+        Runs one tick for every living enemy: chase the nearest client, gravity, movement,
+        ground collision, animation frame and attacking. The same steps as EnemyModel.update.
+
+        Args:
+            client_positions (List[Vector2]): A list of client positions.
+            terrain (TerrainIndex): The terrain's buildings indexed by x.
+            dt (float): Delta time for frame-independent movement.
+        """
+        alive = np.flatnonzero(self.alive)
+        if len(alive) == 0:
+            return
+
+        x, y = self.x[alive], self.y[alive]
+
+        # Chase the nearest client
+        if client_positions:
+            client_x = np.array([position.x for position in client_positions], dtype=np.float64)
+            client_y = np.array([position.y for position in client_positions], dtype=np.float64)
+            nearest = self._nearest_clients(x, y, client_x, client_y)
+            self.target_x[alive] = client_x[nearest]
+            self.target_y[alive] = client_y[nearest]
+            self.has_target[alive] = True
+            self.animation[alive] = RUN
+
+        # Move towards the target horizontally
+        has_target = self.has_target[alive]
+        target_x, target_y = self.target_x[alive], self.target_y[alive]
+        direction_x, direction_y = target_x - x, target_y - y
+        length = np.sqrt(direction_x * direction_x + direction_y * direction_y)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            normalized_x = np.where(length > 0, direction_x / length, direction_x)
+        velocity_x = np.where(has_target, normalized_x * self.speed[alive], self.velocity_x[alive])
+
+        # Apply gravity to anything in the air
+        velocity_y = self.velocity_y[alive]
+        grounded = self.grounded[alive]
+        velocity_y = np.where(grounded, velocity_y, velocity_y + GRAVITY * dt * 10)
+        max_fall_speed = self.max_fall_speed[alive]
+        velocity_y = np.where(~grounded & (velocity_y > max_fall_speed), max_fall_speed, velocity_y)
+
+        # Update position based on velocities
+        x = x + velocity_x * dt
+        y = y + velocity_y * dt
+
+        # Land on the first building under each enemy whose roof it has reached
+        half_height = self.half_height[alive]
+        tops = self._ground_under(x, y, half_height, terrain)
+        grounded = ~np.isnan(tops)
+        y = np.where(grounded, tops - half_height, y)
+        velocity_y = np.where(grounded, 0.0, velocity_y)
+
+        # Advance the animation and attack targets in range. Like EnemyModel.update, a target at (0, 0) is ignored
+        self.frame[alive] = (self.frame[alive] + 1) % self.max_frames[alive]
+        distance = np.sqrt((x - target_x) ** 2 + (y - target_y) ** 2)
+        attacking = has_target & ((target_x != 0) | (target_y != 0)) & (distance < ATTACK_RANGE)
+        self.animation[alive[attacking]] = ATTACK
+
+        self.x[alive], self.y[alive] = x, y
+        self.velocity_x[alive], self.velocity_y[alive] = velocity_x, velocity_y
+        self.grounded[alive] = grounded
+
+    def _nearest_clients(self, x, y, client_x, client_y):
+        """
+        Returns the index of the client nearest to each enemy, the first one on ties like min().
+        Like PositionGrid, clients are sorted by x and each enemy walks outwards from where it would
+        sit among them, on both sides, until the next client is further away along x alone than the
+        nearest one found. All enemies take each step together. With few enough enemies and clients
+        every pair is checked instead, which takes fewer NumPy calls.
+        """
+        if len(x) * len(client_x) <= MAX_BRUTE_FORCE_PAIRS:
+            dx = client_x[None, :] - x[:, None]
+            dy = client_y[None, :] - y[:, None]
+            return np.argmin(dx * dx + dy * dy, axis=1)
+
+        order = np.argsort(client_x, kind='stable')
+        sorted_x, sorted_y = client_x[order], client_y[order]
+        count = len(order)
+
+        nearest = np.zeros(len(x), dtype=np.int64)
+        best = np.full(len(x), np.inf)
+        right = np.searchsorted(sorted_x, x, side='left')
+        cursors = [right - 1, right]  # Next client to check on the left and on the right of each enemy
+        searching = [cursors[0] >= 0, cursors[1] < count]
+
+        while searching[0].any() or searching[1].any():
+            for side, step in ((0, -1), (1, 1)):
+                enemies = np.flatnonzero(searching[side])
+                if len(enemies) == 0:
+                    continue
+                client = cursors[side][enemies]
+                dx = sorted_x[client] - x[enemies]
+                dy = sorted_y[client] - y[enemies]
+                distance = dx * dx + dy * dy
+                candidate = order[client]
+                closer = (distance < best[enemies]) | ((distance == best[enemies]) & (candidate < nearest[enemies]))
+                best[enemies[closer]] = distance[closer]
+                nearest[enemies[closer]] = candidate[closer]
+
+                client = client + step
+                cursors[side][enemies] = client
+                next_dx = sorted_x[np.clip(client, 0, count - 1)] - x[enemies]
+                searching[side][enemies] = (client >= 0) & (client < count) & (next_dx * next_dx <= best[enemies])
+        return nearest
+
+    def _ground_under(self, x, y, half_height, terrain: TerrainIndex):
+        """
+        Returns the roof each enemy lands on this tick, or NaN for enemies still in the air.
+        Buildings are checked in the same order as TerrainIndex.at.
+        """
+        if self.terrain_arrays is None or self.terrain_arrays[0] is not terrain:
+            buildings = np.array(terrain.buildings, dtype=np.float64).reshape(-1, 4)
+            self.terrain_arrays = (terrain, buildings[:, 0], buildings[:, 1], buildings[:, 2])
+        _, lefts, rights, tops = self.terrain_arrays
+
+        # Only buildings starting within max_width to the left of an enemy can be under it
+        first = np.searchsorted(lefts, x - terrain.max_width, side='left')
+        last = np.searchsorted(lefts, x, side='right')
+        ground = np.full(len(x), np.nan)
+        for offset in range(int((last - first).max(initial=0))):
+            building = first + offset
+            candidate = building < last
+            building = np.where(candidate, building, 0)
+            landed = (candidate & np.isnan(ground) & (rights[building] >= x) & (x >= lefts[building])
+                      & (y + half_height >= tops[building]))
+            ground[landed] = tops[building[landed]]
+        return ground
+
+    def enemy_data(self) -> Dict[str, dict]:
+        """Returns every enemy in the same form as GameServer.enemy_data."""
+        animations = [ENEMY_ANIMATIONS[animation] for animation in self.animation.tolist()]
+        return {
+            id: {
+                "position": {"x": x, "y": y},
+                "health": health,
+                "animation_frame": frame,
+                "current_animation": animation,
+                "is_alive": alive
+            }
+            for id, x, y, health, frame, animation, alive in zip(
+                self.ids, self.x.tolist(), self.y.tolist(), self.health.tolist(),
+                self.frame.tolist(), animations, self.alive.tolist()
+            )
+        }
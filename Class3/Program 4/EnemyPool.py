@@ -0,0 +1,57 @@
+## The client's enemies, kept from one frame to the next
+## Every snapshot lists every enemy, but an enemy rarely changes more than its position between
+## two frames. The pool keeps one Enemy per server enemy id and only touches what changed, makes
+## an Enemy the first time an id shows up and drops it once the server stops listing it.
+
+from GameConstants import *
+
+class EnemyPool():
+    """
+    Client side Enemy objects by the id the server gave them. Only used from the game loop.
+    """
+
+    def __init__(self):
+        self.enemies: Dict[str, Enemy] = {}
+        self.created = 0  # Enemies made since the pool was, to check they aren't remade every frame
+
+    def sync(self, enemy_data: Dict[str, dict], positions: Dict[str, Tuple[float, float]], player_position: Position):
+        """
+        Brings the pool up to date with the enemies in the latest snapshot.
+
+        Args:
+            enemy_data (Dict[str, dict]): ServerPacket.enemy_data, enemy id -> its record.
+            positions (Dict[str, Tuple[float, float]]): Where the interpolation buffer puts each enemy in
+                the world right now, enemies missing from it are drawn where the snapshot has them.
+            player_position (Position): The local player's position, to turn world positions into screen ones.
+        """
+        for id in self.enemies.keys() - enemy_data.keys():
+            del self.enemies[id]
+
+        for id, data in enemy_data.items():
+            position = positions.get(id)
+            screen_position = CalculateScreenPosition(Position(*position) if position else data["position"], player_position)
+
+            enemy = self.enemies.get(id)
+            if enemy is None:
+                enemy = Enemy(position=screen_position, health=data["health"])
+                self.enemies[id] = enemy
+                self.created += 1
+            else:
+                enemy.position.update(screen_position)
+
+            if data["current_animation"] != enemy.current_animation:
+                enemy.current_animation = data["current_animation"]
+                enemy.load_animation(enemy.current_animation)  # Frames come from the sprite atlas, nothing is read from disk
+            enemy.health = data["health"]
+            enemy.is_alive = data["is_alive"]
+            # The server counts frames against the Idle sheet, which can be longer than this one
+            enemy.current_frame_index = data["animation_frame"] % len(enemy.animation_frames)
+
+    def clear(self):
+        self.enemies.clear()
+
+    def __iter__(self) -> Iterator[Enemy]:
+        return iter(self.enemies.values())
+
+    def __len__(self) -> int:
+        return len(self.enemies)
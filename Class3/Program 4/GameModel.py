@@ -0,0 +1,420 @@
+## The game's model, shared by the client and the server
+## Everything the server simulates and sends, and nothing it would need a display for. The server
+## only imports this, so a dedicated server starts without pygame, Pillow or a screen, and fast.
+## GameConstants adds what the client draws with on top of it.
+
+import math, struct
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import *
+from Weapons import *
+from Movement import *  # Physics constants, player sizes and player movement
+
+GAME_NAME = "RETRO KNIGHTS"
+
+## Directories
+sprites_folder = Path(__file__).parent / 'Sprites'
+LOCALDIR = Path(__file__).parent  # Setting the local working directory to the parent of this file
+SERVERDATADIR = LOCALDIR / "ServerData"
+ABSSERVERDATADIR = SERVERDATADIR.resolve()
+
+## Sprite sheets, sliced into square frames of these sizes
+PLAYER_FRAME_SIZE = 150
+ENEMY_FRAME_SIZE = 128
+
+## Geometry
+
+class Vector2():
+    """
+    A 2D vector for the server's positions, with the parts of pygame.Vector2 the simulation uses
+    and the same arithmetic, so a simulation gives the same results with either.
+    """
+    __slots__ = ("x", "y")
+
+    def __init__(self, x: Union[float, Sequence[float]] = 0, y: Optional[float] = None):
+        if y is None:
+            x, y = x
+        self.x = float(x)
+        self.y = float(y)
+
+    def __add__(self, other) -> 'Vector2':
+        return Vector2(self.x + other[0], self.y + other[1])
+
+    def __sub__(self, other) -> 'Vector2':
+        return Vector2(self.x - other[0], self.y - other[1])
+
+    def __mul__(self, scalar: float) -> 'Vector2':
+        return Vector2(self.x * scalar, self.y * scalar)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, scalar: float) -> 'Vector2':
+        return Vector2(self.x / scalar, self.y / scalar)
+
+    def __neg__(self) -> 'Vector2':
+        return Vector2(-self.x, -self.y)
+
+    def __getitem__(self, index: int) -> float:
+        return (self.x, self.y)[index]
+
+    def __iter__(self) -> Iterator[float]:
+        yield self.x
+        yield self.y
+
+    def __len__(self) -> int:
+        return 2
+
+    def __eq__(self, other) -> bool:
+        try:
+            return len(other) == 2 and self.x == other[0] and self.y == other[1]
+        except TypeError:
+            return NotImplemented
+
+    def __bool__(self) -> bool:
+        return self.x != 0 or self.y != 0  # Like pygame.Vector2, (0, 0) is false
+
+    def __repr__(self) -> str:
+        return f"Vector2({self.x}, {self.y})"
+
+    def length(self) -> float:
+        return math.sqrt(self.x * self.x + self.y * self.y)
+
+    def length_squared(self) -> float:
+        return self.x * self.x + self.y * self.y
+
+    def normalize(self) -> 'Vector2':
+        length = self.length()
+        if length == 0:
+            raise ValueError("Can't normalize Vector of length Zero")
+        return Vector2(self.x / length, self.y / length)
+
+    def distance_to(self, other) -> float:
+        return math.sqrt(self.distance_squared_to(other))
+
+    def distance_squared_to(self, other) -> float:
+        dx, dy = self.x - other[0], self.y - other[1]
+        return dx * dx + dy * dy
+
+    def copy(self) -> 'Vector2':
+        return Vector2(self.x, self.y)
+
+class Rect():
+    """
+    An axis-aligned rectangle with whole pixel coordinates, truncated toward zero like pygame.Rect,
+    for the server's hit detection.
+    """
+    __slots__ = ("x", "y", "w", "h")
+
+    def __init__(self, x: float, y: float, w: float, h: float):
+        self.x, self.y, self.w, self.h = int(x), int(y), int(w), int(h)
+
+    @property
+    def left(self) -> int:
+        return self.x
+
+    @property
+    def top(self) -> int:
+        return self.y
+
+    @property
+    def right(self) -> int:
+        return self.x + self.w
+
+    @property
+    def bottom(self) -> int:
+        return self.y + self.h
+
+    def colliderect(self, other) -> bool:
+        """
+        Whether the rectangles overlap. Like pygame.Rect, touching edges and empty rectangles don't,
+        and a negative width or height reaches back from x or y.
+        """
+        if not (self.w and self.h and other.w and other.h):
+            return False
+        return (min(self.x, self.x + self.w) < max(other.x, other.x + other.w)
+                and min(other.x, other.x + other.w) < max(self.x, self.x + self.w)
+                and min(self.y, self.y + self.h) < max(other.y, other.y + other.h)
+                and min(other.y, other.y + other.h) < max(self.y, self.y + self.h))
+
+    def __iter__(self) -> Iterator[int]:
+        return iter((self.x, self.y, self.w, self.h))
+
+    def __eq__(self, other) -> bool:
+        try:
+            return tuple(self) == tuple(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Rect({self.x}, {self.y}, {self.w}, {self.h})"
+
+@lru_cache(maxsize=None)
+def png_size(path: str) -> Tuple[int, int]:
+    """
+    Returns the width and height of a PNG from its header, without decoding it.
+
+    Raises:
+        FileNotFoundError: If there is no such file.
+        ValueError: If the file isn't a PNG.
+    """
+    with open(path, "rb") as file:
+        header = file.read(24)
+    if header[:8] != b"\x89PNG\r\n\x1a\n" or header[12:16] != b"IHDR":
+        raise ValueError(f"{path} is not a PNG")
+    return struct.unpack(">II", header[16:24])
+
+## Enemy class
+
+class EnemyModel:
+    """
+    An enemy as the server simulates it. Its animation is only a name and a frame index,
+    the client's Enemy in GameConstants loads and draws the frames.
+    """
+
+    def __init__(self, position: Vector2, speed: float = 160.0, health: int = 100, scale: float = 1.5, size: int = ENEMY_FRAME_SIZE):
+        """
+        Initializes the enemy with basic attributes.
+
+        Args:
+            position (Vector2): Starting position of the enemy, a pygame.Vector2 works too.
+            speed (float): Base horizontal movement speed of the enemy.
+            health (int): Health of the enemy.
+            scale (float): Scaling factor for rendering the enemy larger or smaller.
+            size (int): Size of a single frame.
+        """
+        self.position = position
+        self.velocity_x = 0  # Horizontal velocity
+        self.velocity_y = 0  # Vertical velocity (affected by gravity)
+        self.speed = speed
+        self.health = health
+        self.max_fall_speed = 20  # Maximum fall speed
+        self.scale = scale
+        self.target_position = None
+        self.is_alive = True
+        self.grounded = False  # To track whether the enemy is on the ground
+        self.current_animation = "Idle"
+        self.current_frame_index = 0
+        self.size = size  # Size of each frame in the sprite sheet
+
+        # Determine the number of frames in the animation without loading them
+        self.max_frames = self.determine_frame_count("Idle")
+
+    def load_animation(self, action: str):
+        """
+        Called when the enemy changes animation. The server has no frames to load.
+        """
+
+    def update_frame_index(self):
+        """
+        Moves on to the next frame of the animation, once a tick on the server.
+        """
+        self.current_frame_index = (self.current_frame_index + 1) % self.max_frames
+
+    def apply_gravity(self, dt: float):
+        """
+        Applies gravity to the enemy's vertical velocity.
+
+        Args:
+            dt (float): Delta time for frame-independent movement.
+        """
+        if not self.grounded:
+            self.velocity_y += GRAVITY * dt * 10  # Increase velocity downward due to gravity
+            if self.velocity_y > self.max_fall_speed:
+                self.velocity_y = self.max_fall_speed  # Cap the falling speed
+
+    def move_towards_target(self, dt: float):
+        """
+        Moves the enemy towards the target position horizontally.
+
+        Args:
+            dt (float): Delta time for frame-independent movement.
+        """
+        if self.target_position is None:
+            return
+
+        # Calculate direction to the target
+        direction = self.target_position - self.position
+        if direction.length() > 0:
+            direction = direction.normalize()
+
+        # Apply horizontal movement speed (no impact on vertical movement here)
+        self.velocity_x = direction.x * self.speed
+
+    def chase_nearest_client(self, clients_positions: List[Vector2], client_grid: Optional['PositionGrid'] = None):
+        """
+        Updates the target position to chase the nearest client.
+
+        Args:
+            clients_positions (List[Vector2]): List of all client positions.
+            client_grid (PositionGrid): The same positions indexed by x. When given, it is used
+                instead of checking every client.
+        """
+        if not clients_positions:
+            return
+
+        # Find the nearest client
+        if client_grid is not None:
+            nearest_client = client_grid.nearest(self.position.x, self.position.y)
+        else:
+            nearest_client = min(clients_positions, key=self.position.distance_squared_to)
+
+        # Set target position to the nearest client's position
+        self.target_position = nearest_client
+
+        # Switch to the "Run" animation when chasing a client
+        if self.current_animation != "Run":
+            self.current_animation = "Run"
+            self.load_animation("Run")
+
+    def attack(self):
+        """
+        Triggers the enemy's attack behavior.
+        """
+        # Switch to the "Attack" animation when attacking
+        if self.current_animation != "Attack":
+            self.current_animation = "Attack"
+            self.load_animation("Attack")
+
+    def take_damage(self, damage: int):
+        """
+        Reduces the enemy's health when it takes damage.
+
+        Args:
+            damage (int): Amount of damage the enemy takes.
+        """
+        self.health -= damage
+        if self.health <= 0:
+            self.is_alive = False
+            self.die()
+        else:
+            self.load_animation("Hurt")
+
+    def die(self):
+        """
+        Handles the enemy's death (e.g., removal from the game).
+        """
+        self.is_alive = False
+        self.load_animation("Dead")
+
+    def check_collision(self, terrain: 'TerrainIndex'):
+        """
+        Checks for collisions with the terrain and updates the position accordingly.
+
+        Args:
+            terrain (TerrainIndex): The terrain's buildings indexed by x.
+        """
+        for _, _, top, _ in terrain.at(self.position.x):
+            # Check if the enemy's Y is above the ground level of a building it is over
+            if self.position.y + (self.size * self.scale) // 2 >= top:
+                self.grounded = True
+                self.position.y = top - (self.size * self.scale) // 2
+                self.velocity_y = 0  # Stop downward movement
+                return
+        self.grounded = False  # No collision, not grounded
+
+    def determine_frame_count(self, action: str) -> int:
+        """
+        Determines the number of frames in the sprite sheet from the width in its PNG header.
+
+        Args:
+            action (str): The name of the animation action (e.g., "Run", "Idle").
+
+        Returns:
+            int: The number of frames in the sprite sheet.
+        """
+        sprite_sheet_path = f"{sprites_folder}/Enemies/{action}.png"
+        try:
+            sheet_width, _ = png_size(sprite_sheet_path)  # Only care about the width
+            return sheet_width // self.size  # Divide width by the frame size to get the number of frames
+        except FileNotFoundError:
+            print(f"Error: Could not find sprite sheet at {sprite_sheet_path}")
+            return 1  # Default to 1 frame if the sprite sheet is not found
+
+    def update(self, clients_positions: List[Vector2], terrain: 'TerrainIndex', dt: float, client_grid: Optional['PositionGrid'] = None):
+            """
+            Updates the enemy's state, including movement, collisions, and chasing the nearest client.
+
+            Args:
+                clients_positions (List[Vector2]): List of all client positions.
+                terrain (TerrainIndex): The terrain's buildings indexed by x.
+                dt (float): Delta time for frame-independent movement.
+                client_grid (PositionGrid): The client positions indexed by x, see chase_nearest_client.
+            """
+            if not self.is_alive:
+                return
+
+            # Chase the nearest client and move towards them
+            self.chase_nearest_client(clients_positions, client_grid)
+            self.move_towards_target(dt)
+
+            # Apply gravity and update vertical movement
+            self.apply_gravity(dt)
+
+            # Update position based on velocities
+            self.position.x += self.velocity_x * dt
+            self.position.y += self.velocity_y * dt
+
+            # Check for collisions with the terrain
+            self.check_collision(terrain)
+
+            # Update frame index for animations
+            self.update_frame_index()
+
+            # Check if the enemy should attack
+            if self.target_position and self.position.distance_to(self.target_position) < 50:
+                self.attack()
+
+## Some dataclasses to make it clearer what is being sent between the client and server
+
+# Client
+@dataclass
+class Position:
+    x: int
+    y: int
+
+@dataclass
+class WeaponData:
+    name: str
+    range: float
+    damage: float
+
+@dataclass
+class GameData:
+    HP: int
+    facing_right: bool
+    current_animation: str
+    current_frame_index: int
+    last_frame_time: int
+    player_scale: float
+    velocity: float
+    velocity_y: float
+    grounded: bool
+    movement_disabled: bool
+    current_weapon: Optional[Union['Weapon', WeaponData]]
+    animation_in_progress: bool
+
+@dataclass
+class ClientPacket:
+    username: str
+    position: Position
+    gameData: GameData
+    ack: int = 0  # Tick of the last server snapshot the client applied, 0 for none
+
+# Server
+@dataclass
+class ServerJoinPacket:
+    servername: str
+    serverip: str
+    serverport: int
+    protocols: List[str] = field(default_factory=lambda: ["json"])  # Protocols the server speaks
+    animation_table: List[str] = field(default_factory=list)  # Animation names sent by index
+    terrain: List[List[Tuple[int, int]]] = field(default_factory=list)  # Static, so only sent once
+    tick_rate: int = 60  # Simulation ticks per second, snapshot ticks are counted in these
+    client_id: str = ""  # The key the joining client has in snapshots, so it can find itself
+
+@dataclass
+class ServerPacket:
+    terrain: List[int]
+    clients_data: Dict[str, ClientPacket]
+    enemy_data: Dict[str, Dict]  # A list of enemy data dictionaries for each enemy
@@ -0,0 +1,103 @@
+## Server-side hit detection with lag compensation
+## A client draws the world as it was in the last snapshot it received, so by the time its attack
+## reaches the server the enemies have moved on. The server keeps the enemies of the last few ticks
+## in a ring buffer and checks the weapon's hitbox against the enemies where the attacker saw them.
+## Weapon range and damage come from the server's own WEAPONS table, never from the client.
+
+from GameModel import *
+
+MAX_REWIND_TICKS = 30  # Half a second at 60 Hz, older view ticks are checked against the oldest tick kept
+ENEMY_SIZE = 128  # Width and height of an enemy's hitbox, centered on its position
+MIN_ATTACK_INTERVAL_TICKS = 15  # Attacks a client sends closer together than this are ignored
+
+def weapon_hitbox(position: Position, facing_right: bool, weapon_range: float) -> Rect:
+    """
+    Returns the world space area a weapon swung from position reaches,
+    in front of the player and as tall as the player.
+    """
+    if facing_right:
+        left = position.x + (PLAYER_WIDTH // 2)
+    else:
+        left = position.x - (PLAYER_WIDTH // 2) - weapon_range
+    return Rect(left, position.y - (PLAYER_HEIGHT // 2), weapon_range, PLAYER_HEIGHT)
+
+def enemy_hitbox(x: float, y: float) -> Rect:
+    return Rect(x - (ENEMY_SIZE // 2), y - (ENEMY_SIZE // 2), ENEMY_SIZE, ENEMY_SIZE)
+
+class EnemyHistory():
+    """
+    The enemies of the last few ticks, as GameServer.enemy_data records, in a fixed-size ring.
+    GameServer builds a new enemy_data every tick, so recording one keeps a reference and copies nothing.
+    """
+
+    def __init__(self, size: int = MAX_REWIND_TICKS + 1):
+        self.size = size
+        self.ticks = [0] * size  # Tick stored in each slot, 0 for an empty slot
+        self.enemies: List[Optional[Dict[str, dict]]] = [None] * size
+        self.latest = 0
+
+    def record(self, tick: int, enemy_data: Dict[str, dict]):
+        slot = tick % self.size
+        self.ticks[slot] = tick
+        self.enemies[slot] = enemy_data
+        self.latest = tick
+
+    def rewind(self, tick: int) -> Tuple[int, Optional[Dict[str, dict]]]:
+        """
+        Returns the tick closest to the given one that is still kept, and the enemies at that tick.
+        The enemies are None if nothing has been recorded yet.
+        """
+        tick = min(max(tick, self.latest - self.size + 1, 1), self.latest)
+        slot = tick % self.size
+        if self.ticks[slot] != tick:
+            return self.latest, self.enemies[self.latest % self.size]
+        return tick, self.enemies[slot]
+
+class HitResolver():
+    """
+    Works out which enemies an attack hits. Only used from the tick thread.
+    """
+
+    def __init__(self, history: EnemyHistory):
+        self.history = history
+        self.weapons = {name: make_weapon() for name, make_weapon in WEAPONS.items()}
+        self.last_attack_ticks: Dict[str, int] = {}  # Client address -> tick of its last accepted attack
+
+    def resolve(self, addr: str, position: Position, facing_right: bool, weapon_name: str, view_tick: int) -> Dict[str, float]:
+        """
+        Checks an attack against the enemies as they were at the tick the attacker was looking at.
+
+        Args:
+            addr (str): The attacker's address.
+            position (Position): The attacker's latest position.
+            facing_right (bool): Which way the attacker swung.
+            weapon_name (str): The attacker's weapon, looked up in WEAPONS.
+            view_tick (int): The snapshot tick the attacker had on screen when it attacked.
+
+        Returns:
+            Dict[str, float]: Enemy id -> damage dealt, empty if nothing was hit or the attack wasn't allowed.
+        """
+        weapon = self.weapons.get(weapon_name)
+        if weapon is None:
+            return {}
+
+        now = self.history.latest
+        last_attack = self.last_attack_ticks.get(addr)
+        if last_attack is not None and now - last_attack < MIN_ATTACK_INTERVAL_TICKS:
+            return {}
+        self.last_attack_ticks[addr] = now
+
+        _, enemies = self.history.rewind(view_tick)
+        if not enemies:
+            return {}
+
+        hitbox = weapon_hitbox(position, facing_right, weapon.range)
+        return {
+            id: weapon.damage
+            for id, enemy in enemies.items()
+            if enemy["is_alive"] and hitbox.colliderect(enemy_hitbox(enemy["position"]["x"], enemy["position"]["y"]))
+        }
+
+    def forget(self, addr: str):
+        """Drops what is kept about a client that disconnected."""
+        self.last_attack_ticks.pop(addr, None)
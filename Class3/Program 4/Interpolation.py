@@ -0,0 +1,121 @@
+## Smooth movement for remote players and enemies
+## Snapshots arrive at uneven times, so drawing every entity where the latest one put it makes
+## them stutter whenever the network jitters. Instead the client draws the world a fixed delay
+## behind the server, between the two snapshots either side of that moment, and keeps entities
+## moving along their last velocity for a short while if snapshots stop arriving.
+
+import threading, time
+from bisect import bisect_right
+from collections import deque
+from Snapshots import *
+
+INTERPOLATION_DELAY = 0.1  # Seconds remote entities are drawn behind the server, a few snapshots at 30 Hz
+MAX_EXTRAPOLATION = 0.25  # Seconds entities keep moving past the newest snapshot before they stop
+MAX_SNAPSHOTS = 32  # Snapshots kept, the oldest ones are only needed until the delay has passed them
+CLOCK_DRIFT = 0.01  # How quickly the server clock estimate gives up on an early outlier
+
+class InterpolationBuffer():
+    """
+    The positions of remote players and enemies in the last few snapshots, by tick, and where to
+    draw them right now. Snapshots are pushed from the network thread and sampled while drawing.
+    """
+
+    def __init__(self, tick_rate: int = 60, delay: float = INTERPOLATION_DELAY, max_extrapolation: float = MAX_EXTRAPOLATION, clock: Callable[[], float] = time.perf_counter):
+        """
+        Args:
+            tick_rate (int): The server's simulation ticks per second, to turn ticks into time.
+            delay (float): Seconds behind the server that entities are drawn.
+            max_extrapolation (float): Seconds past the newest snapshot entities keep moving.
+            clock (Callable[[], float]): Monotonic clock in seconds.
+        """
+        self.tick_rate = tick_rate
+        self.delay_ticks = delay * tick_rate
+        self.max_extrapolation_ticks = max_extrapolation * tick_rate
+        self.clock = clock
+        self.ticks: Deque[int] = deque(maxlen=MAX_SNAPSHOTS)
+        self.snapshots: Deque[Tuple[Dict[str, Tuple[float, float]], Dict[str, Tuple[float, float]]]] = deque(maxlen=MAX_SNAPSHOTS)  # (clients, enemies) positions
+        self.clock_offset: Optional[float] = None  # Local time minus server time, from the snapshots that arrived quickest
+        self.lock = threading.Lock()
+
+    def push(self, tick: int, state: WorldState):
+        """Adds the positions in a snapshot that just arrived."""
+        now = self.clock()
+        clients = {addr: (fields[1], fields[2]) for addr, fields in state.clients.items()}
+        enemies = {id: (fields[0], fields[1]) for id, fields in state.enemies.items()}
+
+        with self.lock:
+            if self.ticks and tick <= self.ticks[-1]:
+                return  # Already have it
+
+            # A snapshot can arrive late but never early, so the smallest offset seen is the best estimate.
+            # It creeps back up slowly so one lucky snapshot doesn't hold it down forever.
+            offset = now - tick / self.tick_rate
+            if self.clock_offset is None or offset < self.clock_offset:
+                self.clock_offset = offset
+            else:
+                self.clock_offset += (offset - self.clock_offset) * CLOCK_DRIFT
+
+            self.ticks.append(tick)
+            self.snapshots.append((clients, enemies))
+
+    def clear(self):
+        """Forgets everything, for a new connection."""
+        with self.lock:
+            self.ticks.clear()
+            self.snapshots.clear()
+            self.clock_offset = None
+
+    def render_tick(self) -> float:
+        """The server tick being drawn right now, 0 before the first snapshot."""
+        with self.lock:
+            return self._render_tick()
+
+    def _render_tick(self) -> float:
+        if self.clock_offset is None:
+            return 0
+        return (self.clock() - self.clock_offset) * self.tick_rate - self.delay_ticks
+
+    def sample(self) -> Tuple[Dict[str, Tuple[float, float]], Dict[str, Tuple[float, float]]]:
+        """
+        Returns where to draw every remote player and enemy right now.
+
+        Returns:
+            Tuple[Dict[str, Tuple[float, float]], Dict[str, Tuple[float, float]]]:
+            Client address -> (x, y) and enemy id -> (x, y).
+        """
+        with self.lock:
+            if not self.ticks:
+                return {}, {}
+            render_tick = self._render_tick()
+            ticks, snapshots = self.ticks, self.snapshots
+
+            index = bisect_right(ticks, render_tick)
+            if index == 0:
+                return snapshots[0]  # Not caught up with the oldest snapshot yet
+            if index < len(ticks):
+                # Between two snapshots
+                before, after = index - 1, index
+                fraction = (render_tick - ticks[before]) / (ticks[after] - ticks[before])
+            elif len(ticks) > 1:
+                # Past the newest snapshot, keep going the way the last two were heading for a little while
+                before, after = len(ticks) - 2, len(ticks) - 1
+                ahead = min(render_tick - ticks[after], self.max_extrapolation_ticks)
+                fraction = 1 + ahead / (ticks[after] - ticks[before])
+            else:
+                return snapshots[0]
+
+            return tuple(self._blend(snapshots[before][kind], snapshots[after][kind], fraction) for kind in range(2))
+
+    def _blend(self, before: Dict[str, Tuple[float, float]], after: Dict[str, Tuple[float, float]], fraction: float) -> Dict[str, Tuple[float, float]]:
+        """
+        Positions a fraction of the way from before to after, beyond after when fraction is over 1.
+        Entities that weren't in the earlier snapshot are drawn where the later one has them.
+        """
+        blended = {}
+        for key, (x, y) in after.items():
+            start = before.get(key)
+            if start is None:
+                blended[key] = (x, y)
+            else:
+                blended[key] = (start[0] + (x - start[0]) * fraction, start[1] + (y - start[1]) * fraction)
+        return blended
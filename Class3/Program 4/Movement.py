@@ -0,0 +1,239 @@
+## Player movement shared by the client and the server
+## A player's movement is a pure function of their state, one frame of input and the terrain, so
+## the server can run the frames a client ran and get exactly the same result. The client moves
+## straight away on its own inputs (prediction) and the server, which has the final say, sends back
+## where it put the player and the last input it ran. The client then starts again from there and
+## runs the inputs the server hasn't got to yet (reconciliation).
+## Nothing in here needs pygame, so it can be run and tested on its own.
+
+from collections import deque
+from dataclasses import dataclass
+from typing import *
+
+## Physics constants
+FRICTION = 0.01  # Friction to apply on all entities
+GRAVITY = 400   # Gravity constant
+
+## Player data
+PLAYER_WIDTH = 40
+PLAYER_HEIGHT = 40
+PLAYER_SCALE = 3  # How much the player's sprite and collision box are scaled up
+PLAYER_SPEED = 5  # Pixels moved sideways every frame
+JUMP_VELOCITY = -65 * PLAYER_SPEED
+WORLD_EDGE = 2800  # Players can't walk further than this from the center
+RESPAWN_BELOW_Y = 1000  # Players that fall further than this are put back at RESPAWN_POSITION
+RESPAWN_POSITION = (100, -100)
+MAX_INPUT_DT = 0.1  # Longest frame one input can move a player for, so a client can't send huge frames
+MAX_PENDING_INPUTS = 600  # Unconfirmed inputs a client keeps, about 10 seconds at 60 fps
+MAX_INPUT_RATE = 240  # Most inputs a second the server runs for a client, every input costs at least 1 / this
+MAX_INPUT_BURST = 0.5  # Seconds of input a client can get ahead of real time, for packets that arrive bunched up
+MAX_START_DISTANCE = 50  # Furthest the first state a client sends may be from the position it last reported
+
+@dataclass(frozen=True)
+class PlayerInput:
+    sequence: int  # Counts up from 1 for every frame the client simulates
+    left: bool
+    right: bool
+    jump: bool
+    dt: float  # Length of the frame in seconds
+
+    def to_list(self) -> list:
+        return [self.sequence, self.left, self.right, self.jump, self.dt]
+
+    @classmethod
+    def from_list(cls, values: list) -> 'PlayerInput':
+        sequence, left, right, jump, dt = values
+        return cls(int(sequence), bool(left), bool(right), bool(jump), float(dt))
+
+@dataclass(frozen=True)
+class PlayerState:
+    x: float
+    y: float
+    velocity_y: float = 0
+    grounded: bool = False
+    facing_right: bool = True
+
+    def to_list(self) -> list:
+        return [self.x, self.y, self.velocity_y, self.grounded, self.facing_right]
+
+    @classmethod
+    def from_list(cls, values: list) -> 'PlayerState':
+        x, y, velocity_y, grounded, facing_right = values
+        return cls(float(x), float(y), float(velocity_y), bool(grounded), bool(facing_right))
+
+def land(x: float, y: float, terrain) -> Tuple[bool, float, float]:
+    """
+    Pushes the player out of building walls and onto the roof under them.
+
+    Args:
+        x (float): The player's x.
+        y (float): The player's y, at the middle of their body.
+        terrain (TerrainIndex): The terrain's buildings indexed by x.
+
+    Returns:
+        Tuple[bool, float, float]: Whether the player is standing on a roof, and their corrected x and y.
+    """
+    half_height = (PLAYER_HEIGHT * PLAYER_SCALE) // 2
+    bottom_y, top_y = y + half_height, y - half_height
+    width = PLAYER_WIDTH * PLAYER_SCALE
+
+    closest_building_top = None
+    horizontal_collision = False
+    new_x = x
+
+    for left, right, top, bottom in terrain.overlapping(x, x + width):
+        # Blocking the sides of buildings
+        if top_y <= top and bottom_y >= bottom:
+            if x + width > left and x < left:
+                new_x = left - width
+                horizontal_collision = True
+            elif x < right and x + width > right:
+                new_x = right
+                horizontal_collision = True
+
+        if left <= x <= right:
+            if closest_building_top is None or top > closest_building_top:
+                closest_building_top = top
+
+    if horizontal_collision:
+        x = new_x
+
+    # Standing on the closest roof, with a small buffer to avoid "floating"
+    if closest_building_top is not None and not horizontal_collision and bottom_y >= closest_building_top - 1:
+        return True, x, closest_building_top - half_height
+    return False, x, y
+
+def move_player(state: PlayerState, player_input: PlayerInput, terrain) -> PlayerState:
+    """
+    Runs one frame of a player's movement: gravity, landing, walking, jumping and respawning.
+
+    Args:
+        state (PlayerState): Where the player was before the frame.
+        player_input (PlayerInput): The keys held during the frame and how long it was.
+        terrain (TerrainIndex): The terrain's buildings indexed by x.
+
+    Returns:
+        PlayerState: Where the player is after the frame.
+    """
+    x, y, velocity_y, grounded, facing_right = state.x, state.y, state.velocity_y, state.grounded, state.facing_right
+    dt = min(player_input.dt, MAX_INPUT_DT)
+
+    # Gravity
+    if not grounded:
+        next_velocity_y = velocity_y + GRAVITY * dt
+        y += next_velocity_y * dt
+        grounded, x, y = land(x, y, terrain)
+        velocity_y = 0 if grounded else next_velocity_y
+    elif abs(velocity_y) < 0.5:
+        velocity_y = 0  # A small threshold to avoid jitter
+    grounded, x, y = land(x, y, terrain)
+
+    # Walking, kept within the edges of the world
+    step_x = 0
+    if player_input.left:
+        step_x -= PLAYER_SPEED
+        facing_right = False
+    if player_input.right:
+        step_x += PLAYER_SPEED
+        facing_right = True
+    x = max(-WORLD_EDGE, min(WORLD_EDGE, x + step_x))
+
+    if player_input.jump and grounded:
+        velocity_y = JUMP_VELOCITY
+        grounded = False
+
+    # Fell out of the world
+    if y > RESPAWN_BELOW_Y:
+        (x, y), velocity_y, grounded = RESPAWN_POSITION, 0, False
+
+    return PlayerState(x, y, velocity_y, grounded, facing_right)
+
+class InputBudget():
+    """
+    How much input time the server will still run for a client. It fills up with the real time that
+    passes, up to MAX_INPUT_BURST, so a client can't move faster by sending more or longer frames.
+    """
+
+    def __init__(self, now: float):
+        """
+        Args:
+            now (float): The time in seconds, the budget starts full.
+        """
+        self.seconds = MAX_INPUT_BURST
+        self.time = now
+
+    def refill(self, now: float):
+        """Adds the time passed since the last refill."""
+        self.seconds = min(MAX_INPUT_BURST, self.seconds + max(0.0, now - self.time))
+        self.time = max(self.time, now)
+
+    def spend(self, player_input: PlayerInput) -> bool:
+        """Takes an input's time out of the budget. Returns False, and takes nothing, if there isn't enough left."""
+        cost = max(1 / MAX_INPUT_RATE, min(player_input.dt, MAX_INPUT_DT))
+        if cost > self.seconds:
+            return False
+        self.seconds -= cost
+        return True
+
+def run_inputs(state: PlayerState, last_sequence: int, inputs: Iterable[PlayerInput], terrain, budget: Optional[InputBudget] = None) -> Tuple[PlayerState, int]:
+    """
+    Runs the inputs that come after last_sequence, skipping any that were already run.
+
+    Args:
+        budget (InputBudget): If given, inputs it has no time left for are dropped. They still count
+            as run, so the client is sent back to where the server has the player.
+
+    Returns:
+        Tuple[PlayerState, int]: The player's new state and the sequence of the last input run.
+    """
+    for player_input in inputs:
+        if player_input.sequence > last_sequence:
+            if budget is None or budget.spend(player_input):
+                state = move_player(state, player_input, terrain)
+            last_sequence = player_input.sequence
+    return state, last_sequence
+
+class MovementPredictor():
+    """
+    The local player's predicted state and the inputs the server hasn't confirmed yet.
+    """
+
+    def __init__(self, state: PlayerState):
+        self.state = state
+        self.pending: Deque[PlayerInput] = deque(maxlen=MAX_PENDING_INPUTS)
+        self.next_sequence = 1
+
+    def predict(self, left: bool, right: bool, jump: bool, dt: float, terrain) -> PlayerInput:
+        """
+        Moves the player one frame straight away, without waiting for the server.
+
+        Returns:
+            PlayerInput: The input to send to the server.
+        """
+        player_input = PlayerInput(self.next_sequence, left, right, jump, dt)
+        self.next_sequence += 1
+        self.pending.append(player_input)
+        self.state = move_player(self.state, player_input, terrain)
+        return player_input
+
+    def reconcile(self, server_state: PlayerState, last_sequence: int, terrain) -> int:
+        """
+        Starts again from where the server put the player after running inputs up to last_sequence,
+        and runs the inputs it hasn't got to yet.
+
+        Returns:
+            int: How many inputs were run again.
+        """
+        while self.pending and self.pending[0].sequence <= last_sequence:
+            self.pending.popleft()
+
+        state = server_state
+        for player_input in self.pending:
+            state = move_player(state, player_input, terrain)
+        self.state = state
+        return len(self.pending)
+
+    def reset(self, state: PlayerState):
+        """Puts the player somewhere new, forgetting the inputs that led up to it."""
+        self.state = state
+        self.pending.clear()
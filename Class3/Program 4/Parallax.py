@@ -0,0 +1,104 @@
+## Parallax scrolling background drawn from strips prepared at load time
+## Every background layer is twice the size of the screen and held at a fixed height, so only a
+## band of its rows is ever on screen and much of that band is transparent. Each layer is cut
+## down once to the rows that are both on screen and hold something, layers scrolling at the same
+## speed are painted into one strip, and strips with no transparency left are converted without
+## alpha so drawing them is a plain copy. Drawing then only copies the columns of each strip that
+## are on screen, from the two copies side by side that let it wrap around.
+
+import os
+from typing import *
+import pygame
+
+PARALLAX_LAYERS = 10  # Layers are loaded from 1.png (farthest) to 10.png (closest)
+
+class ParallaxRenderer():
+    """
+    The background strips, farthest first, with the speed each scrolls at and where it sits on screen.
+    """
+
+    def __init__(self, layers: List[Tuple[pygame.Surface, float, int]], screen_size: Tuple[int, int], speed_step: float = 0):
+        """
+        Args:
+            layers (List[Tuple[pygame.Surface, float, int]]): (image, speed, vertical offset) of every layer,
+                farthest first. A layer is drawn with its top edge vertical offset pixels above the screen.
+            screen_size (Tuple[int, int]): Size of the screen the background is drawn on.
+            speed_step (float): Neighbouring layers whose speeds round to the same multiple of this are
+                painted into one strip and scroll at the first one's speed. 0 only joins equal speeds.
+        """
+        self.screen_width, self.screen_height = screen_size
+        self.strips: List[Tuple[pygame.Surface, float, int]] = []  # (strip, speed, y on screen)
+
+        group = []
+        for layer in layers:
+            if group and (self._bucket(layer[1], speed_step) != self._bucket(group[0][1], speed_step) or layer[0].get_width() != group[0][0].get_width()):
+                self._add_strip(group)
+                group = []
+            group.append(layer)
+        if group:
+            self._add_strip(group)
+
+    def _bucket(self, speed: float, speed_step: float) -> float:
+        return round(speed / speed_step) if speed_step else speed
+
+    def _add_strip(self, group: List[Tuple[pygame.Surface, float, int]]):
+        """Paints a group of layers into the screen's rows and keeps the rows that hold something."""
+        width = group[0][0].get_width()
+        if len(group) == 1:
+            image, _, vertical_offset = group[0]
+            visible = pygame.Rect(0, vertical_offset, width, self.screen_height).clip(image.get_rect())
+            canvas = pygame.Surface((width, self.screen_height), pygame.SRCALPHA)
+            canvas.blit(image, (0, visible.top - vertical_offset), visible, special_flags=pygame.BLEND_RGBA_MAX)  # Copied as is, not blended
+        else:
+            canvas = pygame.Surface((width, self.screen_height), pygame.SRCALPHA)
+            for image, _, vertical_offset in group:
+                canvas.blit(image, (0, -vertical_offset))
+
+        rows = canvas.get_bounding_rect()
+        if rows.height == 0:
+            return  # Nothing on screen
+        strip = canvas.subsurface((0, rows.top, width, rows.height)).copy()
+
+        opaque = pygame.mask.from_surface(strip, 254).count() == width * rows.height
+        strip = strip.convert() if opaque else strip.convert_alpha()
+        self.strips.append((strip, group[0][1], rows.top))
+
+    def render(self, screen: pygame.Surface, player_x: float):
+        """Draws the background for a player at player_x, farthest strip first."""
+        screen_width = self.screen_width
+        for strip, speed, y in self.strips:
+            width, height = strip.get_width(), strip.get_height()
+            offset = player_x * speed % width
+
+            # The strip is drawn twice side by side so it wraps around, only the columns on screen are copied
+            for x in (int(-offset), int(width - offset)):
+                if x >= screen_width or x + width <= 0:
+                    continue
+                left = max(0, -x)
+                screen.blit(strip, (x + left, y), (left, 0, min(width - left, screen_width - x - left), height))
+
+    def __len__(self) -> int:
+        return len(self.strips)
+
+def load_background(folder: str, screen_size: Tuple[int, int], scale_factor: int = 2, view_size: Optional[Tuple[int, int]] = None) -> ParallaxRenderer:
+    """
+    Loads 1.png to 10.png from a folder, skipping missing files, and prepares them for drawing.
+    Layer i scrolls at i tenths of the player's speed and is raised by i tenths of half the screen.
+
+    Args:
+        folder (str): The folder holding the layers.
+        screen_size (Tuple[int, int]): Size of the screen the layers are scaled and placed for.
+        scale_factor (int): How many screens wide and high every layer is scaled to.
+        view_size (Optional[Tuple[int, int]]): Size of the surface actually drawn on, screen_size if not given.
+    """
+    screen_width, screen_height = screen_size
+    layers = []
+    for i in range(1, PARALLAX_LAYERS + 1):
+        try:
+            image = pygame.image.load(os.path.join(folder, f"{i}.png")).convert_alpha()  # Load with transparency
+        except FileNotFoundError:
+            print(f"File {i}.png not found, skipping.")
+            continue
+        image = pygame.transform.scale(image, (screen_width * scale_factor, screen_height * scale_factor))
+        layers.append((image, i * 0.1, int(screen_height // 2 * (i * 0.1))))
+    return ParallaxRenderer(layers, view_size or screen_size)
@@ -0,0 +1,467 @@
+## Wire formats shared by the client and server
+## Both codecs turn client packets and snapshot deltas (see Snapshots.py) into bytes and back.
+## Which one a client uses is negotiated when it joins: the server lists the protocols it speaks
+## in its ServerJoinPacket and the client picks the first one it also supports.
+
+import json, struct, socket
+from GameModel import *
+from Snapshots import *
+
+PROTOCOL_BINARY = "binary"
+PROTOCOL_JSON = "json"
+SUPPORTED_PROTOCOLS = [PROTOCOL_BINARY, PROTOCOL_JSON]  # In order of preference
+ATTACK_HEADER = "ATTACK"  # Attack packets are JSON in either protocol, see encode_attack_packet
+INPUT_HEADER = "INPUT"  # So are input packets, see encode_input_packet
+
+def build_animation_table() -> List[str]:
+    """
+    Returns the name of every player and enemy animation, used to send animations
+    as a small index instead of a string.
+    """
+    names = {path.stem for folder in ("Player", "Enemies") for path in (sprites_folder / folder).glob("*.png")}
+    return sorted(names)
+
+def choose_protocol(server_protocols: List[str]) -> str:
+    """Picks the protocol to talk to a server in, falling back to JSON for older servers."""
+    for protocol in SUPPORTED_PROTOCOLS:
+        if protocol in server_protocols:
+            return protocol
+    return PROTOCOL_JSON
+
+def encode_attack_packet(view_tick: int, weapon_name: str, facing_right: bool) -> bytes:
+    """
+    The packet a client sends when it swings its weapon. The server works out what was hit from
+    the client's latest position and the enemies as they were at view_tick, the snapshot tick
+    the client had on screen. Only the weapon's name is sent, its range and damage are the server's.
+    """
+    return json.dumps({"header": ATTACK_HEADER, "tick": view_tick, "weapon": weapon_name, "facing_right": facing_right}).encode('utf-8')
+
+def encode_input_packet(inputs: List[PlayerInput], start: Optional[PlayerState] = None) -> bytes:
+    """
+    The packet carrying the frames of input a client has run since its last one. The first one
+    after joining also carries start, where the client was before its first input, for the server
+    to start running its movement from.
+    """
+    data_dict = {"header": INPUT_HEADER, "inputs": [player_input.to_list() for player_input in inputs]}
+    if start is not None:
+        data_dict["start"] = start.to_list()
+    return json.dumps(data_dict).encode('utf-8')
+
+def decode_input_packet(data_dict: dict) -> Tuple[List[PlayerInput], Optional[PlayerState]]:
+    start = data_dict.get("start")
+    return [PlayerInput.from_list(values) for values in data_dict["inputs"]], PlayerState.from_list(start) if start else None
+
+def client_packet_to_dict(packet: ClientPacket) -> dict:
+    """
+    Converts a client packet to a dictionary for JSON serialization.
+    """
+    # Serialize current_weapon separately if it exists
+    weapon_data = None
+    if packet.gameData.current_weapon:
+        weapon_data = {
+            "name": packet.gameData.current_weapon.name,
+            "range": packet.gameData.current_weapon.range,
+            "damage": packet.gameData.current_weapon.damage
+        }
+
+    return {
+        "username": packet.username,
+        "ack": packet.ack,
+        "position": {"x": packet.position.x, "y": packet.position.y},
+        "gameData": {
+            "HP": packet.gameData.HP,
+            "facing_right": packet.gameData.facing_right,
+            "current_animation": packet.gameData.current_animation,
+            "current_frame_index": packet.gameData.current_frame_index,
+            "last_frame_time": packet.gameData.last_frame_time,
+            "player_scale": packet.gameData.player_scale,
+            "velocity": packet.gameData.velocity,
+            "velocity_y": packet.gameData.velocity_y,
+            "grounded": packet.gameData.grounded,
+            "movement_disabled": packet.gameData.movement_disabled,
+            "animation_in_progress": packet.gameData.animation_in_progress,
+            "current_weapon": weapon_data
+        }
+    }
+
+def client_packet_from_dict(data_dict: dict) -> ClientPacket:
+    """
+    Converts a dictionary made by client_packet_to_dict back into a client packet.
+    """
+    # Handle deserialization of current_weapon
+    weapon_data = data_dict['gameData'].get('current_weapon')
+    current_weapon = None
+    if weapon_data:
+        current_weapon = WeaponData(
+            name=weapon_data["name"],
+            range=weapon_data["range"],
+            damage=weapon_data["damage"]
+        )
+
+    position = Position(**data_dict['position'])
+    gameData = GameData(
+        HP=data_dict['gameData']['HP'],
+        facing_right=data_dict['gameData']['facing_right'],
+        current_animation=data_dict['gameData']['current_animation'],
+        current_frame_index=data_dict['gameData']['current_frame_index'],
+        last_frame_time=data_dict['gameData']['last_frame_time'],
+        player_scale=data_dict['gameData']['player_scale'],
+        velocity=data_dict['gameData']['velocity'],
+        velocity_y=data_dict['gameData']['velocity_y'],
+        grounded=data_dict['gameData']['grounded'],
+        movement_disabled=data_dict['gameData']['movement_disabled'],
+        animation_in_progress=data_dict['gameData']['animation_in_progress'],
+        current_weapon=current_weapon
+    )
+
+    return ClientPacket(username=data_dict['username'], position=position, gameData=gameData, ack=data_dict.get('ack', 0))
+
+CLIENT_FIELD_INDEXES = {name: index for index, (name, _) in enumerate(CLIENT_FIELDS)}
+ENEMY_FIELD_INDEXES = {name: index for index, (name, _) in enumerate(ENEMY_FIELDS)}
+
+class JsonCodec():
+    """
+    The original JSON protocol. Snapshot fields are sent by name.
+    """
+    name = PROTOCOL_JSON
+
+    def encode_client_packet(self, packet: ClientPacket) -> bytes:
+        return json.dumps(client_packet_to_dict(packet)).encode('utf-8')
+
+    def decode_client_packet(self, data) -> ClientPacket:
+        return client_packet_from_dict(json.loads(str(data, 'utf-8')))
+
+    def encode_snapshot(self, delta: SnapshotDelta) -> bytes:
+        data_dict = {
+            "tick": delta.tick,
+            "base": delta.base,
+            "clients": {addr: {CLIENT_FIELDS[index][0]: value for index, value in fields.items()} for addr, fields in delta.clients.items()},
+            "enemies": {id: {ENEMY_FIELDS[index][0]: value for index, value in fields.items()} for id, fields in delta.enemies.items()},
+            "removed_clients": delta.removed_clients,
+            "removed_enemies": delta.removed_enemies
+        }
+        return json.dumps(data_dict).encode('utf-8')
+
+    def decode_snapshot(self, data) -> SnapshotDelta:
+        data_dict = json.loads(str(data, 'utf-8'))
+
+        clients = {}
+        for addr, fields in data_dict["clients"].items():
+            clients[addr] = {CLIENT_FIELD_INDEXES[name]: value for name, value in fields.items()}
+            weapon_index = CLIENT_FIELD_INDEXES["current_weapon"]
+            if clients[addr].get(weapon_index):
+                clients[addr][weapon_index] = tuple(clients[addr][weapon_index])  # JSON turns tuples into lists
+
+        enemies = {}
+        for id, fields in data_dict["enemies"].items():
+            enemies[id] = {ENEMY_FIELD_INDEXES[name]: value for name, value in fields.items()}
+
+        return SnapshotDelta(
+            tick=data_dict["tick"],
+            base=data_dict["base"],
+            clients=clients,
+            enemies=enemies,
+            removed_clients=data_dict["removed_clients"],
+            removed_enemies=data_dict["removed_enemies"]
+        )
+
+class BinaryCodec():
+    """
+    A compact protocol made of fixed struct layouts. Strings are length-prefixed and
+    animation names are sent as an index into the animation table from the ServerJoinPacket.
+
+    Client packet:  id, ack | client state | animation | username | [weapon]
+    Snapshot:       header | (address, field mask, changed fields) per player
+                    | (id, field mask, changed fields) per enemy | removed addresses | removed ids
+    """
+    name = PROTOCOL_BINARY
+
+    CLIENT_PACKET_ID = 0x01  # Never '{', so the server can tell binary and JSON packets apart
+    SNAPSHOT_ID = 0x02
+    INLINE_ANIMATION = 0xFFFF  # Animation index meaning the name follows as a string
+
+    # Flags packed into a single byte of the client state
+    FACING_RIGHT = 1
+    GROUNDED = 2
+    MOVEMENT_DISABLED = 4
+    ANIMATION_IN_PROGRESS = 8
+    HAS_WEAPON = 16
+
+    CLIENT_HEADER = struct.Struct('!BI')  # id, ack
+    STRING_LENGTH = struct.Struct('!B')
+    ANIMATION = struct.Struct('!H')
+    # x, y, HP, frame index, last frame time, player scale, velocity, velocity y, flags
+    CLIENT_STATE = struct.Struct('!ffhHIfffB')
+    WEAPON = struct.Struct('!ff')  # range, damage
+    # id, tick, base tick, changed players, changed enemies, removed players, removed enemies
+    SNAPSHOT_HEADER = struct.Struct('!BIIHHHH')
+    FIELD_MASK = struct.Struct('!H')
+    ENEMY_ID = struct.Struct('!8s')
+    HAS_VALUE = struct.Struct('!?')
+
+    def __init__(self, animation_table: List[str]):
+        self.animation_table = list(animation_table)
+        self.animation_indexes = {name: index for index, name in enumerate(self.animation_table)}
+        self.client_field_codecs = [self._field_codec(wire_format) for _, wire_format in CLIENT_FIELDS]
+        self.enemy_field_codecs = [self._field_codec(wire_format) for _, wire_format in ENEMY_FIELDS]
+
+    def _field_codec(self, wire_format: str):
+        """Returns (pack, unpack) functions for one snapshot field's wire format."""
+        if wire_format == "str":
+            return self._pack_string, self._unpack_string
+        if wire_format == "animation":
+            return self._pack_animation, self._unpack_animation
+        if wire_format == "weapon":
+            return self._pack_weapon, self._unpack_weapon
+
+        layout = struct.Struct('!' + wire_format)
+        def pack(parts: list, value):
+            parts.append(layout.pack(value))
+        def unpack(data, offset: int):
+            return layout.unpack_from(data, offset)[0], offset + layout.size
+        return pack, unpack
+
+    # Helpers for the variable length parts
+    def _pack_string(self, parts: list, text: str):
+        raw = text.encode('utf-8')[:255]
+        parts.append(self.STRING_LENGTH.pack(len(raw)))
+        parts.append(raw)
+
+    def _unpack_string(self, data, offset: int) -> Tuple[str, int]:
+        length = data[offset]
+        offset += 1
+        return str(data[offset:offset + length], 'utf-8'), offset + length
+
+    def _pack_animation(self, parts: list, animation: str):
+        index = self.animation_indexes.get(animation, self.INLINE_ANIMATION)
+        parts.append(self.ANIMATION.pack(index))
+        if index == self.INLINE_ANIMATION:
+            self._pack_string(parts, animation)
+
+    def _unpack_animation(self, data, offset: int) -> Tuple[str, int]:
+        index, = self.ANIMATION.unpack_from(data, offset)
+        offset += self.ANIMATION.size
+        if index == self.INLINE_ANIMATION:
+            return self._unpack_string(data, offset)
+        return self.animation_table[index], offset
+
+    def _pack_weapon(self, parts: list, weapon: Optional[tuple]):
+        parts.append(self.HAS_VALUE.pack(weapon is not None))
+        if weapon is not None:
+            self._pack_string(parts, weapon[0])
+            parts.append(self.WEAPON.pack(weapon[1], weapon[2]))
+
+    def _unpack_weapon(self, data, offset: int) -> Tuple[Optional[tuple], int]:
+        has_weapon = data[offset]
+        offset += self.HAS_VALUE.size
+        if not has_weapon:
+            return None, offset
+        name, offset = self._unpack_string(data, offset)
+        weapon_range, damage = self.WEAPON.unpack_from(data, offset)
+        return (name, weapon_range, damage), offset + self.WEAPON.size
+
+    def _pack_fields(self, parts: list, fields: Dict[int, Any], field_codecs: list):
+        mask = 0
+        for index in fields:
+            mask |= 1 << index
+        parts.append(self.FIELD_MASK.pack(mask))
+        for index in sorted(fields):
+            field_codecs[index][0](parts, fields[index])
+
+    def _unpack_fields(self, data, offset: int, field_codecs: list) -> Tuple[Dict[int, Any], int]:
+        mask, = self.FIELD_MASK.unpack_from(data, offset)
+        offset += self.FIELD_MASK.size
+        fields = {}
+        for index, (_, unpack) in enumerate(field_codecs):
+            if mask & (1 << index):
+                fields[index], offset = unpack(data, offset)
+        return fields, offset
+
+    def _pack_client(self, parts: list, packet: ClientPacket):
+        gameData = packet.gameData
+        weapon = gameData.current_weapon
+        flags = (
+            (self.FACING_RIGHT if gameData.facing_right else 0)
+            | (self.GROUNDED if gameData.grounded else 0)
+            | (self.MOVEMENT_DISABLED if gameData.movement_disabled else 0)
+            | (self.ANIMATION_IN_PROGRESS if gameData.animation_in_progress else 0)
+            | (self.HAS_WEAPON if weapon else 0)
+        )
+        parts.append(self.CLIENT_STATE.pack(
+            packet.position.x, packet.position.y, int(gameData.HP), gameData.current_frame_index,
+            int(gameData.last_frame_time), gameData.player_scale, gameData.velocity, gameData.velocity_y, flags
+        ))
+        self._pack_animation(parts, gameData.current_animation)
+        self._pack_string(parts, packet.username)
+        if weapon:
+            self._pack_string(parts, weapon.name)
+            parts.append(self.WEAPON.pack(weapon.range, weapon.damage))
+
+    def _unpack_client(self, data, offset: int) -> Tuple[ClientPacket, int]:
+        x, y, HP, frame_index, last_frame_time, player_scale, velocity, velocity_y, flags = self.CLIENT_STATE.unpack_from(data, offset)
+        offset += self.CLIENT_STATE.size
+        animation, offset = self._unpack_animation(data, offset)
+        username, offset = self._unpack_string(data, offset)
+
+        current_weapon = None
+        if flags & self.HAS_WEAPON:
+            name, offset = self._unpack_string(data, offset)
+            weapon_range, damage = self.WEAPON.unpack_from(data, offset)
+            offset += self.WEAPON.size
+            current_weapon = WeaponData(name=name, range=weapon_range, damage=damage)
+
+        gameData = GameData(
+            HP=HP,
+            facing_right=bool(flags & self.FACING_RIGHT),
+            current_animation=animation,
+            current_frame_index=frame_index,
+            last_frame_time=last_frame_time,
+            player_scale=player_scale,
+            velocity=velocity,
+            velocity_y=velocity_y,
+            grounded=bool(flags & self.GROUNDED),
+            movement_disabled=bool(flags & self.MOVEMENT_DISABLED),
+            animation_in_progress=bool(flags & self.ANIMATION_IN_PROGRESS),
+            current_weapon=current_weapon
+        )
+        return ClientPacket(username=username, position=Position(x, y), gameData=gameData), offset
+
+    def encode_client_packet(self, packet: ClientPacket) -> bytes:
+        parts = [self.CLIENT_HEADER.pack(self.CLIENT_PACKET_ID, packet.ack)]
+        self._pack_client(parts, packet)
+        return b''.join(parts)
+
+    def decode_client_packet(self, data) -> ClientPacket:
+        _, ack = self.CLIENT_HEADER.unpack_from(data, 0)
+        packet, _ = self._unpack_client(data, self.CLIENT_HEADER.size)
+        packet.ack = ack
+        return packet
+
+    def encode_snapshot(self, delta: SnapshotDelta) -> bytes:
+        parts = [self.SNAPSHOT_HEADER.pack(
+            self.SNAPSHOT_ID, delta.tick, delta.base, len(delta.clients), len(delta.enemies),
+            len(delta.removed_clients), len(delta.removed_enemies)
+        )]
+
+        for addr, fields in delta.clients.items():
+            self._pack_string(parts, addr)
+            self._pack_fields(parts, fields, self.client_field_codecs)
+
+        for id, fields in delta.enemies.items():
+            parts.append(self.ENEMY_ID.pack(bytes.fromhex(id)))
+            self._pack_fields(parts, fields, self.enemy_field_codecs)
+
+        for addr in delta.removed_clients:
+            self._pack_string(parts, addr)
+        for id in delta.removed_enemies:
+            parts.append(self.ENEMY_ID.pack(bytes.fromhex(id)))
+
+        return b''.join(parts)
+
+    def decode_snapshot(self, data) -> SnapshotDelta:
+        _, tick, base, client_count, enemy_count, removed_client_count, removed_enemy_count = self.SNAPSHOT_HEADER.unpack_from(data, 0)
+        offset = self.SNAPSHOT_HEADER.size
+
+        clients = {}
+        for _ in range(client_count):
+            addr, offset = self._unpack_string(data, offset)
+            clients[addr], offset = self._unpack_fields(data, offset, self.client_field_codecs)
+
+        enemies = {}
+        for _ in range(enemy_count):
+            raw_id, = self.ENEMY_ID.unpack_from(data, offset)
+            offset += self.ENEMY_ID.size
+            enemies[raw_id.hex()], offset = self._unpack_fields(data, offset, self.enemy_field_codecs)
+
+        removed_clients = []
+        for _ in range(removed_client_count):
+            addr, offset = self._unpack_string(data, offset)
+            removed_clients.append(addr)
+
+        removed_enemies = []
+        for _ in range(removed_enemy_count):
+            raw_id, = self.ENEMY_ID.unpack_from(data, offset)
+            offset += self.ENEMY_ID.size
+            removed_enemies.append(raw_id.hex())
+
+        return SnapshotDelta(
+            tick=tick,
+            base=base,
+            clients=clients,
+            enemies=enemies,
+            removed_clients=removed_clients,
+            removed_enemies=removed_enemies
+        )
+
+def make_codec(protocol: str, animation_table: List[str]):
+    """Returns the codec for a negotiated protocol."""
+    if protocol == PROTOCOL_BINARY:
+        return BinaryCodec(animation_table)
+    return JsonCodec()
+
+def detect_protocol(data) -> str:
+    """Tells which protocol a packet received from a client was encoded with."""
+    return PROTOCOL_BINARY if data[0] == BinaryCodec.CLIENT_PACKET_ID else PROTOCOL_JSON
+
+class FrameReader():
+    """
+    Reads length-prefixed frames from a socket into one reusable buffer. Bytes are received
+    with recv_into as they become available, so a single recv can carry several small frames
+    and a large frame streams straight into place instead of being concatenated chunk by chunk.
+    """
+    LENGTH = struct.Struct('!I')
+
+    def __init__(self, sock: socket.socket, buffer: Optional[bytearray] = None, initial_size: int = 64 * 1024):
+        """
+        Args:
+            sock (socket.socket): The connected socket to read from.
+            buffer (bytearray): A buffer to read into, such as one from a pool. A new one of
+                initial_size bytes is made if not given.
+        """
+        self.sock = sock
+        self.buffer = buffer if buffer is not None else bytearray(initial_size)
+        self.view = memoryview(self.buffer)
+        self.start = 0  # First unread byte
+        self.end = 0  # One past the last received byte
+
+    def read_frame(self) -> memoryview:
+        """
+        Returns the next frame without its length prefix. The view points into the shared buffer,
+        so it is only valid until the next call; copy it with bytes() to keep it around.
+
+        Raises:
+            ConnectionError: If the other side closes the connection.
+        """
+        self._fill(self.LENGTH.size)
+        length, = self.LENGTH.unpack_from(self.buffer, self.start)
+        self._fill(self.LENGTH.size + length)
+
+        frame_start = self.start + self.LENGTH.size
+        self.start = frame_start + length
+        return self.view[frame_start:self.start]
+
+    def _fill(self, needed: int):
+        """Receives until at least `needed` unread bytes are in the buffer."""
+        if self.end - self.start >= needed:
+            return
+
+        if self.start + needed > len(self.buffer):
+            self._make_room(needed)
+
+        while self.end - self.start < needed:
+            received = self.sock.recv_into(self.view[self.end:])
+            if not received:
+                raise ConnectionError("Connection closed")
+            self.end += received
+
+    def _make_room(self, needed: int):
+        """Moves the unread bytes to the front of the buffer, growing it if a frame won't fit."""
+        unread = self.end - self.start
+        if needed > len(self.buffer):
+            buffer = bytearray(max(needed, len(self.buffer) * 2))
+            buffer[:unread] = self.view[self.start:self.end]
+            self.buffer = buffer
+            self.view = memoryview(buffer)
+        else:
+            self.buffer[:unread] = bytes(self.view[self.start:self.end])  # The two ranges can overlap
+        self.start, self.end = 0, unread
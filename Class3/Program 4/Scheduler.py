@@ -0,0 +1,89 @@
+## Fixed-timestep loop for the server simulation
+## The simulation always advances in steps of exactly 1 / tick_rate seconds. Real time is added to an
+## accumulator and as many steps are run as have built up, so the tick rate holds on average even
+## when a single sleep or step runs long, and dt is the same every tick.
+
+import threading, time
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import *
+
+@dataclass
+class TickMetrics:
+    ticks: int = 0  # Simulation steps run so far
+    overruns: int = 0  # Steps that took longer than the timestep on their own
+    dropped_ticks: int = 0  # Steps skipped because the simulation fell more than max_catch_up_ticks behind
+    last_tick_duration: float = 0  # Seconds the most recent step took
+    max_tick_duration: float = 0  # Seconds the slowest step took
+    achieved_hz: float = 0  # Steps per second over roughly the last second
+
+class FixedTimestepScheduler():
+    """
+    Calls a step function tick_rate times a second with a fixed dt, measured against a monotonic clock.
+    """
+
+    def __init__(self, step: Callable[[float], None], tick_rate: int = 60, max_catch_up_ticks: int = 5, clock: Callable[[], float] = time.perf_counter):
+        """
+        Args:
+            step (Callable[[float], None]): Advances the simulation by the dt it is given.
+            tick_rate (int): Steps per second.
+            max_catch_up_ticks (int): Most steps run back to back after a stall. Any more are dropped
+                so that a long pause doesn't turn into a burst of catching up.
+            clock (Callable[[], float]): Monotonic clock in seconds.
+        """
+        self.step = step
+        self.tick_rate = tick_rate
+        self.timestep = 1 / tick_rate
+        self.max_catch_up_ticks = max_catch_up_ticks
+        self.clock = clock
+        self._metrics = TickMetrics()
+        self.tick_times = deque(maxlen=tick_rate + 1)  # When the recent steps started, for achieved_hz
+        self.lock = threading.Lock()
+
+    @property
+    def metrics(self) -> TickMetrics:
+        """A copy of the current metrics, safe to read from any thread."""
+        with self.lock:
+            return replace(self._metrics)
+
+    def run(self, stop_event: threading.Event):
+        """Runs steps until stop_event is set."""
+        accumulator = 0.0
+        previous_time = self.clock()
+
+        while not stop_event.is_set():
+            now = self.clock()
+            accumulator += now - previous_time
+            previous_time = now
+
+            # Don't try to catch up on more than a few steps after a long stall
+            behind = int(accumulator / self.timestep)
+            if behind > self.max_catch_up_ticks:
+                with self.lock:
+                    self._metrics.dropped_ticks += behind - self.max_catch_up_ticks
+                accumulator -= (behind - self.max_catch_up_ticks) * self.timestep
+
+            while accumulator >= self.timestep and not stop_event.is_set():
+                self.run_step()
+                accumulator -= self.timestep
+
+            # Sleep until the next step is due, waking early if we are asked to stop
+            stop_event.wait(max(self.timestep - accumulator - (self.clock() - previous_time), 0))
+
+    def run_step(self):
+        """Runs a single step and records how long it took."""
+        start = self.clock()
+        self.step(self.timestep)
+        duration = self.clock() - start
+
+        with self.lock:
+            self.tick_times.append(start)
+            metrics = self._metrics
+            metrics.ticks += 1
+            metrics.last_tick_duration = duration
+            metrics.max_tick_duration = max(metrics.max_tick_duration, duration)
+            if duration > self.timestep:
+                metrics.overruns += 1
+            elapsed = self.tick_times[-1] - self.tick_times[0]
+            if elapsed > 0:
+                metrics.achieved_hz = (len(self.tick_times) - 1) / elapsed
@@ -1,15 +1,118 @@
 import logging.handlers
 import socket, threading, logging
 import struct, json
-import pygame, time
+import asyncio, argparse
+from dataclasses import replace
+import time
 from random import randint
 from typing import List
-from GameConstants import *
+from GameModel import *
+from Protocol import *
+from SpatialIndex import PositionGrid, TerrainIndex
+from EnemyEngine import EnemyEngine, HAS_NUMPY
+from Scheduler import FixedTimestepScheduler, TickMetrics
+from WorldStore import ClientState, WorldStore
+from HitDetection import EnemyHistory, HitResolver
 import secrets
 
 # Generate a unique token
 unique_id = secrets.token_hex(8)
 
+TICK_RATE = 60  # Simulation steps per second
+SNAPSHOT_RATE = 30  # Snapshots sent per second, clients interpolate between them
+METRICS_LOG_INTERVAL = 60  # Seconds between tick metrics in the log
+
+class TickSnapshot():
+    """
+    One tick's world state. Every client is sent the delta from the last tick it acknowledged,
+    and each encoded delta is kept so that clients on the same protocol with the same
+    acknowledged tick are sent the same bytes. Nothing in it changes after it is published,
+    so any thread can read it without waiting on the simulation.
+    """
+
+    def __init__(self, tick: int, state: WorldState, clients: Dict[str, ClientState], history: SnapshotHistory, codecs: Dict[str, Any]):
+        self.tick = tick
+        self.state = state
+        self.clients = clients  # Client address -> its state as of this tick, for its protocol and ack
+        self.history = history
+        self.codecs = codecs
+        self.payloads: Dict[Tuple[str, int], bytes] = {}  # (protocol, base tick) -> length-prefixed delta
+        self.lock = threading.Lock()
+
+    def payload_for(self, protocol: str, ack: int) -> bytes:
+        """
+        Returns the length-prefixed delta from tick ack to this tick. Falls back to a full
+        snapshot when the client hasn't acknowledged anything or its tick is no longer in history.
+        """
+        base = self.history.get(ack) if ack else None
+        base_tick = ack if base is not None else 0
+        with self.lock:
+            payload = self.payloads.get((protocol, base_tick))
+            if payload is None:
+                delta = diff_states(base, self.state, self.tick, base_tick)
+                data = self.codecs[protocol].encode_snapshot(delta)
+                payload = struct.pack('!I', len(data)) + data
+                self.payloads[(protocol, base_tick)] = payload
+            return payload
+
+class BufferPool():
+    """
+    Receive buffers handed out to client connections and given back when they disconnect,
+    so clients joining and leaving don't allocate a new buffer every time.
+    """
+
+    def __init__(self, buffer_size: int = 16 * 1024, max_buffers: int = 64):
+        self.buffer_size = buffer_size
+        self.max_buffers = max_buffers  # Buffers beyond this are left to the garbage collector
+        self.buffers: List[bytearray] = []
+        self.lock = threading.Lock()
+
+    def acquire(self) -> bytearray:
+        with self.lock:
+            if self.buffers:
+                return self.buffers.pop()
+        return bytearray(self.buffer_size)
+
+    def release(self, buffer: bytearray):
+        with self.lock:
+            if len(self.buffers) < self.max_buffers:
+                self.buffers.append(buffer)
+
+class SnapshotBroadcaster():
+    """
+    Holds the most recent world snapshot so that it is built once per SNAPSHOT_RATE
+    interval and handed to every client.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.tick = 0  # Increases every time a new snapshot is published
+        self.snapshot: Optional[TickSnapshot] = None
+        self.listeners = []  # Callables that are handed every new snapshot
+
+    def publish(self, snapshot: TickSnapshot):
+        """Makes a new snapshot the latest one and wakes up everything waiting for it."""
+        with self.condition:
+            self.tick += 1
+            self.snapshot = snapshot
+            self.condition.notify_all()
+
+        for listener in self.listeners:
+            listener(snapshot)
+
+    def wait_for_snapshot(self, last_tick: int, timeout: float = 1.0) -> Tuple[int, Optional[TickSnapshot]]:
+        """
+        Waits until a snapshot newer than last_tick is published.
+
+        Returns:
+            Tuple[int, Optional[TickSnapshot]]: The latest tick and its snapshot, the snapshot
+            is None if nothing new was published before the timeout.
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.tick != last_tick, timeout):
+                return last_tick, None
+            return self.tick, self.snapshot
+
 class NetworkServer():
     """
     A network server class that creates and hosts a new network server
@@ -21,18 +124,36 @@ class NetworkServer():
         self.serverSocket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.shutdown_event = threading.Event()  # Create an event to signal server shutdown
         self.gameServer = gameServer
-        self.live_clients = []
-        self.all_client_data = {}
-        self.last_update_time = pygame.time.get_ticks()  # Initialize to track delta time (dt)
-
-        # The 'entry message' sent to every client when they join the server.
-        self.entryMessage = self.serialize_server_join_data(
-            ServerJoinPacket(
-                servername=gameServer.serverName,
-                serverip=gameServer.serverIp,
-                serverport=gameServer.serverPort
-            )
+        self.live_clients = set()  # Addresses of connected clients, guarded by live_clients_lock
+        self.live_clients_lock = threading.Lock()
+        self.world = WorldStore()  # Only changed by the tick thread, client threads submit changes to it
+        self.enemy_history = EnemyHistory()  # Enemies of the last few ticks, to check attacks where the attacker saw them
+        self.hit_resolver = HitResolver(self.enemy_history)
+        self.broadcaster = SnapshotBroadcaster()
+        self.snapshot_history = SnapshotHistory()
+        self.tick = 0  # Simulation steps run so far, snapshots are numbered by the step they were taken at
+        self.snapshot_interval = max(TICK_RATE // SNAPSHOT_RATE, 1)  # Steps between snapshots
+        self.buffer_pool = BufferPool()
+
+        # Every client picks one of these protocols when it joins
+        self.animation_table = build_animation_table()
+        self.codecs = {
+            PROTOCOL_BINARY: BinaryCodec(self.animation_table),
+            PROTOCOL_JSON: JsonCodec()
+        }
+        self.scheduler = FixedTimestepScheduler(self.simulate_tick, tick_rate=TICK_RATE)
+
+        # The 'entry message' sent to every client when they join the server, see entry_message_for
+        self.serverJoinPacket = ServerJoinPacket(
+            servername=gameServer.serverName,
+            serverip=gameServer.serverIp,
+            serverport=gameServer.serverPort,
+            protocols=SUPPORTED_PROTOCOLS,
+            animation_table=self.animation_table,
+            terrain=gameServer.terrain,  # Terrain never changes, so it is only sent here
+            tick_rate=TICK_RATE
         )
+        self.closeMessage = self.add_length_prefix("[CLOSECONNECTION]".encode('utf-8'))
 
         # Set up logging
         self.logfilePath = SERVERDATADIR / f"Server.log"
@@ -73,8 +194,12 @@ class NetworkServer():
 
         try:
             self.logger.info(f"Server started on {socket.gethostbyname(socket.gethostname())}:{self.gameServer.serverPort}")
+            last_metrics_log = time.monotonic()
             while not self.shutdown_event.is_set():  # Main server loop checks shutdown event
                 self.check_for_discovery_request()
+                if time.monotonic() - last_metrics_log >= METRICS_LOG_INTERVAL:
+                    self.log_tick_metrics()
+                    last_metrics_log = time.monotonic()
                 self.shutdown_event.wait(1)
 
         except KeyboardInterrupt:
@@ -85,25 +210,49 @@ class NetworkServer():
 
     def update_game_state(self):
         """
-        Continuously updates the game state in the background.
+        Continuously updates the game state in the background at TICK_RATE.
         """
-        while not self.shutdown_event.is_set():  # Run while the server is active
-            time.sleep(0.01667)  # Update the game state every 16.77 ms (60 FPS)
+        self.scheduler.run(self.shutdown_event)
 
-            current_time = time.time()  # Get current time in seconds
-            dt = min(current_time - self.last_update_time, 2)  # Calculate delta time in seconds, capped to prevent large jumps
-            self.last_update_time = current_time
-
-            # Get a list of client positions from self.all_client_data
-            client_positions = []
-            for data in self.all_client_data.values():
-                client_data = json.loads(data.decode('utf-8'))
-                x = client_data['position']['x']
-                y = client_data['position']['y']
-                client_positions.append(pygame.Vector2(x, y))
+    def simulate_tick(self, dt: float):
+        """
+        Advances the game by one fixed step and pushes the result to every client.
+        """
+        # Make the changes the client threads submitted since the last tick
+        self.world.apply_changes()
+
+        # Update enemies using the current client positions and dt
+        self.gameServer.update_enemies(self.world.client_positions(), dt)
+
+        # Keep every tick's enemies for lag compensation, but only push every snapshot_interval ticks
+        self.tick += 1
+        self.enemy_history.record(self.tick, self.gameServer.enemy_data)
+        if self.tick % self.snapshot_interval == 0:
+            self.broadcaster.publish(self.build_snapshot(self.tick))
+
+    @property
+    def tick_metrics(self) -> TickMetrics:
+        """How well the simulation is keeping up with TICK_RATE."""
+        return self.scheduler.metrics
+
+    def log_tick_metrics(self):
+        metrics = self.tick_metrics
+        self.logger.info(
+            f"Tick metrics: {metrics.achieved_hz:.1f} Hz, {metrics.ticks} ticks, last {metrics.last_tick_duration * 1000:.2f} ms, "
+            f"slowest {metrics.max_tick_duration * 1000:.2f} ms, {metrics.overruns} overruns, {metrics.dropped_ticks} dropped"
+        )
 
-            # Update enemies using the current client positions and dt
-            self.gameServer.update_enemies(client_positions, dt)
+    def build_snapshot(self, tick: int) -> TickSnapshot:
+        """
+        Captures the current world state as the snapshot for the given tick.
+        """
+        clients = self.world.publish_clients()
+        state = WorldState(
+            clients={addr: clientState.fields for addr, clientState in clients.items()},
+            enemies={id: enemy_fields(enemy) for id, enemy in self.gameServer.enemy_data.items()}
+        )
+        self.snapshot_history.record(tick, state)
+        return TickSnapshot(tick, state, clients, self.snapshot_history, self.codecs)
             
     def check_for_discovery_request(self):
         """Check for UDP broadcast discovery requests and respond to them."""
@@ -121,8 +270,9 @@ class NetworkServer():
             try:
                 self.serverSocket.settimeout(1)  # Add a timeout to avoid blocking indefinitely
                 clientSock, clientAddr = self.serverSocket.accept()
-                if clientAddr[0] in self.live_clients:  # Not accepting duplicate clients
-                    clientSock.sendall("[CLOSECONNECTION]".encode('utf-8'))
+                if not self.register_client(clientAddr):  # Not accepting duplicate clients
+                    clientSock.sendall(self.closeMessage)
+                    clientSock.close()
                     continue
                 threading.Thread(target=self.handleClient, args=(clientSock, clientAddr), daemon=True).start()
             except socket.timeout:
@@ -132,154 +282,142 @@ class NetworkServer():
         """
         Handles communication with a connected client.
         """
+        disconnected = threading.Event()
+        reader = FrameReader(clientSock, self.buffer_pool.acquire())
         try:
             self.logger.info(f"Client {clientAddr} connected.")
-            self.live_clients.append(clientAddr[0])
 
             # Send entry information
-            clientSock.sendall(self.entryMessage)
+            clientSock.sendall(self.entry_message_for(clientAddr))
 
-            while not self.shutdown_event.is_set():
-                raw_length = self.recv_exact(clientSock, 4)
-                if not raw_length:
-                    break  # Client disconnected
-                
-                # Deserialize the received packet
-                message_length = struct.unpack('!I', raw_length)[0]
-                rawClientPacket = self.recv_exact(clientSock, message_length)
-                if not rawClientPacket:
-                    break  # Client disconnected
-
-                data_dict = json.loads(rawClientPacket.decode('utf-8'))
-
-                # Check if the packet contains a damage header
-                if "header" in data_dict and data_dict["header"] == "DAMAGE_TO_WHO":
-                    # Process the damage packet
-                    damage_list = data_dict["damage_data"]
-                    for damage_entry in damage_list:
-                        enemy_id = damage_entry["id"]
-                        damage = damage_entry["damage"]
-
-                        # Apply damage to the corresponding enemy
-                        if enemy_id in self.gameServer.enemies:
-                            self.gameServer.enemies[enemy_id].health -= damage
-                            if self.gameServer.enemies[enemy_id].health <= 0:
-                                self.gameServer.enemies[enemy_id].die()
-
-                # Otherwise, treat it as a normal client packet
-                clientPacket = self.deserialize_client_data(rawClientPacket)
-
-                # Update the client data with the newly received packet
-                self.all_client_data[clientAddr[0]] = rawClientPacket
-                enemy_data = {}
-                for id, enemy in self.gameServer.enemies.items():
-                    enemy_data[id] = {
-                        "position": {"x": enemy.position.x, "y": enemy.position.y},
-                        "health": enemy.health,
-                        "animation_frame": enemy.current_frame_index,
-                        "current_animation": enemy.current_animation,
-                        "is_alive": enemy.is_alive
-                    }
-
-                # Prepare the updated data to broadcast to other clients
-                combined_data = json.dumps({
-                    addr: rawPacket.decode('utf-8') if rawPacket is not None else None
-                    for addr, rawPacket in self.all_client_data.items()
-                })
-
-                serverPacket = self.serialize_server_data(
-                    ServerPacket(
-                        terrain=self.gameServer.terrain,
-                        clients_data=combined_data,
-                        enemy_data=enemy_data  # Include the enemy data in the packet
-                    )
-                )
+            # World snapshots are pushed from their own thread, independent of what this client sends
+            threading.Thread(target=self.sendSnapshots, args=(clientSock, clientAddr, disconnected), daemon=True).start()
 
-                clientSock.sendall(serverPacket)
+            while not self.shutdown_event.is_set():
+                # Packets are decoded straight from the connection's receive buffer
+                rawClientPacket = reader.read_frame()
+                self.process_client_packet(clientAddr, rawClientPacket)
 
-        except ConnectionResetError as e:
+        except (ConnectionResetError, ConnectionAbortedError) as e:
             self.logger.warning(f"Client {clientAddr} disconnected unexpectedly: {e}")
+        except ConnectionError:
+            pass  # Client disconnected
         except Exception as e:
             self.logger.exception(f"Error while handling a client: {e}")
         finally:
+            disconnected.set()
             self.cleanup_client(clientSock, clientAddr)
+            self.buffer_pool.release(reader.buffer)
 
-    def recv_exact(self, sock: socket.socket, length: int) -> bytes:
-        """Receives the exact number of bytes from the socket."""
-        data = b''
+    def sendSnapshots(self, clientSock: socket.socket, clientAddr, disconnected: threading.Event):
+        """
+        Sends every new world snapshot to a client until it disconnects. A client that
+        can't keep up skips straight to the latest snapshot instead of falling behind.
+        Nothing is sent until the client's first packet tells us which protocol it speaks.
+        """
+        last_tick = self.broadcaster.tick
         try:
-            while len(data) < length:
-                packet = sock.recv(length - len(data))
-                if not packet:
-                    return None  # Connection closed by the client
-                data += packet
-            return data
-        except (ConnectionResetError, ConnectionAbortedError):
-            return None  # Client disconnected unexpectedly
+            while not disconnected.is_set() and not self.shutdown_event.is_set():
+                last_tick, snapshot = self.broadcaster.wait_for_snapshot(last_tick)
+                clientState = snapshot.clients.get(clientAddr[0]) if snapshot is not None else None
+                if clientState is not None:
+                    clientSock.sendall(snapshot.payload_for(clientState.protocol, clientState.ack))
+        except OSError:
+            pass  # The receiving thread notices the disconnect and cleans up
+
+    def process_client_packet(self, clientAddr, rawClientPacket):
+        """
+        Applies a received client packet to the game state.
+        """
+        protocol = detect_protocol(rawClientPacket)
+        if protocol == PROTOCOL_JSON:
+            # Parse JSON packets once, they are either attack packets or client packets
+            data_dict = json.loads(str(rawClientPacket, 'utf-8'))
+            header = data_dict.get("header")
+            if header == INPUT_HEADER:
+                inputs, start = decode_input_packet(data_dict)
+                self.world.apply_inputs(clientAddr[0], inputs, start, self.gameServer.terrain_index)
+                return
+            if header == ATTACK_HEADER:
+                self.world.submit(
+                    self.resolve_attack, clientAddr[0], int(data_dict.get("tick", 0)),
+                    str(data_dict.get("weapon")), bool(data_dict.get("facing_right", True))
+                )
+                return
+            if header is not None:  # Clients no longer get to say who they hit, see resolve_attack
+                self.logger.warning(f"Ignoring {header} packet from {clientAddr}")
+                return
+
+            # Otherwise, treat it as a normal client packet
+            clientPacket = client_packet_from_dict(data_dict)
+        else:
+            clientPacket = self.deserialize_client_data(rawClientPacket, protocol)
+
+        # Hand the newly received packet to the tick thread
+        self.world.update_client(clientAddr[0], ClientState.from_packet(clientPacket, protocol))
+
+    def resolve_attack(self, addr: str, view_tick: int, weapon_name: str, facing_right: bool):
+        """
+        Damages whatever the client's weapon hits, checked against the enemies as they were
+        on the client's screen. Runs on the tick thread.
+        """
+        clientState = self.world.clients.get(addr)
+        if clientState is None:
+            return
+
+        hits = self.hit_resolver.resolve(addr, clientState.position, facing_right, weapon_name, view_tick)
+        for enemy_id, damage in hits.items():
+            enemy = self.gameServer.enemy_data.get(enemy_id)
+            if enemy is not None and enemy["is_alive"]:  # It may have died since the attacker saw it
+                self.gameServer.damage_enemy(enemy_id, damage)
 
     def cleanup_client(self, clientSock: socket.socket, clientAddr):
         """Cleans up the client connection after disconnection or error."""
-        try:
-            del self.all_client_data[clientAddr[0]]  # Remove entry in client data
-            self.live_clients.remove(clientAddr[0])  # Remove the live client
-        except (Exception, Exception) as e:
-            self.logger.error(f"Failed to remove client from data: {e}")
-            self.live_clients.remove(clientAddr[0])
+        self.remove_client(clientAddr)
         clientSock.close()
         self.logger.info(f"Client {clientAddr} disconnected and cleaned up.")
 
+    def register_client(self, clientAddr) -> bool:
+        """Marks a client as live. Returns False if a client from that address is already connected."""
+        with self.live_clients_lock:
+            if clientAddr[0] in self.live_clients:
+                return False
+            self.live_clients.add(clientAddr[0])
+            return True
+
+    def remove_client(self, clientAddr):
+        """Removes a client's stored data and marks it as no longer live."""
+        self.world.remove_client(clientAddr[0])  # Remove entry in client data on the next tick
+        self.world.submit(self.hit_resolver.forget, clientAddr[0])
+        with self.live_clients_lock:
+            self.live_clients.discard(clientAddr[0])  # Remove the live client
+
+    def add_length_prefix(self, data: bytes) -> bytes:
+        """Prefixes data with its length so the receiver knows where the packet ends."""
+        return struct.pack('!I', len(data)) + data
+
+    def entry_message_for(self, clientAddr) -> bytes:
+        """The length-prefixed ServerJoinPacket for a client, telling it which snapshot entry is its own."""
+        return self.add_length_prefix(self.serialize_server_join_data(replace(self.serverJoinPacket, client_id=clientAddr[0])))
+
     def serialize_server_join_data(self, packet: ServerJoinPacket) -> bytes:
         data_dict = {
             "servername": packet.servername,
             "serverip": packet.serverip,
-            "serverport": packet.serverport
+            "serverport": packet.serverport,
+            "protocols": packet.protocols,
+            "animation_table": packet.animation_table,
+            "terrain": packet.terrain,
+            "tick_rate": packet.tick_rate,
+            "client_id": packet.client_id
         }
         return json.dumps(data_dict).encode('utf-8')
 
-    def serialize_server_data(self, packet: ServerPacket) -> bytes:
+    def deserialize_client_data(self, data, protocol: str = PROTOCOL_JSON) -> ClientPacket:
         """
-        Serializes the server packet to JSON format.
+        Deserializes the client packet from the received bytes or a view of the receive buffer.
         """
-        data_dict = {
-            "terrain": packet.terrain,
-            "clients_data": packet.clients_data,
-            "enemy_data": packet.enemy_data  # Include the enemy data for serialization
-        }
-        return json.dumps(data_dict).encode('utf-8')
-
-    def deserialize_client_data(self, data: bytes) -> ClientPacket:
-        """
-        Deserializes the client packet from the received bytes.
-        """
-        data_dict = json.loads(data.decode('utf-8'))
-
-        # Handle deserialization of current_weapon
-        weapon_data = data_dict['gameData'].get('current_weapon')
-        current_weapon = None
-        if weapon_data:
-            current_weapon = Weapon(
-                name=weapon_data["name"],
-                range=weapon_data["range"],
-                damage=weapon_data["damage"]
-            )
-
-        position = Position(**data_dict['position'])
-        gameData = GameData(
-            HP=data_dict['gameData']['HP'],
-            facing_right=data_dict['gameData']['facing_right'],
-            current_animation=data_dict['gameData']['current_animation'],
-            current_frame_index=data_dict['gameData']['current_frame_index'],
-            last_frame_time=data_dict['gameData']['last_frame_time'],
-            player_scale=data_dict['gameData']['player_scale'],
-            velocity=data_dict['gameData']['velocity'],
-            velocity_y=data_dict['gameData']['velocity_y'],
-            grounded=data_dict['gameData']['grounded'],
-            movement_disabled=data_dict['gameData']['movement_disabled'],
-            animation_in_progress=data_dict['gameData']['animation_in_progress'],
-            current_weapon=current_weapon
-        )
-
-        return ClientPacket(username=data_dict['username'], position=position, gameData=gameData)
+        return self.codecs[protocol].decode_client_packet(data)
 
     def shutdown(self):
         """Gracefully shuts down the server."""
@@ -287,61 +425,177 @@ class NetworkServer():
         self.shutdown_event.set()  # Signal all threads to stop
         self.clientThread.join()  # Ensure the client-handling thread stops
         self.updateThread.join()
+        self.log_tick_metrics()
         self.serverSocket.close()  # Close the server socket
         self.udp_broadcast_socket.close()
         self.logger.info("Server shutdown complete.")
 
+class AsyncNetworkServer(NetworkServer):
+    """
+    A network server that serves every connected client from a single asyncio event loop
+    instead of spawning one OS thread per client. It speaks the same length-prefixed
+    protocol as NetworkServer, so existing clients can join either one.
+    """
+
+    # Clients with more than this many unsent bytes skip snapshots until they catch up
+    MAX_PENDING_BYTES = 256 * 1024
+
+    def startClientHandling(self):
+        """Runs the event loop that accepts and serves clients until shutdown."""
+        asyncio.run(self.serveClients())
+
+    async def serveClients(self):
+        """Accepts clients on the already bound server socket and waits for the shutdown event."""
+        self.writers: Dict[asyncio.StreamWriter, str] = {}  # Writer -> client address
+        loop = asyncio.get_running_loop()
+        self.broadcaster.listeners.append(lambda snapshot: loop.call_soon_threadsafe(self.sendSnapshotToAll, snapshot))
+
+        server = await asyncio.start_server(self.handleClientAsync, sock=self.serverSocket)
+        async with server:
+            while not self.shutdown_event.is_set():
+                await asyncio.sleep(0.5)
+
+    def sendSnapshotToAll(self, snapshot: TickSnapshot):
+        """Queues each connected client's delta on its transport."""
+        for writer, addr in self.writers.items():
+            clientState = snapshot.clients.get(addr)
+            if clientState is not None and writer.transport.get_write_buffer_size() < self.MAX_PENDING_BYTES:
+                writer.write(snapshot.payload_for(clientState.protocol, clientState.ack))
+
+    async def handleClientAsync(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Handles communication with a connected client on the event loop.
+        """
+        clientAddr = writer.get_extra_info('peername')
+        if not self.register_client(clientAddr):  # Not accepting duplicate clients
+            writer.write(self.closeMessage)
+            await writer.drain()
+            writer.close()
+            return
+
+        try:
+            self.logger.info(f"Client {clientAddr} connected.")
+
+            # Send entry information
+            writer.write(self.entry_message_for(clientAddr))
+            await writer.drain()
+            self.writers[writer] = clientAddr[0]
+
+            while not self.shutdown_event.is_set():
+                raw_length = await reader.readexactly(4)
+                message_length = struct.unpack('!I', raw_length)[0]
+                rawClientPacket = await reader.readexactly(message_length)
+
+                self.process_client_packet(clientAddr, rawClientPacket)
+
+        except asyncio.IncompleteReadError:
+            pass  # Client disconnected
+        except ConnectionResetError as e:
+            self.logger.warning(f"Client {clientAddr} disconnected unexpectedly: {e}")
+        except Exception as e:
+            self.logger.exception(f"Error while handling a client: {e}")
+        finally:
+            self.writers.pop(writer, None)
+            self.remove_client(clientAddr)
+            writer.close()
+            self.logger.info(f"Client {clientAddr} disconnected and cleaned up.")
+
+# Server modes that can be selected when starting a GameServer
+SERVER_MODES = {
+    "threaded": NetworkServer,
+    "asyncio": AsyncNetworkServer
+}
+
 class GameServer():
     """
     A gameserver that allows for the creation, deletion, and editing of objects.
     """
 
-    def __init__(self, serverName="OfficialServer", serverIp="127.0.0.1", serverPort=44200):
+    def __init__(self, serverName="OfficialServer", serverIp="127.0.0.1", serverPort=44200, vectorized_enemies: bool = HAS_NUMPY):
+        """
+        Args:
+            vectorized_enemies (bool): Simulate every enemy at once with EnemyEngine (needs numpy)
+                instead of updating each EnemyModel in turn. Both give the same results.
+        """
         self.serverName = serverName
         self.serverIp = serverIp
         self.serverPort = serverPort
         self.terrain = None
-        self.enemies = {}  # A list of all spawned enemies
+        self.terrain_index = None  # The terrain's buildings indexed by x for enemy collisions
+        self.enemies = {}  # A list of all spawned enemies, only kept up to date without the enemy engine
+        self.enemy_engine = EnemyEngine() if vectorized_enemies else None  # Holds the live enemy state when in use
         self.enemy_data = {}  # Data about enemies to be sent to clients
+        self.client_grid = PositionGrid()  # Client positions, rebuilt every tick for enemy targeting
+
+    def start(self, mode: str = "threaded"):
+        """
+        Generates the world and starts hosting it.
+
+        Args:
+            mode (str): Which network server to use, one of SERVER_MODES. "threaded" uses one
+                thread per client, "asyncio" serves every client from a single event loop.
+        """
+        if mode not in SERVER_MODES:
+            raise ValueError(f"Unknown server mode '{mode}', expected one of {list(SERVER_MODES)}")
 
-    def start(self):
         self.terrain = self.generateCityscape(8000)
-        self.spawn_enemy(pygame.Vector2(0, 0))
-        self.spawn_enemy(pygame.Vector2(3000, 0))
+        self.terrain_index = TerrainIndex(self.terrain)
+        self.spawn_enemy(Vector2(0, 0))
+        self.spawn_enemy(Vector2(3000, 0))
 
-        self.networkServer = NetworkServer(self, self.serverIp, self.serverPort)
+        self.networkServer = SERVER_MODES[mode](self, self.serverIp, self.serverPort)
 
-    def spawn_enemy(self, position: pygame.Vector2):
+    def spawn_enemy(self, position: Vector2):
         """
         Spawns a new enemy and adds it to the server's enemy list.
         """
-        new_enemy = Enemy(position, is_server=True)  # Indicate that this is server-side
-        self.enemies[secrets.token_hex(8)] = new_enemy
+        new_enemy = EnemyModel(position)
+        id = secrets.token_hex(8)
+        self.enemies[id] = new_enemy
+        if self.enemy_engine is not None:
+            self.enemy_engine.add(id, new_enemy)
 
-    def update_enemies(self, client_positions: List[pygame.Vector2], dt: float):
+    def damage_enemy(self, id: str, damage: float):
+        """
+        Damages an enemy, killing it if its health runs out.
+        """
+        if self.enemy_engine is not None:
+            self.enemy_engine.damage(id, damage)
+        elif id in self.enemies:
+            self.enemies[id].health -= damage
+            if self.enemies[id].health <= 0:
+                self.enemies[id].die()
+
+    def update_enemies(self, client_positions: List[Vector2], dt: float):
         """
         Updates each enemy in the game, making them chase the nearest client.
         
         Args:
-            client_positions (List[pygame.Vector2]): A list of client positions.
+            client_positions (List[Vector2]): A list of client positions.
             dt (float): Delta time for frame-independent movement.
         """
+        if self.enemy_engine is not None:
+            self.enemy_engine.update(client_positions, self.terrain_index, dt)
+            self.enemy_data = self.enemy_engine.enemy_data()
+            return
+
         self.enemy_data = {}  # Clear the previous frame's data
+        self.client_grid.rebuild(client_positions)  # Indexed once so each enemy doesn't check every client
         
         for id, enemy in self.enemies.items():
-            enemy: Enemy
+            enemy: EnemyModel
             if enemy.is_alive:
                 # Update enemy logic (chasing nearest client, moving)
-                enemy.update(clients_positions=client_positions, terrain=self.terrain, dt=dt)
+                enemy.update(clients_positions=client_positions, terrain=self.terrain_index, dt=dt, client_grid=self.client_grid)
 
-                # Store updated data for this enemy to send to clients
-                self.enemy_data[id] = {
-                    "position": {"x": enemy.position.x, "y": enemy.position.y},
-                    "health": enemy.health,
-                    "animation_frame": enemy.current_frame_index,
-                    "current_animation": enemy.current_animation,  # Include current animation state
-                    "is_alive": enemy.is_alive
-                }
+            # Store updated data for this enemy to send to clients, dead enemies included
+            self.enemy_data[id] = {
+                "position": {"x": enemy.position.x, "y": enemy.position.y},
+                "health": enemy.health,
+                "animation_frame": enemy.current_frame_index,
+                "current_animation": enemy.current_animation,  # Include current animation state
+                "is_alive": enemy.is_alive
+            }
 
     def generateCityscape(self, width, building_width=500, min_height=350, max_height=700, space_between=100) -> List[List[Tuple[int, int]]]:
         """
@@ -378,6 +632,14 @@ class GameServer():
         
         return buildings
 
-# Create and start the server
-newServer = GameServer(serverName="Test Server", serverIp="0.0.0.0")
-newServer.start()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=f"Hosts a {GAME_NAME} server.")
+    parser.add_argument("--name", default="Test Server", help="The server name shown to clients")
+    parser.add_argument("--ip", default="0.0.0.0", help="The address to bind to")
+    parser.add_argument("--port", type=int, default=44200, help="The port to bind to")
+    parser.add_argument("--mode", choices=list(SERVER_MODES), default="threaded", help="How clients are served")
+    args = parser.parse_args()
+
+    # Create and start the server
+    newServer = GameServer(serverName=args.name, serverIp=args.ip, serverPort=args.port)
+    newServer.start(mode=args.mode)
@@ -0,0 +1,203 @@
+## World snapshots and the deltas between them
+## Every tick the server turns the world into a WorldState: a tuple of field values per player and
+## per enemy. Each client acknowledges the last snapshot it applied, and the server only sends the
+## fields that changed since then. Terrain never changes, so it is sent once in the ServerJoinPacket.
+
+import threading
+from collections import OrderedDict
+from GameModel import *
+
+# (name, wire format) of every field sent for a player or an enemy, in the order they are packed.
+# The field's index in these lists is what the delta masks refer to.
+CLIENT_FIELDS = [
+    ("username", "str"),
+    ("x", "f"),
+    ("y", "f"),
+    ("HP", "h"),
+    ("facing_right", "?"),
+    ("current_animation", "animation"),
+    ("current_frame_index", "H"),
+    ("last_frame_time", "I"),
+    ("player_scale", "f"),
+    ("velocity", "f"),
+    ("velocity_y", "f"),
+    ("grounded", "?"),
+    ("movement_disabled", "?"),
+    ("animation_in_progress", "?"),
+    ("current_weapon", "weapon"),
+    ("input_sequence", "I")  # Last input the server ran for a player moved by the server, 0 otherwise
+]
+
+ENEMY_FIELDS = [
+    ("x", "f"),
+    ("y", "f"),
+    ("health", "h"),
+    ("animation_frame", "H"),
+    ("current_animation", "animation"),
+    ("is_alive", "?")
+]
+
+@dataclass
+class WorldState:
+    clients: Dict[str, tuple]  # Client address -> values in CLIENT_FIELDS order
+    enemies: Dict[str, tuple]  # Enemy id -> values in ENEMY_FIELDS order
+
+@dataclass
+class SnapshotDelta:
+    tick: int
+    base: int  # Tick the delta is relative to, 0 when it is a full snapshot
+    clients: Dict[str, Dict[int, Any]]  # Client address -> {field index: new value}
+    enemies: Dict[str, Dict[int, Any]]  # Enemy id -> {field index: new value}
+    removed_clients: List[str]
+    removed_enemies: List[str]
+
+EMPTY_WORLD = WorldState(clients={}, enemies={})
+
+def client_fields(packet: ClientPacket) -> tuple:
+    """Flattens a client packet into its CLIENT_FIELDS values."""
+    gameData = packet.gameData
+    weapon = gameData.current_weapon
+    return (
+        packet.username,
+        packet.position.x,
+        packet.position.y,
+        int(gameData.HP),
+        gameData.facing_right,
+        gameData.current_animation,
+        int(gameData.current_frame_index),
+        int(gameData.last_frame_time),
+        gameData.player_scale,
+        gameData.velocity,
+        gameData.velocity_y,
+        gameData.grounded,
+        gameData.movement_disabled,
+        gameData.animation_in_progress,
+        (weapon.name, weapon.range, weapon.damage) if weapon else None,
+        0  # Filled in once the server runs the player's inputs
+    )
+
+def enemy_fields(enemy_data: dict) -> tuple:
+    """Flattens one of GameServer.enemy_data's records into its ENEMY_FIELDS values."""
+    return (
+        enemy_data["position"]["x"],
+        enemy_data["position"]["y"],
+        int(enemy_data["health"]),
+        int(enemy_data["animation_frame"]),
+        enemy_data["current_animation"],
+        enemy_data["is_alive"]
+    )
+
+def _diff_entities(base: Dict[str, tuple], current: Dict[str, tuple]) -> Tuple[Dict[str, Dict[int, Any]], List[str]]:
+    changed = {}
+    for key, values in current.items():
+        old_values = base.get(key)
+        if old_values is None:
+            changed[key] = dict(enumerate(values))  # New entity, send every field
+        elif old_values != values:
+            changed[key] = {index: value for index, (value, old_value) in enumerate(zip(values, old_values)) if value != old_value}
+    removed = [key for key in base if key not in current]
+    return changed, removed
+
+def diff_states(base: Optional[WorldState], state: WorldState, tick: int, base_tick: int) -> SnapshotDelta:
+    """
+    Builds the delta that turns base into state. With no base, the delta is a full snapshot.
+    """
+    if base is None:
+        base, base_tick = EMPTY_WORLD, 0
+    changed_clients, removed_clients = _diff_entities(base.clients, state.clients)
+    changed_enemies, removed_enemies = _diff_entities(base.enemies, state.enemies)
+    return SnapshotDelta(
+        tick=tick,
+        base=base_tick,
+        clients=changed_clients,
+        enemies=changed_enemies,
+        removed_clients=removed_clients,
+        removed_enemies=removed_enemies
+    )
+
+def _apply_entities(base: Dict[str, tuple], changed: Dict[str, Dict[int, Any]], removed: List[str]) -> Dict[str, tuple]:
+    entities = dict(base)
+    for key in removed:
+        entities.pop(key, None)
+    for key, fields in changed.items():
+        old_values = entities.get(key)
+        if old_values is None:
+            entities[key] = tuple(fields[index] for index in range(len(fields)))
+        else:
+            entities[key] = tuple(fields.get(index, value) for index, value in enumerate(old_values))
+    return entities
+
+def apply_delta(base: Optional[WorldState], delta: SnapshotDelta) -> WorldState:
+    """
+    Applies a delta to the state it was made against and returns the new state.
+    """
+    if base is None:
+        base = EMPTY_WORLD
+    return WorldState(
+        clients=_apply_entities(base.clients, delta.clients, delta.removed_clients),
+        enemies=_apply_entities(base.enemies, delta.enemies, delta.removed_enemies)
+    )
+
+def state_to_server_packet(state: WorldState, terrain: list) -> ServerPacket:
+    """
+    Turns a world state back into the ServerPacket the game code draws from.
+    """
+    clients_data = {}
+    for addr, (username, x, y, HP, facing_right, current_animation, current_frame_index, last_frame_time,
+               player_scale, velocity, velocity_y, grounded, movement_disabled, animation_in_progress, weapon, input_sequence) in state.clients.items():
+        clients_data[addr] = {
+            "username": username,
+            "input_sequence": input_sequence,
+            "position": Position(x, y),
+            "gameData": GameData(
+                HP=HP,
+                facing_right=facing_right,
+                current_animation=current_animation,
+                current_frame_index=current_frame_index,
+                last_frame_time=last_frame_time,
+                player_scale=player_scale,
+                velocity=velocity,
+                velocity_y=velocity_y,
+                grounded=grounded,
+                movement_disabled=movement_disabled,
+                animation_in_progress=animation_in_progress,
+                current_weapon=WeaponData(*weapon) if weapon else None
+            )
+        }
+
+    enemy_data = {}
+    for id, (x, y, health, animation_frame, current_animation, is_alive) in state.enemies.items():
+        enemy_data[id] = {
+            "position": Position(x, y),
+            "health": health,
+            "animation_frame": animation_frame,
+            "current_animation": current_animation,
+            "is_alive": is_alive
+        }
+
+    return ServerPacket(terrain=terrain, clients_data=clients_data, enemy_data=enemy_data)
+
+class SnapshotHistory():
+    """
+    The most recent world states by tick, so deltas can be made against (or applied to)
+    whichever tick the other side has. Safe to use from several threads.
+    """
+
+    def __init__(self, max_size: int = 64):
+        self.max_size = max_size  # One entry a snapshot, 64 is just over 2 seconds at 30 snapshots a second
+        self.states: OrderedDict[int, WorldState] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def record(self, tick: int, state: WorldState):
+        with self.lock:
+            self.states[tick] = state
+            while len(self.states) > self.max_size:
+                self.states.popitem(last=False)
+
+    def get(self, tick: int) -> Optional[WorldState]:
+        with self.lock:
+            return self.states.get(tick)
+
+    def clear(self):
+        with self.lock:
+            self.states.clear()
@@ -0,0 +1,121 @@
+## Sound effects decoded once and played on channels kept for them
+## Making a pygame.mixer.Sound from an MP3 decodes the whole file, which took long enough to hitch
+## a frame when it was done on every attack. The sound bank decodes every clip once, when the game
+## starts, into the PCM buffer the mixer plays from, and plays them on a fixed set of channels that
+## pygame reserves so music and other sounds never take them. When every channel is busy the sound
+## that has been playing longest is cut off for the new one. Every clip belongs to a category with
+## its own volume, under a master volume.
+
+import os, time, threading
+from pathlib import Path
+from typing import *
+import pygame
+
+SFX_CHANNELS = 8  # Sound effects that can play at the same time
+SOUND_EXTENSIONS = (".mp3", ".ogg", ".wav")
+MASTER = "master"  # Category whose volume applies to every sound
+
+class SoundBank():
+    """
+    Decoded sound effects by name, and the mixer channels they are played on.
+    The mixer must be initialised before a sound bank is made.
+    """
+
+    def __init__(self, channels: int = SFX_CHANNELS):
+        """
+        Args:
+            channels (int): Mixer channels reserved for the sound bank, from channel 0.
+        """
+        if pygame.mixer.get_num_channels() < channels:
+            pygame.mixer.set_num_channels(channels)
+        pygame.mixer.set_reserved(channels)  # Sound.play() never picks these
+        self.channels = [pygame.mixer.Channel(index) for index in range(channels)]
+        self.playing: List[Tuple[float, str]] = [(0.0, MASTER)] * channels  # (started at, category) by channel
+        self.sounds: Dict[str, Tuple[pygame.mixer.Sound, str]] = {}  # Name -> (sound, category)
+        self.volumes: Dict[str, float] = {MASTER: 1.0}
+        self.lock = threading.Lock()
+        self.stolen = 0
+
+    def add(self, name: str, sound: pygame.mixer.Sound, category: str = "sfx"):
+        """Adds an already decoded sound."""
+        with self.lock:
+            self.sounds[name] = (sound, category)
+
+    def load(self, folder: Union[str, Path], category: str = "sfx") -> List[str]:
+        """
+        Decodes every sound in a folder, named after its file without the extension.
+        Safe to run on a loading thread while sounds already loaded are played.
+
+        Returns:
+            List[str]: The names of the sounds loaded.
+        """
+        names = []
+        for filename in sorted(os.listdir(folder)):
+            name, extension = os.path.splitext(filename)
+            if extension.lower() in SOUND_EXTENSIONS:
+                self.add(name, pygame.mixer.Sound(os.path.join(folder, filename)), category)
+                names.append(name)
+        return names
+
+    def play(self, name: str, volume: float = 1.0) -> Optional[pygame.mixer.Channel]:
+        """
+        Plays a sound on a free channel, or on the one that has been playing longest if none are free.
+
+        Args:
+            name (str): The sound to play.
+            volume (float): Volume of this sound, from 0 to 1, before its category's and the master volume.
+
+        Returns:
+            Optional[pygame.mixer.Channel]: The channel it plays on, None if no sound has that name.
+        """
+        with self.lock:
+            entry = self.sounds.get(name)
+            if entry is None:
+                return None
+            sound, category = entry
+
+            index = next((index for index, channel in enumerate(self.channels) if not channel.get_busy()), None)
+            if index is None:
+                index = min(range(len(self.channels)), key=lambda index: self.playing[index][0])
+                self.stolen += 1
+            channel = self.channels[index]
+            channel.stop()
+            channel.play(sound)
+            channel.set_volume(volume * self._volume(category))
+            self.playing[index] = (time.monotonic(), category)
+            return channel
+
+    def set_volume(self, category: str, volume: float):
+        """
+        Sets the volume of a category, or of every sound for MASTER, and of sounds of it already playing.
+
+        Args:
+            category (str): The category.
+            volume (float): From 0 to 1.
+        """
+        with self.lock:
+            volume = max(0.0, min(1.0, volume))
+            previous = self.volumes.get(category, 1.0)
+            if volume == previous:
+                return
+            self.volumes[category] = volume
+
+            for channel, (_, playing) in zip(self.channels, self.playing):
+                if channel.get_busy() and (category == MASTER or playing == category):
+                    if previous == 0:
+                        channel.stop()  # Its own volume was lost when it was muted
+                    else:
+                        channel.set_volume(channel.get_volume() * volume / previous)
+
+    def get_volume(self, category: str) -> float:
+        """Returns the volume set for a category, 1 if it was never set."""
+        return self.volumes.get(category, 1.0)
+
+    def _volume(self, category: str) -> float:
+        return self.volumes.get(category, 1.0) * self.volumes[MASTER]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.sounds
+
+    def __len__(self) -> int:
+        return len(self.sounds)
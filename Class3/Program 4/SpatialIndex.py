@@ -0,0 +1,126 @@
+## Spatial indexes for the questions the game asks every tick
+## The world is a side-scroller, so everything is spread out along x and indexing on x alone
+## is enough to avoid checking every object against every other object.
+
+from bisect import bisect_left, bisect_right
+from math import floor
+from typing import *
+
+class PositionGrid():
+    """
+    A 1-D grid of buckets along x holding positions, rebuilt once per tick and queried for
+    the position nearest to a point. Only buckets that hold something are visited, walking
+    outwards from the query until no unvisited bucket can hold anything closer.
+    """
+
+    def __init__(self, cell_width: float = 512):
+        """
+        Args:
+            cell_width (float): Width of each bucket in pixels.
+        """
+        self.cell_width = cell_width
+        self.buckets: Dict[int, List[tuple]] = {}  # Bucket index -> (x, y, position) of everything in it
+        self.keys: List[int] = []  # Indexes of the non-empty buckets, sorted
+        self.points: List[tuple] = []  # Every (x, y, position), for grids too small to be worth walking
+
+    def rebuild(self, positions: Iterable):
+        """
+        Replaces the contents of the grid.
+
+        Args:
+            positions (Iterable): Anything with x and y attributes, such as Vector2 or Position.
+                The same objects are handed back by nearest.
+        """
+        buckets = {}
+        points = [(position.x, position.y, position) for position in positions]
+        for point in points:
+            key = floor(point[0] / self.cell_width)
+            if key in buckets:
+                buckets[key].append(point)
+            else:
+                buckets[key] = [point]
+        self.buckets = buckets
+        self.keys = sorted(buckets)
+        self.points = points
+
+    def nearest(self, x: float, y: float):
+        """
+        Returns the position closest to (x, y), or None if the grid is empty.
+        """
+        keys = self.keys
+        if len(keys) <= 1:
+            return self._nearest_of(self.points, x, y)  # Nothing to gain from walking buckets
+
+        cell_width = self.cell_width
+        right = bisect_left(keys, floor(x / cell_width))
+        left = right - 1
+        best, best_distance = None, float('inf')
+
+        while left >= 0 or right < len(keys):
+            # How far away, along x alone, the closest bucket on each side starts
+            left_gap = x - (keys[left] + 1) * cell_width if left >= 0 else float('inf')
+            right_gap = keys[right] * cell_width - x if right < len(keys) else float('inf')
+
+            if left_gap <= right_gap:
+                gap, index = left_gap, keys[left]
+                left -= 1
+            else:
+                gap, index = right_gap, keys[right]
+                right += 1
+
+            if gap > 0 and gap * gap >= best_distance:
+                break  # Every remaining bucket is at least this far away
+
+            for point_x, point_y, position in self.buckets[index]:
+                dx, dy = point_x - x, point_y - y
+                distance = dx * dx + dy * dy
+                if distance < best_distance:
+                    best, best_distance = position, distance
+
+        return best
+
+    def _nearest_of(self, points: List[tuple], x: float, y: float):
+        best, best_distance = None, float('inf')
+        for point_x, point_y, position in points:
+            dx, dy = point_x - x, point_y - y
+            distance = dx * dx + dy * dy
+            if distance < best_distance:
+                best, best_distance = position, distance
+        return best
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+class TerrainIndex():
+    """
+    The terrain's buildings sorted by their left edge, so the buildings under an x range are found
+    with a binary search instead of checking every building. Built once, since terrain never
+    changes after it is generated.
+    """
+
+    def __init__(self, terrain: List[List[Tuple[int, int]]]):
+        """
+        Args:
+            terrain (List[List[Tuple[int, int]]]): Building polygons as made by GameServer.generateCityscape,
+                four points each: [top-left, top-right, bottom-right, bottom-left].
+        """
+        # (left, right, top, bottom) of every building
+        self.buildings: List[Tuple[float, float, float, float]] = sorted(
+            (building[0][0], building[1][0], building[0][1], building[3][1]) for building in terrain
+        )
+        self.lefts = [building[0] for building in self.buildings]
+        # No building starting further left than this past a query can reach it
+        self.max_width = max((right - left for left, right, _, _ in self.buildings), default=0)
+
+    def overlapping(self, left: float, right: float) -> List[Tuple[float, float, float, float]]:
+        """
+        Returns (left, right, top, bottom) of every building whose x span overlaps [left, right],
+        ordered by their left edge.
+        """
+        start = bisect_left(self.lefts, left - self.max_width)
+        end = bisect_right(self.lefts, right)
+        return [building for building in self.buildings[start:end] if building[1] >= left]
+
+    def at(self, x: float) -> List[Tuple[float, float, float, float]]:
+        """Returns (left, right, top, bottom) of every building spanning x."""
+        return self.overlapping(x, x)
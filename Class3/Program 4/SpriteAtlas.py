@@ -0,0 +1,147 @@
+## Sprite sheets loaded once and kept sliced into frames, and those frames kept scaled and flipped
+## Loading a PNG and converting it for the display takes far longer than drawing it, so every sheet
+## is loaded and sliced the first time it is asked for and the frames are handed out from then on.
+## Scaling and flipping a frame is the next most expensive part of drawing it, so each variant that
+## gets drawn is made once too. Both drop what was used least recently past their limit.
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import *
+import pygame
+
+class SpriteAtlas():
+    """
+    Sliced sprite sheets keyed by (sheet path, frame width, frame height), shared by everything
+    that draws animations. Frames are handed out as tuples, the same ones to every caller.
+    Loading converts sheets for the display, so the display mode must be set first.
+    """
+
+    def __init__(self, max_sheets: int = 64):
+        """
+        Args:
+            max_sheets (int): Most sheets kept, the least recently used are dropped past this.
+        """
+        self.max_sheets = max_sheets
+        self.sheets: OrderedDict[Tuple[str, int, int], Tuple[pygame.Surface, ...]] = OrderedDict()
+        self.hits = 0  # Requests answered from the cache
+        self.misses = 0  # Requests that loaded a sheet
+        self.lock = threading.Lock()
+
+    def frames(self, path: Union[str, Path], frame_width: int, frame_height: Optional[int] = None) -> Tuple[pygame.Surface, ...]:
+        """
+        Returns the frames of a sprite sheet, read left to right and then top to bottom.
+
+        Args:
+            path (Union[str, Path]): The sheet's PNG.
+            frame_width (int): Width of one frame in pixels.
+            frame_height (Optional[int]): Height of one frame, the same as the width if not given.
+        """
+        frame_height = frame_height or frame_width
+        key = (str(path), frame_width, frame_height)
+        with self.lock:
+            frames = self.sheets.get(key)
+            if frames is not None:
+                self.sheets.move_to_end(key)
+                self.hits += 1
+                return frames
+
+        frames = self._slice(pygame.image.load(key[0]).convert_alpha(), frame_width, frame_height)
+        with self.lock:
+            self.misses += 1
+            self.sheets[key] = frames
+            self.sheets.move_to_end(key)
+            while len(self.sheets) > self.max_sheets:
+                self.sheets.popitem(last=False)
+        return frames
+
+    def _slice(self, sheet: pygame.Surface, frame_width: int, frame_height: int) -> Tuple[pygame.Surface, ...]:
+        sheet_width, sheet_height = sheet.get_size()
+        return tuple(
+            sheet.subsurface((x, y, frame_width, frame_height))
+            for y in range(0, sheet_height, frame_height)
+            for x in range(0, sheet_width, frame_width)
+        )
+
+    def preload(self, folder: Union[str, Path], frame_width: int, frame_height: Optional[int] = None) -> int:
+        """
+        Loads every sheet in a folder ahead of time, so the first time an animation plays doesn't stall a frame.
+
+        Returns:
+            int: How many sheets were loaded.
+        """
+        paths = sorted(Path(folder).glob("*.png"))
+        for path in paths:
+            self.frames(path, frame_width, frame_height)
+        return len(paths)
+
+    def clear(self):
+        with self.lock:
+            self.sheets.clear()
+
+    def __len__(self) -> int:
+        return len(self.sheets)
+
+class TransformCache():
+    """
+    Scaled and flipped copies of animation frames, made the first time each is drawn.
+    Keyed by the frame itself, so it only makes sense for frames that are kept, like SpriteAtlas's.
+    """
+
+    def __init__(self, max_bytes: int = 128 * 1024 * 1024):
+        """
+        Args:
+            max_bytes (int): Most pixel memory the copies may take up, the least recently used
+                are dropped past this. A player frame at scale 3 takes about 800 KB.
+        """
+        self.max_bytes = max_bytes
+        self.surfaces: OrderedDict[Tuple[pygame.Surface, int, int, bool], pygame.Surface] = OrderedDict()
+        self.bytes = 0  # Pixel memory held
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, frame: pygame.Surface, scale: float = 1, flip: bool = False) -> pygame.Surface:
+        """
+        Returns the frame flipped horizontally if asked and then scaled, the same as
+        pygame.transform.flip followed by pygame.transform.scale.
+
+        Args:
+            frame (pygame.Surface): The frame, from SpriteAtlas.frames.
+            scale (float): How much bigger to draw it, sizes are rounded down to whole pixels.
+            flip (bool): Whether to mirror it, for things facing left.
+        """
+        width, height = int(frame.get_width() * scale), int(frame.get_height() * scale)
+        key = (frame, width, height, flip)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = pygame.transform.flip(frame, True, False) if flip else frame
+        if (width, height) != surface.get_size():
+            surface = pygame.transform.scale(surface, (width, height))
+        elif surface is frame:
+            return frame  # Nothing to do, and nothing worth keeping
+
+        self.surfaces[key] = surface
+        self.bytes += self._size_of(surface)
+        while self.bytes > self.max_bytes and len(self.surfaces) > 1:
+            _, dropped = self.surfaces.popitem(last=False)
+            self.bytes -= self._size_of(dropped)
+        return surface
+
+    def _size_of(self, surface: pygame.Surface) -> int:
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def clear(self):
+        self.surfaces.clear()
+        self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self.surfaces)
+
+# Shared by every animation in the process
+sprite_atlas = SpriteAtlas()
+frame_cache = TransformCache()
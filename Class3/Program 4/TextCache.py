@@ -0,0 +1,69 @@
+## Fonts opened once and text rendered once
+## pygame.font.SysFont looks through the system's fonts every time it is called and rendering a
+## string rasterises every glyph in it, yet the menus and overlays draw the same few strings in the
+## same few fonts every frame. Fonts are kept by (file, size) for as long as the game runs, and
+## rendered text by (font, text, colour) until the least recently used is dropped past max_surfaces.
+
+from collections import OrderedDict
+from typing import *
+import pygame
+
+class TextCache():
+    """
+    Fonts and rendered text shared by every menu and overlay. Only used from the game loop.
+    Rendered surfaces are shared too, so they must not be drawn on.
+    """
+
+    def __init__(self, max_surfaces: int = 512):
+        """
+        Args:
+            max_surfaces (int): Most rendered strings kept, the least recently used are dropped past this.
+        """
+        self.max_surfaces = max_surfaces
+        self.fonts: Dict[Tuple[Optional[str], int], pygame.font.Font] = {}
+        self.surfaces: OrderedDict[Tuple[pygame.font.Font, str, tuple, bool], pygame.Surface] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, path: Optional[str] = None, size: int = 24) -> pygame.font.Font:
+        """
+        Returns the font at a size, opening it the first time.
+
+        Args:
+            path (Optional[str]): A font file, or None for pygame's default font (what SysFont(None, size) gives).
+            size (int): Height of the font in pixels.
+        """
+        key = (path, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.Font(path, size)
+            self.fonts[key] = font
+        return font
+
+    def render(self, font: pygame.font.Font, text: str, color: Tuple[int, int, int], antialias: bool = True) -> pygame.Surface:
+        """
+        Returns the text rendered in a font and colour, the same as font.render(text, antialias, color).
+        """
+        key = (font, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_surfaces:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """Forgets the rendered text, the fonts are kept."""
+        self.surfaces.clear()
+
+    def __len__(self) -> int:
+        return len(self.surfaces)
+
+# Shared by every menu and overlay
+text_cache = TextCache()
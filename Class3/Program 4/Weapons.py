@@ -154,4 +154,12 @@ class Spear(Weapon):
         pass
 
     def apply_damage(self, enemies):
-        return super().apply_damage(enemies)
\ No newline at end of file
+        return super().apply_damage(enemies)
+
+# Every weapon a player can hold, by name. The server looks up a weapon's range and damage here
+# instead of trusting what a client reports.
+WEAPONS = {
+    "Iron Sword": lambda: Sword("Iron Sword", "SwordAttack", "SwordSwing"),
+    "Spear": lambda: Spear("Spear", "SpearAttack", "SpearThrust"),
+    "Great Sword": lambda: Sword("Great Sword", "GreatswordAttack", "SwordSwingBeefy", anim_speed=.75, damage=45, range=200)
+}
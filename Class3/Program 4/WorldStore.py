@@ -0,0 +1,133 @@
+## World state shared between the simulation and the network threads
+## Only the tick thread ever changes the world. Client threads hand their changes to it through a
+## queue, which it applies at the start of each tick, and after every tick it publishes read-only
+## copies of what it simulated. Readers keep using the copy they were handed, so they never wait
+## on the simulation and never see a world it is halfway through changing.
+
+import time
+from collections import deque
+from dataclasses import replace
+from GameModel import *
+from Protocol import *
+
+@dataclass(frozen=True)
+class ClientState:
+    """
+    What the server knows about one client. It is made once when a packet arrives,
+    so the simulation reads it every tick without parsing anything. A new packet replaces
+    the whole record, it is never changed in place, so published copies stay as they were.
+    """
+    packet: ClientPacket
+    protocol: str  # The protocol the client sends in and is sent snapshots in
+    position: Vector2
+    fields: tuple  # The packet as CLIENT_FIELDS values, ready to go in a snapshot
+    ack: int  # Last snapshot tick the client applied
+    movement: Optional[PlayerState] = None  # Set once the server runs the client's inputs, then it decides where the player is
+    input_sequence: int = 0  # Last input the server ran
+    input_budget: Optional[InputBudget] = None  # Input time the server will still run, made with the first inputs
+
+    @classmethod
+    def from_packet(cls, packet: ClientPacket, protocol: str) -> 'ClientState':
+        return cls(
+            packet=packet,
+            protocol=protocol,
+            position=Vector2(packet.position.x, packet.position.y),
+            fields=client_fields(packet),
+            ack=packet.ack
+        )
+
+    def with_movement(self, movement: PlayerState, input_sequence: int) -> 'ClientState':
+        """Returns a copy with the player where the server's movement put them, instead of where the client said."""
+        fields = list(self.fields)
+        fields[CLIENT_FIELD_INDEXES["x"]] = movement.x
+        fields[CLIENT_FIELD_INDEXES["y"]] = movement.y
+        fields[CLIENT_FIELD_INDEXES["velocity_y"]] = movement.velocity_y
+        fields[CLIENT_FIELD_INDEXES["grounded"]] = movement.grounded
+        fields[CLIENT_FIELD_INDEXES["facing_right"]] = movement.facing_right
+        fields[CLIENT_FIELD_INDEXES["input_sequence"]] = input_sequence
+        return replace(
+            self,
+            position=Vector2(movement.x, movement.y),
+            fields=tuple(fields),
+            movement=movement,
+            input_sequence=input_sequence
+        )
+
+class WorldStore():
+    """
+    The world's client records with one writer, the tick thread, and any number of readers.
+    Any thread may submit a change. Only the tick thread calls apply_changes and reads clients.
+    """
+
+    def __init__(self):
+        self.changes = deque()  # (change, args) waiting for the next tick, appended from any thread
+        self.clients: Dict[str, ClientState] = {}  # Client address -> its latest state, owned by the tick thread
+
+    def submit(self, change: Callable, *args):
+        """
+        Queues a change to be made by the tick thread at the start of the next tick.
+        Safe to call from any thread, changes are made in the order they were submitted.
+        """
+        self.changes.append((change, args))
+
+    def update_client(self, addr: str, state: ClientState):
+        """Queues replacing a client's state with the one decoded from its latest packet."""
+        self.submit(self._update_client, addr, state)
+
+    def _update_client(self, addr: str, state: ClientState):
+        previous = self.clients.get(addr)
+        if previous is not None and previous.movement is not None:
+            state = replace(state.with_movement(previous.movement, previous.input_sequence), input_budget=previous.input_budget)  # The server moves this player
+        self.clients[addr] = state
+
+    def apply_inputs(self, addr: str, inputs: List[PlayerInput], start: Optional[PlayerState], terrain, now: Optional[float] = None):
+        """
+        Queues running a client's inputs through the same movement the client predicted with.
+        The first inputs start from start if the client sent one close to its last reported position,
+        or from that position. Inputs beyond the real time that has passed are dropped, see InputBudget.
+
+        Args:
+            now (float): When the inputs arrived, time.monotonic() if not given.
+        """
+        self.submit(self._apply_inputs, addr, inputs, start, terrain, time.monotonic() if now is None else now)
+
+    def _apply_inputs(self, addr: str, inputs: List[PlayerInput], start: Optional[PlayerState], terrain, now: float):
+        clientState = self.clients.get(addr)
+        if clientState is None:
+            return  # Inputs are sent after the client's state, so this client has already left
+
+        movement = clientState.movement
+        if movement is None:
+            if start is None or clientState.position.distance_to((start.x, start.y)) > MAX_START_DISTANCE:
+                start = PlayerState(clientState.position.x, clientState.position.y)
+            movement = start
+
+        budget = clientState.input_budget or InputBudget(now)
+        budget.refill(now)
+        movement, input_sequence = run_inputs(movement, clientState.input_sequence, inputs, terrain, budget)
+        self.clients[addr] = replace(clientState.with_movement(movement, input_sequence), input_budget=budget)
+
+    def remove_client(self, addr: str):
+        """Queues forgetting about a client that disconnected."""
+        self.submit(self.clients.pop, addr, None)
+
+    def apply_changes(self) -> int:
+        """
+        Makes every queued change. Called by the tick thread before it simulates.
+
+        Returns:
+            int: How many changes were made.
+        """
+        applied = 0
+        while self.changes:
+            change, args = self.changes.popleft()
+            change(*args)
+            applied += 1
+        return applied
+
+    def client_positions(self) -> List[Vector2]:
+        return [clientState.position for clientState in self.clients.values()]
+
+    def publish_clients(self) -> Dict[str, ClientState]:
+        """Returns a copy of the client records for readers on other threads."""
+        return dict(self.clients)
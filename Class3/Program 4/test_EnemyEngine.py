@@ -0,0 +1,45 @@
+#####################################################################
+# description:  tests for target selection in EnemyEngine.py. With
+# many enemies and clients the engine walks outwards from each
+# enemy through the clients sorted by x, and it has to pick the
+# same client checking every pair would, first one on ties.
+#####################################################################
+
+import unittest
+
+from EnemyEngine import *
+
+def nearest_by_every_pair(x, y, client_x, client_y):
+    dx = client_x[None, :] - x[:, None]
+    dy = client_y[None, :] - y[:, None]
+    return np.argmin(dx * dx + dy * dy, axis=1)
+
+@unittest.skipUnless(HAS_NUMPY, "EnemyEngine needs numpy")
+class NearestClientTest(unittest.TestCase):
+
+    def check(self, x, y, client_x, client_y):
+        self.assertGreater(len(x) * len(client_x), MAX_BRUTE_FORCE_PAIRS)  # Walks rather than checking every pair
+        nearest = EnemyEngine()._nearest_clients(x, y, client_x, client_y)
+        np.testing.assert_array_equal(nearest, nearest_by_every_pair(x, y, client_x, client_y))
+
+    def test_spread_over_the_cityscape(self):
+        rng = np.random.default_rng(0)
+        x, y = rng.uniform(-4000, 4000, 5000), rng.uniform(-1500, 0, 5000)
+        client_x, client_y = rng.uniform(-4000, 4000, 128), rng.uniform(-800, -400, 128)
+        self.check(x, y, client_x, client_y)
+
+    def test_ties_pick_the_first_client(self):
+        # Whole numbers on a small grid, so many clients are exactly as far away as each other
+        rng = np.random.default_rng(1)
+        x, y = rng.integers(-10, 10, 3000).astype(np.float64), rng.integers(-10, 10, 3000).astype(np.float64)
+        client_x, client_y = rng.integers(-10, 10, 64).astype(np.float64), rng.integers(-10, 10, 64).astype(np.float64)
+        self.check(x, y, client_x, client_y)
+
+    def test_clients_bunched_up_far_away(self):
+        rng = np.random.default_rng(2)
+        x, y = rng.uniform(-4000, 4000, 1000), rng.uniform(-1500, 0, 1000)
+        client_x, client_y = rng.uniform(3900, 4000, 100), rng.uniform(-5000, 5000, 100)
+        self.check(x, y, client_x, client_y)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+#####################################################################
+# description:  tests for GameModel.py. The server has to start and
+# simulate without pygame, Pillow or tkinter installed, and the
+# model's Vector2 and Rect have to give the server the same results
+# pygame's did.
+#####################################################################
+
+import os
+import random
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from GameModel import *
+from SpatialIndex import TerrainIndex
+
+HERE = Path(__file__).resolve().parent
+
+# Runs a server tick in a fresh interpreter where the display libraries can't be imported
+HEADLESS_SERVER = """
+import sys
+for name in ("pygame", "PIL", "tkinter"):
+    sys.modules[name] = None
+from Server import GameServer
+from GameModel import Vector2
+server = GameServer(vectorized_enemies=False)
+server.terrain_index = __import__("SpatialIndex").TerrainIndex(server.generateCityscape(8000))
+server.spawn_enemy(Vector2(0, 0))
+server.update_enemies([Vector2(100, -500)], 1 / 60)
+print(len(server.enemy_data))
+"""
+
+def make_terrain() -> TerrainIndex:
+    buildings = []
+    for left, height in [(-700, 400), (-100, 450), (500, 380)]:
+        buildings.append([(left, -height), (left + 500, -height), (left + 500, 3000), (left, 3000)])
+    return TerrainIndex(buildings)
+
+class GameModelTest(unittest.TestCase):
+
+    def test_server_runs_without_display_libraries(self):
+        result = subprocess.run([sys.executable, "-c", HEADLESS_SERVER], cwd=HERE, capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.split()[-1], "1")
+
+    def test_enemy_moves_like_with_pygame_vectors(self):
+        terrain = make_terrain()
+        model = EnemyModel(Vector2(-300, -900))
+        reference = EnemyModel(pygame.Vector2(-300, -900))
+        rng = random.Random(0)
+        for tick in range(600):
+            x, y = rng.uniform(-700, 1000), rng.uniform(-600, -300)
+            model.update([Vector2(x, y)], terrain, 1 / 60)
+            reference.update([pygame.Vector2(x, y)], terrain, 1 / 60)
+            self.assertEqual((model.position.x, model.position.y), (reference.position.x, reference.position.y))
+            self.assertEqual(model.current_animation, reference.current_animation)
+            self.assertEqual(model.current_frame_index, reference.current_frame_index)
+
+    def test_rect_collides_like_pygame(self):
+        rng = random.Random(1)
+        for _ in range(2000):
+            a = [rng.uniform(-20, 20) for _ in range(2)] + [rng.uniform(-2, 12) for _ in range(2)]
+            b = [rng.uniform(-20, 20) for _ in range(2)] + [rng.uniform(-2, 12) for _ in range(2)]
+            self.assertEqual(tuple(Rect(*a)), tuple(pygame.Rect(*a)))
+            self.assertEqual(Rect(*a).colliderect(Rect(*b)), pygame.Rect(*a).colliderect(pygame.Rect(*b)), (a, b))
+
+    def test_png_size_reads_the_header(self):
+        for path in (HERE / "Sprites" / "Enemies").glob("*.png"):
+            self.assertEqual(png_size(str(path)), pygame.image.load(path).get_size())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,242 @@
+#####################################################################
+# description:  deterministic tests for client-side prediction and
+# server reconciliation in Movement.py. A client and a server are
+# stepped frame by frame with artificial latency between them, and
+# nothing depends on the wall clock, pygame or a network.
+#####################################################################
+
+import random
+import unittest
+from collections import deque
+
+from Movement import *
+from SpatialIndex import TerrainIndex
+from WorldStore import ClientState, WorldStore
+from Protocol import *
+
+FRAME_DT = 1 / 60
+
+def make_terrain() -> TerrainIndex:
+    """Three buildings at different heights, shaped like GameServer.generateCityscape makes them."""
+    buildings = []
+    for left, height in [(-700, 400), (-100, 450), (500, 380)]:
+        buildings.append([(left, -height), (left + 500, -height), (left + 500, 3000), (left, 3000)])
+    return TerrainIndex(buildings)
+
+def scripted_keys(frame: int) -> Tuple[bool, bool, bool]:
+    """(left, right, jump) for a frame: walk right, jump now and then, then walk back."""
+    if frame < 120:
+        return False, True, frame % 45 == 0
+    if frame < 200:
+        return False, False, frame == 150
+    return True, False, frame % 60 == 0
+
+class LatencyLink():
+    """
+    Delivers messages a number of frames after they were sent, in order like TCP.
+    The delay of each message is drawn from [min_delay, max_delay] with a fixed seed.
+    """
+
+    def __init__(self, min_delay: int, max_delay: int, seed: int = 0):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.rng = random.Random(seed)
+        self.in_flight = deque()  # (frame it arrives, message)
+
+    def send(self, frame: int, message):
+        arrives = frame + self.rng.randint(self.min_delay, self.max_delay)
+        if self.in_flight:
+            arrives = max(arrives, self.in_flight[-1][0])  # Never overtakes an earlier message
+        self.in_flight.append((arrives, message))
+
+    def receive(self, frame: int) -> list:
+        messages = []
+        while self.in_flight and self.in_flight[0][0] <= frame:
+            messages.append(self.in_flight.popleft()[1])
+        return messages
+
+class SimulatedServer():
+    """
+    Runs inputs as they arrive and sends its state back every snapshot_interval frames, like NetworkServer.
+    Its clock is the frame count, so inputs are limited by an InputBudget without the wall clock.
+    """
+
+    def __init__(self, state: PlayerState, terrain: TerrainIndex, snapshot_interval: int = 2):
+        self.state = state
+        self.last_sequence = 0
+        self.terrain = terrain
+        self.snapshot_interval = snapshot_interval
+        self.budget = InputBudget(0)
+
+    def update(self, frame: int, uplink: LatencyLink, downlink: LatencyLink):
+        for inputs in uplink.receive(frame):
+            self.budget.refill(frame * FRAME_DT)
+            self.state, self.last_sequence = run_inputs(self.state, self.last_sequence, inputs, self.terrain, self.budget)
+        if frame % self.snapshot_interval == 0:
+            downlink.send(frame, (self.state, self.last_sequence))
+
+def play(frames: int, min_delay: int, max_delay: int, server_override=None):
+    """
+    Plays scripted_keys for a number of frames. Returns the predictor, the server, and the
+    state the client would be in if it never heard from the server, for every frame.
+
+    Args:
+        server_override (Callable): Called with the server and the frame before it updates,
+            to make the server disagree with the client.
+    """
+    terrain = make_terrain()
+    start = PlayerState(0, -600)
+    predictor = MovementPredictor(start)
+    server = SimulatedServer(start, terrain)
+    uplink, downlink = LatencyLink(min_delay, max_delay, seed=1), LatencyLink(min_delay, max_delay, seed=2)
+    offline, offline_states = start, []
+
+    for frame in range(frames):
+        for server_state, last_sequence in downlink.receive(frame):
+            predictor.reconcile(server_state, last_sequence, terrain)
+
+        left, right, jump = scripted_keys(frame)
+        player_input = predictor.predict(left, right, jump, FRAME_DT, terrain)
+        offline = move_player(offline, player_input, terrain)
+        offline_states.append((predictor.state, offline))
+        uplink.send(frame, [player_input])
+
+        if server_override is not None:
+            server_override(server, frame)
+        server.update(frame, uplink, downlink)
+
+    # Let everything still in flight arrive
+    for frame in range(frames, frames + max_delay * 3 + server.snapshot_interval):
+        server.update(frame, uplink, downlink)
+        for server_state, last_sequence in downlink.receive(frame):
+            predictor.reconcile(server_state, last_sequence, terrain)
+
+    return predictor, server, offline_states
+
+class TestMovement(unittest.TestCase):
+
+    def test_deterministic(self):
+        terrain = make_terrain()
+        states = []
+        for _ in range(2):
+            state = PlayerState(0, -600)
+            for frame in range(300):
+                left, right, jump = scripted_keys(frame)
+                state = move_player(state, PlayerInput(frame + 1, left, right, jump, FRAME_DT), terrain)
+            states.append(state)
+        self.assertEqual(states[0], states[1])
+
+    def test_lands_on_roof(self):
+        terrain = make_terrain()
+        state = PlayerState(0, -600)
+        for sequence in range(1, 120):
+            state = move_player(state, PlayerInput(sequence, False, False, False, FRAME_DT), terrain)
+        self.assertTrue(state.grounded)
+        self.assertEqual(state.y, -450 - (PLAYER_HEIGHT * PLAYER_SCALE) // 2)
+
+    def test_run_inputs_skips_old_inputs(self):
+        terrain = make_terrain()
+        inputs = [PlayerInput(sequence, False, True, False, FRAME_DT) for sequence in range(1, 6)]
+        state, last_sequence = run_inputs(PlayerState(0, -600), 0, inputs, terrain)
+        again, again_sequence = run_inputs(state, last_sequence, inputs, terrain)
+        self.assertEqual(last_sequence, 5)
+        self.assertEqual((again, again_sequence), (state, last_sequence))
+
+    def test_long_frames_are_clamped(self):
+        terrain = make_terrain()
+        long = move_player(PlayerState(0, -600), PlayerInput(1, False, False, False, 5.0), terrain)
+        clamped = move_player(PlayerState(0, -600), PlayerInput(1, False, False, False, MAX_INPUT_DT), terrain)
+        self.assertEqual(long, clamped)
+
+class TestPrediction(unittest.TestCase):
+
+    def test_no_input_lag(self):
+        """The predicted state moves on the frame the key is pressed, however slow the network is."""
+        terrain = make_terrain()
+        predictor = MovementPredictor(PlayerState(0, -600))
+        predictor.predict(False, True, False, FRAME_DT, terrain)
+        self.assertEqual(predictor.state.x, PLAYER_SPEED)
+        self.assertTrue(predictor.state.facing_right)
+
+    def test_agrees_with_server_under_latency(self):
+        """With the server running the same inputs, reconciling never moves the player."""
+        for min_delay, max_delay in [(0, 0), (3, 3), (2, 12), (10, 30)]:
+            with self.subTest(min_delay=min_delay, max_delay=max_delay):
+                predictor, server, states = play(400, min_delay, max_delay)
+                for predicted, offline in states:
+                    self.assertEqual(predicted, offline)
+                self.assertEqual(predictor.state, server.state)
+                self.assertEqual(len(predictor.pending), 0)
+
+    def test_corrected_by_server(self):
+        """When the server moves the player somewhere else, the client ends up where the server says."""
+        def teleport(server, frame):
+            if frame == 100:
+                server.state = PlayerState(1000, -800)
+
+        predictor, server, states = play(400, 4, 10, server_override=teleport)
+        self.assertEqual(predictor.state, server.state)
+        self.assertNotEqual(states[-1][0], states[-1][1])  # The offline client never found out
+
+    def test_pending_inputs_are_replayed(self):
+        terrain = make_terrain()
+        predictor = MovementPredictor(PlayerState(0, -600))
+        inputs = [predictor.predict(False, True, False, FRAME_DT, terrain) for _ in range(10)]
+        predicted = predictor.state
+
+        # The server has only run the first four
+        server_state, last_sequence = run_inputs(PlayerState(0, -600), 0, inputs[:4], terrain)
+        replayed = predictor.reconcile(server_state, last_sequence, terrain)
+        self.assertEqual(replayed, 6)
+        self.assertEqual(predictor.state, predicted)
+
+class TestInputLimits(unittest.TestCase):
+    """A modified client can send whatever inputs it likes, the server must not let it move faster for it."""
+
+    def flood(self, inputs_per_frame: int, dt: float, frames: int = 120) -> float:
+        """
+        Sends inputs_per_frame inputs walking right every frame along one long roof, with nothing in
+        the way for thousands of pixels. Returns how far the server moved the player.
+        """
+        terrain = TerrainIndex([[(-WORLD_EDGE, -400), (WORLD_EDGE, -400), (WORLD_EDGE, 3000), (-WORLD_EDGE, 3000)]])
+        server = SimulatedServer(PlayerState(-WORLD_EDGE + 100, -400 - (PLAYER_HEIGHT * PLAYER_SCALE) // 2, grounded=True), terrain)
+        uplink, downlink = LatencyLink(0, 0), LatencyLink(0, 0)
+        sequence = 0
+        for frame in range(frames):
+            inputs = []
+            for _ in range(inputs_per_frame):
+                sequence += 1
+                inputs.append(PlayerInput(sequence, False, True, False, dt))
+            uplink.send(frame, inputs)
+            server.update(frame, uplink, downlink)
+        self.assertEqual(server.last_sequence, sequence)  # Dropped inputs still count as seen
+        return server.state.x - (-WORLD_EDGE + 100)
+
+    def test_long_frames_are_limited_to_real_time(self):
+        elapsed = 120 * FRAME_DT
+        moved = self.flood(50, MAX_INPUT_DT)
+        self.assertLessEqual(moved, (elapsed + MAX_INPUT_BURST) / MAX_INPUT_DT * PLAYER_SPEED)
+
+    def test_short_frames_are_limited_to_the_input_rate(self):
+        elapsed = 120 * FRAME_DT
+        moved = self.flood(50, 0.0001)
+        self.assertLessEqual(moved, (elapsed + MAX_INPUT_BURST) * MAX_INPUT_RATE * PLAYER_SPEED)
+
+    def test_honest_client_is_not_limited(self):
+        self.assertEqual(self.flood(1, FRAME_DT), 120 * PLAYER_SPEED)
+
+    def test_far_away_start_is_ignored(self):
+        terrain = make_terrain()
+        packet = ClientPacket(
+            username="Player", position=Position(0, -600),
+            gameData=GameData(100, True, "Idle", 0, 0, 3, 5, 0, False, False, None, False)
+        )
+        for start, expected_x in [(PlayerState(20, -600), 20), (PlayerState(2000, -600), 0)]:
+            world = WorldStore()
+            world.update_client("addr", ClientState.from_packet(packet, PROTOCOL_JSON))
+            world.apply_inputs("addr", [PlayerInput(1, False, False, False, FRAME_DT)], start, terrain, now=0)
+            world.apply_changes()
+            self.assertEqual(world.clients["addr"].movement.x, expected_x)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+#####################################################################
+# description:  tests for the sound bank in SoundBank.py. They run on
+# SDL's dummy audio driver, which plays sounds in real time without
+# a sound card, using the game's own sound effects and silent clips
+# made in memory.
+#####################################################################
+
+import os
+import unittest
+from pathlib import Path
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from SoundBank import *
+
+SFX_FOLDER = Path(__file__).resolve().parent / "Sound" / "SFX"
+
+def silence(seconds: float) -> pygame.mixer.Sound:
+    """A silent clip long enough to still be playing while a test runs."""
+    frequency, size, channels = pygame.mixer.get_init()
+    return pygame.mixer.Sound(buffer=bytes(int(frequency * seconds) * abs(size) // 8 * channels))
+
+class SoundBankTest(unittest.TestCase):
+
+    def setUp(self):
+        pygame.mixer.init()
+
+    def tearDown(self):
+        pygame.mixer.quit()
+
+    def test_loads_every_clip_once(self):
+        bank = SoundBank()
+        names = bank.load(SFX_FOLDER, "weapons")
+        self.assertEqual(names, ["SpearThrust", "SwordSwing", "SwordSwingBeefy"])
+        sound = bank.sounds["SwordSwing"][0]
+        self.assertGreater(sound.get_length(), 0)
+
+        channel = bank.play("SwordSwing")
+        self.assertIs(channel.get_sound(), sound)  # Played from the decoded clip, not loaded again
+        self.assertIsNone(bank.play("Missing"))
+
+    def test_plays_on_reserved_channels(self):
+        bank = SoundBank(channels=2)
+        bank.add("long", silence(5))
+        played = [bank.play("long") for _ in range(2)]
+        self.assertEqual({id(channel) for channel in played}, {id(channel) for channel in bank.channels})
+
+        other = silence(5).play()  # Anything else plays on the channels left over
+        self.assertIsNotNone(other)
+        self.assertNotIn(other, bank.channels)
+
+    def test_steals_the_oldest_voice(self):
+        bank = SoundBank(channels=2)
+        first, second, third = silence(5), silence(5), silence(5)
+        for name, sound in [("first", first), ("second", second), ("third", third)]:
+            bank.add(name, sound)
+
+        bank.play("first")
+        bank.play("second")
+        channel = bank.play("third")
+        self.assertEqual(bank.stolen, 1)
+        self.assertIs(channel, bank.channels[0])
+        self.assertEqual([channel.get_sound() for channel in bank.channels], [third, second])
+
+    def test_category_volume(self):
+        bank = SoundBank(channels=2)
+        bank.add("swing", silence(5), "weapons")
+        bank.add("click", silence(5), "menu")
+        bank.set_volume("weapons", 0.5)
+        bank.set_volume(MASTER, 0.5)
+
+        swing = bank.play("swing")
+        click = bank.play("click")
+        self.assertAlmostEqual(swing.get_volume(), 0.25, places=2)
+        self.assertAlmostEqual(click.get_volume(), 0.5, places=2)
+
+        bank.set_volume("weapons", 1.0)  # Sounds already playing follow their category
+        self.assertAlmostEqual(swing.get_volume(), 0.5, places=2)
+        self.assertAlmostEqual(click.get_volume(), 0.5, places=2)
+        self.assertEqual(bank.get_volume("weapons"), 1.0)
+
+if __name__ == "__main__":
+    unittest.main()